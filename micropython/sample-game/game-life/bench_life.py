@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ライフゲームの更新速度のベンチマーク（世代/秒）。
+
+  loop  : update(grid, count_neighbors_*)（従来の 1 セルずつのループ）
+  numpy : step_torus / step_klein
+  gather: step(grid, topology)（life_topology の添字表から 1 回で集める。全位相）
+
+同じランダムな盤面から両方を --check 世代進め、毎世代ビット単位で同じになることも確かめる。
+  python3 bench_life.py --sizes 50 100 200
+"""
+import argparse
+import time
+
+import numpy as np
+
+import life_topology
+from life_step import count_neighbors_klein, count_neighbors_torus, step, step_klein, step_torus, update
+
+def gens_per_sec(step, grid, min_time):
+    """min_time 秒以上回して 1 秒あたりの世代数を返す。"""
+    gens = 0
+    t0 = time.perf_counter()
+    while True:
+        grid = step(grid)
+        gens += 1
+        elapsed = time.perf_counter() - t0
+        if elapsed >= min_time:
+            return gens / elapsed
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--sizes", type=int, nargs="+", default=[50, 100, 200], help="盤の一辺")
+    ap.add_argument("--density", type=float, default=0.3, help="初期盤面で生きているセルの割合")
+    ap.add_argument("--check", type=int, default=3, help="従来版と比べる世代数")
+    ap.add_argument("--time", type=float, default=1.0, help="1 つの計測に使う秒数")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    print(f"{'size':>9} {'topology':<7} {'loop gen/s':>11} {'numpy gen/s':>12} {'speedup':>8}")
+    for n in args.sizes:
+        # 行と列の数を変えて、行・列の取り違えも見つかるようにする
+        initial = (rng.random((n, n + n // 5 + 1)) < args.density).astype(int)
+        for name, count_func, fast in (("torus", count_neighbors_torus, step_torus),
+                                       ("klein", count_neighbors_klein, step_klein)):
+            slow = lambda g: update(g, count_func)
+            a = b = c = initial
+            for gen in range(args.check):
+                a, b, c = slow(a), fast(b), step(c, name)
+                assert a.dtype == b.dtype == c.dtype, (name, n, gen)
+                assert np.array_equal(a, b) and np.array_equal(a, c), (name, n, gen)
+            loop = gens_per_sec(slow, initial, args.time)
+            vec = gens_per_sec(fast, initial, args.time)
+            print(f"{n:>4}x{initial.shape[1]:<4} {name:<7} {loop:11.2f} {vec:12.1f} {vec / loop:7.0f}x")
+        line = "  ".join(f"{name} {gens_per_sec(lambda g: step(g, name), initial, args.time / 2):.0f}"
+                         for name in life_topology.names())
+        print(f"{'':>9} gather gen/s: {line}")
+
+if __name__ == "__main__":
+    main()
@@ -3,15 +3,16 @@
 ============================================================
 
 【機能概要】
-- 2つのトポロジー（トーラス／クラインボトル）でライフゲームの進化を比較表示
+- 2つのトポロジー（トーラス／クラインボトル。右側は torus / klein / projective / cylinder / plane から選択可）でライフゲームの進化を比較表示
 - 初期状態は指定数のグライダーをランダム配置
 - ダークモード（背景黒、セル緑）
 - 盤面の外枠を白線で常時表示
 - キー操作説明を h または ? でトグル表示（表示中は進行停止）
 
 【実行方法】
-    python game-01.py [rowsxcols] [n_gliders]
+    python game-01.py [rowsxcols] [n_gliders] [topology]
     例: python game-01.py 60x40 5
+    例: python game-01.py 60x40 5 projective   （右の盤を射影平面に）
     （引数省略時は 50x50 盤面・グライダー3個）
 
 【キー操作】
@@ -37,53 +38,9 @@ from matplotlib.patches import Rectangle
 import os
 import re
 
-# -----------------------------
-# Game of Lifeの盤面を1ステップ進める汎用関数
-def update(grid, count_func):
-    rows, cols = grid.shape
-    new_grid = np.zeros((rows, cols), dtype=int)
-    for x in range(rows):
-        for y in range(cols):
-            neighbors = count_func(grid, x, y)
-            if grid[x, y] == 1 and neighbors in [2, 3]:
-                new_grid[x, y] = 1
-            elif grid[x, y] == 0 and neighbors == 3:
-                new_grid[x, y] = 1
-    return new_grid
-
-# Klein bottle用の隣接セルカウント関数
-def count_neighbors_klein(grid, x, y):
-    rows, cols = grid.shape
-    count = 0
-    for dx in [-1, 0, 1]:
-        for dy in [-1, 0, 1]:
-            if dx == 0 and dy == 0:
-                continue
-            nx = (x + dx) % rows
-            ny = y + dy
-            # 左右端で反転
-            if ny < 0:
-                ny = cols - 1
-                nx = (rows - nx - 1) % rows
-            elif ny >= cols:
-                ny = 0
-                nx = (rows - nx - 1) % rows
-            count += grid[nx, ny]
-    return count
-
-# Torus用の隣接セルカウント関数
-def count_neighbors_torus(grid, x, y):
-    rows, cols = grid.shape
-    count = 0
-    for dx in [-1, 0, 1]:
-        for dy in [-1, 0, 1]:
-            if dx == 0 and dy == 0:
-                continue
-            nx = (x + dx) % rows
-            ny = (y + dy) % cols
-            count += grid[nx, ny]
-    return count
-
+# Game of Life の盤面を 1 ステップ進める（NumPy で全セルまとめて。従来の update と同じ結果）
+from life_step import step, step_torus
+from life_topology import names as topology_names
 
 # -----------------------------
 
@@ -105,6 +62,14 @@ elif len(sys.argv) > 1 and (m := re.match(r'^(\d+)x(\d+)$', sys.argv[1])):
 else:
     rows, cols, n_gliders = 50, 50, 3
 
+# 右の盤の位相（3 番目の引数。既定はクライン壺）: torus / klein / projective / cylinder / plane
+topology = sys.argv[3] if len(sys.argv) > 3 else "klein"
+if topology not in topology_names():
+    print(f"Usage: python game-01.py [rowsxcols] [n_gliders] [{'|'.join(topology_names())}]")
+    sys.exit(1)
+TOPOLOGY_TITLES = {"torus": "Torus", "klein": "Klein bottle", "projective": "Projective plane",
+                   "cylinder": "Cylinder", "plane": "Plane"}
+
 initial = np.zeros((rows, cols), dtype=int)
 
 glider = [(0,1),(1,2),(2,0),(2,1),(2,2)]
@@ -116,7 +81,7 @@ for _ in range(n_gliders):
         initial[(gx+dx)%rows, (gy+dy)%cols] = 1
 
 torus_grid = initial.copy()
-klein_grid = initial.copy()
+surface_grid = initial.copy()
 
 # ヘルプテキストのアーティストをグローバルで管理
 help_text_obj = None
@@ -137,9 +102,9 @@ ax1.set_xlim(0, cols)
 ax1.set_ylim(0, rows)
 ax1.axis("off")
 
-im2 = ax2.imshow(klein_grid, cmap=cmap, interpolation="nearest",
+im2 = ax2.imshow(surface_grid, cmap=cmap, interpolation="nearest",
                  vmin=0, vmax=1, origin="lower", extent=(0, cols, 0, rows))
-ax2.set_title("Klein bottle", color="white")
+ax2.set_title(TOPOLOGY_TITLES.get(topology, topology), color="white")
 ax2.set_facecolor("black")
 ax2.set_xlim(0, cols)
 ax2.set_ylim(0, rows)
@@ -163,16 +128,16 @@ _frame_counter = 0
 ani = None
 
 def animate(frame):
-    global torus_grid, klein_grid, _frame_counter, step_interval
+    global torus_grid, surface_grid, _frame_counter, step_interval
     if not paused:
         _frame_counter += 1
         if _frame_counter >= step_interval:
             # step_interval回分一気に進めてから表示
             for _ in range(step_interval):
-                torus_grid = update(torus_grid, count_neighbors_torus)
-                klein_grid = update(klein_grid, count_neighbors_klein)
+                torus_grid = step_torus(torus_grid)
+                surface_grid = step(surface_grid, topology)
             im1.set_array(torus_grid)
-            im2.set_array(klein_grid)
+            im2.set_array(surface_grid)
             _frame_counter = 0
     return [im1, im2, rect1, rect2]
 
@@ -197,7 +162,7 @@ def update_animation_interval(new_interval):
             ani.event_source.start()
 
 def on_key(event):
-    global ani, paused, interval, help_text_obj, step_interval, _frame_counter, torus_grid, klein_grid
+    global ani, paused, interval, help_text_obj, step_interval, _frame_counter, torus_grid, surface_grid
     # 数字キー(1..9)でstep_intervalを変更
     if event.key in [str(i) for i in range(1, 10)]:
         step_interval = int(event.key)
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ビットパックしたライフゲーム（1 セル 1 ビット、uint64 1 語に 64 セル）。大きな盤（10000×10000 など）用。
+
+- 盤面 cells は (rows, words) の uint64。セル (x, y) は cells[x, y // 64] のビット y % 64（x が行、y が列）。
+  列数が 64 の倍数でなければ最後の語の余りのビットは常に 0。
+- 近傍数はビット演算の全加算器で 64 セル同時に数える。各行で左右にずらした L, R から横 3 マスの和 H = L+A+R と
+  左右の和 M = L+R を 2 ビットで作り、近傍数 = H(上の行) + H(下の行) + M。2 か 3 かだけ分かればよい。
+- 行を帯（band 行ずつ）に分けて計算し、作業用の配列は最初に確保したものを使い回す。次の世代は
+  もう 1 枚の盤面に書き込んで入れ替える（ダブルバッファ）ので、世代ごとのメモリ確保は無い。
+- 位相は torus / klein（life_topology と同じ。クライン壺は左右の端をまたぐと行が反転する）。
+
+int の盤面（1 セル 8 バイト）より 64 倍小さく、10000×10000 で 1 枚 12.5MB。
+
+  python3 life_bits.py --size 10000 --gens 20          # 世代/秒（ランダムな盤面）
+  python3 life_bits.py --check                         # life_step.step と同じ結果になるか確かめる
+"""
+import argparse
+import time
+
+import numpy as np
+
+TOPOLOGIES = ("torus", "klein")
+BAND_BYTES = 1 << 18  # 帯 1 枚の作業配列の大きさの目安（キャッシュに収まる程度）
+
+ONE = np.uint64(1)
+SHIFT_63 = np.uint64(63)
+
+class PackedLife:
+    def __init__(self, rows, cols, topology="torus"):
+        if topology not in TOPOLOGIES:
+            raise ValueError(f"未対応の位相です: {topology}（{', '.join(TOPOLOGIES)}）")
+        self.rows, self.cols, self.topology = rows, cols, topology
+        self.words = (cols + 63) // 64
+        self.last_bit = np.uint64((cols - 1) % 64)   # 最後の列の、最後の語の中でのビット位置
+        self.last_mask = np.uint64((1 << ((cols - 1) % 64 + 1)) - 1)
+        self.cells = np.zeros((rows, self.words), dtype=np.uint64)
+        self._next = np.zeros_like(self.cells)
+        self.generation = 0
+
+        self.band = max(1, min(rows, BAND_BYTES // (8 * self.words)))
+        shape = (self.band + 2, self.words)
+        self._ext, self._l, self._r, self._m0, self._m1, self._h0, self._h1 = (
+            np.empty(shape, dtype=np.uint64) for _ in range(7))
+        center = (self.band, self.words)
+        self._b0, self._c0, self._t0, self._t1 = (np.empty(center, dtype=np.uint64) for _ in range(4))
+        self._seam_l = np.empty(rows, dtype=np.uint64)
+        self._seam_r = np.empty(rows, dtype=np.uint64)
+        # 帯 [r0, r0+band) の計算に使う行（上下 1 行ずつ広げ、行方向は周期的）
+        self._band_rows = [np.arange(r0 - 1, min(rows, r0 + self.band) + 1) % rows
+                           for r0 in range(0, rows, self.band)]
+
+    # ---- 変換 ----
+
+    @classmethod
+    def from_array(cls, grid, topology="torus"):
+        """grid[x, y]（0 以外が生きているセル）から作る。"""
+        rows, cols = grid.shape
+        life = cls(rows, cols, topology)
+        packed = np.packbits(np.asarray(grid) != 0, axis=1, bitorder="little")
+        buf = np.zeros((rows, life.words * 8), dtype=np.uint8)
+        buf[:, :packed.shape[1]] = packed
+        life.cells[:] = buf.view("<u8")
+        return life
+
+    @classmethod
+    def random(cls, rows, cols, topology="torus", seed=None):
+        """各セルが 1/2 の確率で生きている盤面（int の盤面を経由しないので大きな盤でも軽い）。"""
+        life = cls(rows, cols, topology)
+        rng = np.random.default_rng(seed)
+        life.cells[:] = rng.integers(0, np.iinfo(np.uint64).max, size=life.cells.shape,
+                                     dtype=np.uint64, endpoint=True)
+        life.cells[:, -1] &= life.last_mask
+        return life
+
+    def to_array(self, dtype=int):
+        """grid[x, y]（0 / 1）に戻す。"""
+        packed = self.cells.astype("<u8").view(np.uint8)
+        return np.unpackbits(packed, axis=1, count=self.cols, bitorder="little").astype(dtype)
+
+    def population(self):
+        """生きているセルの数。"""
+        if hasattr(np, "bitwise_count"):  # NumPy 2.0 以降
+            return int(np.bitwise_count(self.cells).sum(dtype=np.int64))
+        return int(sum(np.unpackbits(row.view(np.uint8)).sum(dtype=np.int64) for row in self.cells))
+
+    # ---- 更新 ----
+
+    def _seams(self):
+        """左右の端をまたいだ隣のビット（行ごと）。L の列 0 と R の最後の列に入る。"""
+        last = (self.cells[:, -1] >> self.last_bit) & ONE
+        first = self.cells[:, 0] & ONE
+        if self.topology == "klein":  # 行 x の左右の隣は行 rows-1-x
+            last, first = last[::-1], first[::-1]
+        self._seam_l[:] = last
+        self._seam_r[:] = first
+
+    def _shifts(self, ext, n):
+        """ext の各行を 1 列ずつずらした L（左隣の値）と R（右隣の値）。"""
+        l, r = self._l[:n], self._r[:n]
+        np.left_shift(ext, ONE, out=l)
+        np.right_shift(ext[:, :-1], SHIFT_63, out=self._m0[:n, 1:])  # 1 つ前の語の最上位ビット
+        np.bitwise_or(l[:, 1:], self._m0[:n, 1:], out=l[:, 1:])
+        l[:, -1] &= self.last_mask
+        np.right_shift(ext, ONE, out=r)
+        np.left_shift(ext[:, 1:], SHIFT_63, out=self._m1[:n, :-1])  # 1 つ後の語の最下位ビット
+        np.bitwise_or(r[:, :-1], self._m1[:n, :-1], out=r[:, :-1])
+        return l, r
+
+    def step(self, generations=1):
+        for _ in range(generations):
+            self._seams()
+            for r0, rows in zip(range(0, self.rows, self.band), self._band_rows):
+                self._step_band(r0, rows)
+            self.cells, self._next = self._next, self.cells
+            self.generation += 1
+        return self
+
+    def _step_band(self, r0, rows):
+        n = len(rows)  # 帯の行数 + 2
+        c = n - 2
+        ext = self._ext[:n]
+        np.take(self.cells, rows, axis=0, out=ext)
+        l, r = self._shifts(ext, n)
+        l[:, 0] |= self._seam_l[rows]
+        r[:, -1] |= self._seam_r[rows] << self.last_bit
+
+        # 横の和: M = L + R（m1 m0）、H = L + A + R（h1 h0）
+        m0, m1, h0, h1 = self._m0[:n], self._m1[:n], self._h0[:n], self._h1[:n]
+        np.bitwise_xor(l, r, out=m0)
+        np.bitwise_and(l, r, out=m1)
+        np.bitwise_xor(m0, ext, out=h0)
+        np.bitwise_and(m0, ext, out=h1)
+        np.bitwise_or(h1, m1, out=h1)
+
+        # 近傍数 = H(上) + H(下) + M。1 の位 b0 と、2 の位に入る 4 ビット（h1 上, h1 下, m1, 繰り上がり c0）
+        b0, c0, t0, t1 = self._b0[:c], self._c0[:c], self._t0[:c], self._t1[:c]
+        up0, down0, mid0 = h0[:-2], h0[2:], m0[1:-1]
+        np.bitwise_xor(up0, down0, out=t0)
+        np.bitwise_xor(t0, mid0, out=b0)
+        np.bitwise_and(t0, mid0, out=t0)
+        np.bitwise_and(up0, down0, out=c0)
+        np.bitwise_or(c0, t0, out=c0)
+        # 2 の位がちょうど 1 つ（近傍数 2 か 3）: p = h1上^h1下, q = m1^c0 のどちらか一方だけで、
+        # どちらの組も両方 1 ではない
+        up1, down1, mid1 = h1[:-2], h1[2:], m1[1:-1]
+        np.bitwise_xor(up1, down1, out=t0)
+        np.bitwise_and(up1, down1, out=t1)
+        np.bitwise_xor(t0, mid1, out=t0)
+        np.bitwise_xor(t0, c0, out=t0)
+        np.bitwise_and(mid1, c0, out=c0)
+        np.bitwise_or(t1, c0, out=t1)
+        np.invert(t1, out=t1)
+        np.bitwise_and(t0, t1, out=t0)
+        # 3 なら誕生・生存、2 なら生きているセルだけ残る
+        out = self._next[r0:r0 + c]
+        np.bitwise_or(b0, ext[1:-1], out=b0)
+        np.bitwise_and(t0, b0, out=out)
+
+def check(sizes, generations, seed):
+    """life_step.step と同じ結果になるか、いろいろな盤の大きさで確かめる。"""
+    from life_step import step
+    rng = np.random.default_rng(seed)
+    for rows, cols in sizes:
+        grid = (rng.random((rows, cols)) < 0.35).astype(int)
+        for topology in TOPOLOGIES:
+            life = PackedLife.from_array(grid, topology)
+            ref = grid
+            for gen in range(generations):
+                ref = step(ref, topology)
+                life.step()
+                assert np.array_equal(life.to_array(), ref), (rows, cols, topology, gen)
+    return len(sizes) * len(TOPOLOGIES)
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--size", type=int, default=10000, help="盤の一辺")
+    ap.add_argument("--gens", type=int, default=20, help="計測する世代数")
+    ap.add_argument("--topology", choices=TOPOLOGIES, default="torus")
+    ap.add_argument("--check", action="store_true", help="life_step.step と比べるだけ")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    if args.check:
+        sizes = [(r, c) for r in (1, 2, 3, 7) for c in (1, 2, 63, 64, 65, 130)] + [(200, 241), (97, 1000)]
+        print(f"ok: {check(sizes, 8, args.seed)} boards match life_step.step")
+        return
+    life = PackedLife.random(args.size, args.size, args.topology, args.seed)
+    life.step()  # 1 回目は計測に含めない
+    t0 = time.perf_counter()
+    life.step(args.gens)
+    elapsed = time.perf_counter() - t0
+    cells = args.size * args.size
+    print(f"{args.size}x{args.size} {args.topology}: {args.gens / elapsed:.2f} gen/s  "
+          f"{cells * args.gens / elapsed / 1e6:.0f} Mcells/s  "
+          f"board {life.cells.nbytes / 1e6:.1f} MB (int grid {cells * 8 / 1e6:.0f} MB)  "
+          f"population {life.population()}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+ライフゲームの 1 世代の更新（game-00.py / game-01.py で共有）。
+
+- update(grid, count_func) と count_neighbors_torus / count_neighbors_klein : 1 セルずつ数える従来版（検証用の基準）
+- step(grid, topology) : NumPy で全セルの近傍数を一度に求める版。近傍は life_topology の添字表から 1 回の
+  fancy index で集めるので、位相（torus / klein / projective / cylinder / plane）を足しても変わらない
+- step_torus / step_klein : 従来版とビット単位で同じ結果（トーラスは np.roll のずらし足しで、添字表より速い）
+
+盤面 grid[x, y] は x が行（rows）、y が列（cols）。各位相の端のつなぎ方は life_topology を参照。
+"""
+import numpy as np
+
+import life_topology
+
+# -----------------------------
+# 従来版（1 セルずつ）
+# -----------------------------
+def count_neighbors_torus(grid, x, y):
+    """トーラス境界条件の近傍カウント"""
+    rows, cols = grid.shape
+    count = 0
+    for dx in [-1, 0, 1]:
+        for dy in [-1, 0, 1]:
+            if dx == 0 and dy == 0:
+                continue
+            nx = (x + dx) % rows
+            ny = (y + dy) % cols
+            count += grid[nx, ny]
+    return count
+
+def count_neighbors_klein(grid, x, y):
+    """クライン壺境界条件の近傍カウント"""
+    rows, cols = grid.shape
+    count = 0
+    for dx in [-1, 0, 1]:
+        for dy in [-1, 0, 1]:
+            if dx == 0 and dy == 0:
+                continue
+            nx = (x + dx) % rows
+            ny = y + dy
+            # 左右端で反転
+            if ny < 0:
+                ny = cols - 1
+                nx = (rows - nx - 1) % rows
+            elif ny >= cols:
+                ny = 0
+                nx = (rows - nx - 1) % rows
+            count += grid[nx, ny]
+    return count
+
+def update(grid, count_func):
+    """1ステップ進める（count_func でセルごとに近傍を数える）"""
+    rows, cols = grid.shape
+    new_grid = np.zeros((rows, cols), dtype=int)
+    for x in range(rows):
+        for y in range(cols):
+            neighbors = count_func(grid, x, y)
+            if grid[x, y] == 1 and neighbors in [2, 3]:
+                new_grid[x, y] = 1
+            elif grid[x, y] == 0 and neighbors == 3:
+                new_grid[x, y] = 1
+    return new_grid
+
+# -----------------------------
+# NumPy 版（全セルまとめて）
+# -----------------------------
+def _rule(grid, neighbors):
+    """update と同じ規則（生きているセルは 2, 3 で生存、空きセルは 3 で誕生）。"""
+    born = (grid == 0) & (neighbors == 3)
+    survive = (grid == 1) & ((neighbors == 2) | (neighbors == 3))
+    return (born | survive).astype(int)
+
+def neighbors_torus(grid):
+    """トーラスの近傍数。縦 3 マスの和を作ってから横にずらして足す（np.roll 4 回）。"""
+    column = grid + np.roll(grid, 1, axis=0) + np.roll(grid, -1, axis=0)
+    return column + np.roll(column, 1, axis=1) + np.roll(column, -1, axis=1) - grid
+
+def neighbors(grid, topology):
+    """位相 topology の近傍数（life_topology の添字表で 8 近傍を一度に集める）。"""
+    rows, cols = grid.shape
+    index = life_topology.neighbor_index(rows, cols, topology)
+    cells = np.concatenate((grid.ravel(), np.zeros(1, dtype=grid.dtype)))  # 末尾は盤の外（死んだセル）
+    return cells[index].sum(axis=0).reshape(rows, cols)
+
+def step(grid, topology="torus"):
+    """位相 topology（life_topology.names() のどれか）で 1 世代進める。"""
+    return _rule(grid, neighbors(grid, topology))
+
+def step_torus(grid):
+    """update(grid, count_neighbors_torus) と同じ結果を NumPy で求める。"""
+    return _rule(grid, neighbors_torus(grid))
+
+def step_klein(grid):
+    """update(grid, count_neighbors_klein) と同じ結果を NumPy で求める。"""
+    return step(grid, "klein")
@@ -0,0 +1,77 @@
+"""
+ライフゲームの盤の位相（端のつなぎ方）と、近傍の添字表。
+
+盤面 grid[x, y] は x が行（rows）、y が列（cols）。位相ごとに「はみ出した座標 (nx, ny) がどのセルになるか」を
+関数で書いておき、neighbor_index(rows, cols, name) が 8 近傍の添字表（int32, 形 (8, rows*cols)）を一度だけ作る。
+盤の外（つながっていない端）は添字 rows*cols を指すので、末尾に 0 を 1 つ足した盤面から集めればよい。
+
+  torus      : 上下・左右とも普通につながる
+  klein      : 上下は普通に、左右は行を反転してつながる（クライン壺。従来の count_neighbors_klein と同じ）
+  projective : 上下は列を反転、左右は行を反転してつながる（射影平面）
+  cylinder   : 左右だけ普通につながり、上下は端
+  plane      : どこもつながらない（盤の外は死んだセル）
+
+位相を足すときは @topology("名前") を付けた関数を書くだけで、更新のループ（life_step.step）は変えなくてよい。
+"""
+from functools import lru_cache
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+
+OFFSETS: List[Tuple[int, int]] = [(dx, dy) for dx in [-1, 0, 1] for dy in [-1, 0, 1] if (dx, dy) != (0, 0)]
+
+# (rows, cols, nx, ny) -> (nx, ny)。nx, ny ははみ出しうる座標の配列。盤の外は nx = -1 を返す
+TOPOLOGIES: Dict[str, Callable] = {}
+
+def topology(name: str):
+    def register(func):
+        TOPOLOGIES[name] = func
+        return func
+    return register
+
+def _outside(valid, nx, ny):
+    return np.where(valid, nx, -1), np.where(valid, ny, 0)
+
+@topology("torus")
+def torus(rows, cols, nx, ny):
+    return nx % rows, ny % cols
+
+@topology("klein")
+def klein(rows, cols, nx, ny):
+    flip = (ny < 0) | (ny >= cols)
+    nx = nx % rows
+    return np.where(flip, rows - 1 - nx, nx), ny % cols
+
+@topology("projective")
+def projective(rows, cols, nx, ny):
+    flip_rows = (ny < 0) | (ny >= cols)
+    flip_cols = (nx < 0) | (nx >= rows)
+    nx, ny = nx % rows, ny % cols
+    return np.where(flip_rows, rows - 1 - nx, nx), np.where(flip_cols, cols - 1 - ny, ny)
+
+@topology("cylinder")
+def cylinder(rows, cols, nx, ny):
+    return _outside((0 <= nx) & (nx < rows), nx, ny % cols)
+
+@topology("plane")
+def plane(rows, cols, nx, ny):
+    return _outside((0 <= nx) & (nx < rows) & (0 <= ny) & (ny < cols), nx, ny)
+
+def names() -> List[str]:
+    return list(TOPOLOGIES)
+
+@lru_cache(maxsize=None)
+def neighbor_index(rows: int, cols: int, name: str) -> np.ndarray:
+    """8 近傍の添字表（int32, (8, rows*cols)）。盤の外は rows*cols。(rows, cols, name) ごとに 1 回だけ作る。"""
+    if name not in TOPOLOGIES:
+        raise ValueError(f"未知の位相です: {name}（{', '.join(TOPOLOGIES)}）")
+    if rows * cols + 1 > np.iinfo(np.int32).max:
+        raise ValueError(f"盤が大きすぎて int32 の添字に収まりません: {rows}x{cols}")
+    x, y = np.divmod(np.arange(rows * cols, dtype=np.int64), cols)
+    out = []
+    for dx, dy in OFFSETS:
+        nx, ny = TOPOLOGIES[name](rows, cols, x + dx, y + dy)
+        out.append(np.where(nx < 0, rows * cols, nx * cols + ny))
+    index = np.stack(out).astype(np.int32)
+    index.flags.writeable = False
+    return index
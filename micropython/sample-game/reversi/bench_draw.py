@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+盤面描画のベンチマーク: 1 手ごとの再描画時間を、従来の全消し・全再作成と
+保持型の BoardView（変わったマスだけ更新）で比べる。
+
+グリーディ同士で 1 局打ち、各手で描画して update_idletasks() で実際に描かせるまでを計る。
+ディスプレイが必要（Linux でサーバー上なら xvfb-run python3 bench_draw.py）。
+  python3 bench_draw.py --games 3
+"""
+from __future__ import annotations
+import argparse
+import statistics
+import time
+from typing import List, Tuple
+
+import tkinter as tk
+
+from reversi_engine import BLACK, COORD_A, EMPTY, SIZE, apply_move, best_legal_move, initial_board, legal_moves
+from reversi_gui_chatgpt import BOARD_SIZE, CELL, PAD, STONE_R, BoardView
+
+def draw_full(canvas: tk.Canvas, ids: List[int], board: List[List[int]], turn: int):
+    """従来の ReversiGUI.draw と同じ描き方（デバッグ出力は除く）。"""
+    for cid in ids:
+        canvas.delete(cid)
+    ids.clear()
+    x0, y0 = PAD, PAD
+    for i in range(SIZE+1):
+        ids.append(canvas.create_line(x0, y0 + i*CELL, x0 + BOARD_SIZE, y0 + i*CELL, width=2, fill="#224422"))
+        ids.append(canvas.create_line(x0 + i*CELL, y0, x0 + i*CELL, y0 + BOARD_SIZE, width=2, fill="#224422"))
+    for i, ch in enumerate(COORD_A):
+        ids.append(canvas.create_text(PAD + i*CELL + CELL/2, PAD/2, text=ch, fill="white", font=("Helvetica", 12, "bold")))
+    for j in range(SIZE):
+        ids.append(canvas.create_text(PAD/2, PAD + (SIZE-1-j)*CELL + CELL/2, text=str(j+1), fill="white", font=("Helvetica", 12, "bold")))
+    for y in range(SIZE):
+        for x in range(SIZE):
+            v = board[y][x]
+            if v != EMPTY:
+                cx = PAD + x*CELL + CELL/2
+                cy = PAD + (SIZE-1-y)*CELL + CELL/2
+                color = "black" if v == BLACK else "white"
+                outline = "#111" if v == BLACK else "#ddd"
+                ids.append(canvas.create_oval(cx-STONE_R, cy-STONE_R, cx+STONE_R, cy+STONE_R, fill=color, outline=outline, width=3))
+    for (x, y) in legal_moves(board, turn):
+        cx = PAD + x*CELL + CELL/2
+        cy = PAD + (SIZE-1-y)*CELL + CELL/2
+        ids.append(canvas.create_oval(cx-6, cy-6, cx+6, cy+6, fill="#99cc99", outline=""))
+
+def greedy_game() -> List[Tuple[List[List[int]], int, List[Tuple[int, int]]]]:
+    """グリーディ同士の 1 局。各手の (着手後の盤面, 次の手番, 変わったマス)。"""
+    board, color = initial_board(), BLACK
+    frames = []
+    while True:
+        mv = best_legal_move(board, color)
+        if mv is None:
+            if best_legal_move(board, -color) is None:
+                return frames
+            color = -color
+            frames.append((board, color, []))
+            continue
+        res = apply_move(board, mv[0], mv[1], color)
+        board, color = res.board, -color
+        frames.append((board, color, [mv, *res.flips]))
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--games", type=int, default=3)
+    args = ap.parse_args()
+
+    root = tk.Tk()
+    frames = greedy_game()
+    results = {}
+    for name in ("full", "retained"):
+        canvas = tk.Canvas(root, width=BOARD_SIZE + PAD*2, height=BOARD_SIZE + PAD*2, bg="#2c7d2c")
+        canvas.pack()
+        root.update()
+        times = []
+        for _ in range(args.games):
+            ids: List[int] = []
+            if name == "full":
+                draw_full(canvas, ids, initial_board(), BLACK)
+            else:
+                canvas.delete("all")
+                view = BoardView(canvas)
+                view.render(initial_board(), legal_moves(initial_board(), BLACK))
+            root.update_idletasks()
+            for board, turn, changed in frames:
+                t0 = time.perf_counter()
+                if name == "full":
+                    draw_full(canvas, ids, board, turn)
+                else:
+                    view.render(board, legal_moves(board, turn), changed)
+                root.update_idletasks()
+                times.append(time.perf_counter() - t0)
+        results[name] = times
+        canvas.destroy()
+    root.destroy()
+
+    print(f"{len(frames)} moves x {args.games} games")
+    for name, times in results.items():
+        times_ms = sorted(t * 1000 for t in times)
+        print(f"{name:<9} mean {statistics.mean(times_ms):7.3f} ms  median {statistics.median(times_ms):7.3f} ms  "
+              f"p95 {times_ms[int(len(times_ms) * 0.95)]:7.3f} ms  max {times_ms[-1]:7.3f} ms")
+    print(f"speedup (mean): {statistics.mean(results['full']) / statistics.mean(results['retained']):.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+葉の評価 1 回あたりの時間のベンチマーク。
+
+  list        : 従来のリスト盤面の evaluate（legal_moves を 2 回、64 マス × 8 方向を走査）
+  evaluator   : reversi_eval.Evaluator.evaluate（行ごとの表で位置評価＋ビットボードの可動性）
+  incremental : 探索の葉と同じ。親から差分更新した位置評価＋可動性だけ数える
+
+  python3 bench_eval.py --positions 2000
+"""
+from __future__ import annotations
+import argparse
+import time
+from typing import List, Tuple
+
+from bench_parallel import random_positions
+from reversi_bitboard import to_board
+from reversi_engine import DIRS, EMPTY, SIZE, WEIGHTS, capture_line
+from reversi_eval import EVALUATOR
+
+def list_legal_moves(board: List[List[int]], color: int) -> List[Tuple[int, int]]:
+    return [(x, y) for y in range(SIZE) for x in range(SIZE)
+            if board[y][x] == EMPTY and any(capture_line(board, x, y, dx, dy, color) for dx, dy in DIRS)]
+
+def list_evaluate(board: List[List[int]], color: int) -> int:
+    """従来の evaluate と同じ計算。"""
+    s = 0
+    for y in range(SIZE):
+        for x in range(SIZE):
+            if board[y][x] == color:
+                s += WEIGHTS[y][x]
+            elif board[y][x] == -color:
+                s -= WEIGHTS[y][x]
+    return s + 5 * (len(list_legal_moves(board, color)) - len(list_legal_moves(board, -color)))
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--positions", type=int, default=2000)
+    ap.add_argument("--seed", type=int, default=1)
+    args = ap.parse_args()
+
+    positions = []
+    for plies in (10, 20, 30, 40, 50):
+        positions += random_positions(args.positions // 5, plies, args.seed + plies)
+    boards = [(to_board(*((me, opp) if color == 1 else (opp, me))), color) for me, opp, color in positions]
+    pos = [EVALUATOR.position(me, opp) for me, opp, _ in positions]
+    for (me, opp, _), (board, color) in zip(positions, boards):
+        assert list_evaluate(board, color) == EVALUATOR.evaluate(me, opp)
+
+    n = len(positions)
+    t0 = time.perf_counter()
+    for board, color in boards:
+        list_evaluate(board, color)
+    t_list = (time.perf_counter() - t0) / n
+    t0 = time.perf_counter()
+    for me, opp, _ in positions:
+        EVALUATOR.evaluate(me, opp)
+    t_eval = (time.perf_counter() - t0) / n
+    t0 = time.perf_counter()
+    for (me, opp, _), p in zip(positions, pos):
+        EVALUATOR.evaluate(me, opp, p)
+    t_inc = (time.perf_counter() - t0) / n
+
+    print(f"{n} positions (same values from all three)")
+    for name, t in (("list", t_list), ("evaluator", t_eval), ("incremental", t_inc)):
+        print(f"{name:<12} {t * 1e6:8.1f} us/eval  {t_list / t:6.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+並列探索 (reversi_parallel.ParallelSearcher) のベンチマーク。
+
+ランダムに進めた中盤の局面を固定深さで探索し、逐次探索との時間比（speedup）を表示する。
+  python3 bench_parallel.py --depth 7 --positions 8 --workers 2 4 8 16
+"""
+from __future__ import annotations
+import argparse
+import os
+import random
+import time
+from typing import List, Tuple
+
+from reversi_bitboard import BLACK, iter_bits, legal_moves_bb, play
+from reversi_book import initial_position
+from reversi_parallel import ParallelSearcher
+from reversi_search import AlphaBetaSearcher
+
+def random_positions(n: int, plies: int, seed: int) -> List[Tuple[int, int, int]]:
+    """初期局面からランダムに plies 手進めた (me, opp, color) を n 個。"""
+    rng = random.Random(seed)
+    out = []
+    while len(out) < n:
+        black, white = initial_position()
+        color = BLACK
+        for _ in range(plies):
+            me, opp = (black, white) if color == BLACK else (white, black)
+            moves = list(iter_bits(legal_moves_bb(me, opp)))
+            if not moves:
+                break
+            me, opp, _ = play(me, opp, rng.choice(moves))
+            black, white = (me, opp) if color == BLACK else (opp, me)
+            color = -color
+        me, opp = (black, white) if color == BLACK else (white, black)
+        if legal_moves_bb(me, opp):
+            out.append((me, opp, color))
+    return out
+
+def run(searcher, positions, depth: int) -> Tuple[float, int, list]:
+    t0 = time.perf_counter()
+    nodes = 0
+    moves = []
+    for me, opp, color in positions:
+        searcher.new_game()  # 局面ごとに置換表を空にして条件をそろえる
+        res = searcher.search(me, opp, time_limit=1e9, max_depth=depth, color=color)
+        nodes += res.nodes
+        moves.append((res.move, res.score))
+    return time.perf_counter() - t0, nodes, moves
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--depth", type=int, default=6)
+    ap.add_argument("--positions", type=int, default=6)
+    ap.add_argument("--plies", type=int, default=20, help="初期局面から何手進めた局面を使うか")
+    ap.add_argument("--workers", type=int, nargs="+", default=[2, 4, os.cpu_count() or 1])
+    ap.add_argument("--seed", type=int, default=1)
+    args = ap.parse_args()
+
+    positions = random_positions(args.positions, args.plies, args.seed)
+    print(f"cpu_count={os.cpu_count()} depth={args.depth} positions={len(positions)}")
+    base_t, base_n, base_moves = run(AlphaBetaSearcher(), positions, args.depth)
+    print(f"serial     : {base_t:7.2f}s  {base_n:9d} nodes  {base_n / base_t:9,.0f} nps")
+    for w in sorted(set(args.workers)):
+        ps = ParallelSearcher(w)
+        run(ps, positions[:1], 3)  # ワーカー起動分を除くための空回し
+        t, n, moves = run(ps, positions, args.depth)
+        ps.close()
+        same = sum(a[1] == b[1] for a, b in zip(base_moves, moves))
+        print(f"workers={w:<3d}: {t:7.2f}s  {n:9d} nodes  {n / t:9,.0f} nps  "
+              f"speedup x{base_t / t:.2f}  (same score {same}/{len(positions)})")
+
+if __name__ == "__main__":
+    main()
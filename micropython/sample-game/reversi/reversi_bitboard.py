@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Reversi bitboard: 黒・白をそれぞれ 64bit 整数で持つ盤面表現。
+
+マス (x, y) は bit (y*8 + x) に対応する（x=0 が A 列、y=0 が 1 段目）。
+着手生成はシフト＋マスクで 8 方向をまとめて処理する（相手石を先にマスクした Kogge-Stone 型の 4 段）。
+反転計算はマスごとに前計算した半直線の表 RAYS を使い、1 マスずつ辿らない。
+リスト盤面 (List[List[int]]) との相互変換は from_board / to_board を使う。
+"""
+from __future__ import annotations
+from typing import Dict, Iterator, List, Tuple
+
+SIZE = 8
+EMPTY, BLACK, WHITE = 0, 1, -1
+
+MASK64 = 0xFFFF_FFFF_FFFF_FFFF
+NOT_A_FILE = 0xFEFE_FEFE_FEFE_FEFE  # x=0 (A列) を除く
+NOT_H_FILE = 0x7F7F_7F7F_7F7F_7F7F  # x=7 (H列) を除く
+
+# (シフト量, シフト後に掛けるマスク)。正は左シフト、負は右シフト。
+# 左右方向の移動では列の折り返しをマスクで消す。
+SHIFTS: List[Tuple[int, int]] = [
+    (-9, NOT_H_FILE), (-8, MASK64), (-7, NOT_A_FILE),
+    (-1, NOT_H_FILE),               ( 1, NOT_A_FILE),
+    ( 7, NOT_H_FILE), ( 8, MASK64), ( 9, NOT_A_FILE),
+]
+
+def _build_rays() -> List[Tuple[Tuple[int, bool], ...]]:
+    """RAYS[sq] = ((半直線のマスク, ビット番号が増える向きか), ...)。長さ 2 未満の半直線は挟めないので除く。"""
+    rays = []
+    for sq in range(SIZE * SIZE):
+        x, y = sq % SIZE, sq // SIZE
+        out = []
+        for dx, dy in [(1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (-1, 1), (1, -1), (-1, -1)]:
+            ray, n = 0, 0
+            i, j = x + dx, y + dy
+            while 0 <= i < SIZE and 0 <= j < SIZE:
+                ray |= 1 << (j * SIZE + i)
+                n += 1
+                i += dx
+                j += dy
+            if n >= 2:
+                out.append((ray, dy * SIZE + dx > 0))
+        rays.append(tuple(out))
+    return rays
+
+RAYS = _build_rays()
+
+try:
+    popcount = int.bit_count  # Python 3.10+
+except AttributeError:  # pragma: no cover - 古い Python 向け
+    def popcount(b: int) -> int:
+        return bin(b).count("1")
+
+# ----------------------------- Conversion ----------------------------------
+
+def xy_to_sq(x: int, y: int) -> int:
+    return y * SIZE + x
+
+def sq_to_xy(sq: int) -> Tuple[int, int]:
+    return sq & 7, sq >> 3
+
+COORD_A = "ABCDEFGH"
+
+def sq_to_name(sq: int) -> str:
+    """マス番号 → 'A1'..'H8'。"""
+    return f"{COORD_A[sq & 7]}{(sq >> 3) + 1}"
+
+def name_to_sq(name: str) -> int:
+    """'A1'..'H8'（大文字小文字どちらでも）→ マス番号。"""
+    return xy_to_sq(COORD_A.index(name[0].upper()), int(name[1]) - 1)
+
+_ROW_BITS: Dict[Tuple[int, ...], Tuple[int, int]] = {}  # 1 段分の (black, white) バイト（最大 3^8 通り）
+
+def _row_bits(row: Tuple[int, ...]) -> Tuple[int, int]:
+    black = white = 0
+    for x, v in enumerate(row):
+        if v == BLACK:
+            black |= 1 << x
+        elif v == WHITE:
+            white |= 1 << x
+    _ROW_BITS[row] = (black, white)
+    return black, white
+
+def from_board(board: List[List[int]]) -> Tuple[int, int]:
+    """リスト盤面 → (black, white) のビットボード。"""
+    black = white = 0
+    shift = 0
+    for row in board:
+        key = tuple(row)
+        b, w = _ROW_BITS.get(key) or _row_bits(key)
+        black |= b << shift
+        white |= w << shift
+        shift += SIZE
+    return black, white
+
+def to_board(black: int, white: int) -> List[List[int]]:
+    """(black, white) のビットボード → リスト盤面。"""
+    board = []
+    bit = 1
+    for _ in range(SIZE):
+        row = []
+        for _ in range(SIZE):
+            row.append(BLACK if black & bit else WHITE if white & bit else EMPTY)
+            bit <<= 1
+        board.append(row)
+    return board
+
+def split(black: int, white: int, color: int) -> Tuple[int, int]:
+    """手番色から見た (me, opp) を返す。"""
+    return (black, white) if color == BLACK else (white, black)
+
+def iter_bits(b: int) -> Iterator[int]:
+    """立っているビットのマス番号を小さい順に返す。"""
+    while b:
+        low = b & -b
+        yield low.bit_length() - 1
+        b ^= low
+
+# ----------------------------- Move generation ------------------------------
+
+def legal_moves_bb(me: int, opp: int) -> int:
+    """手番側 me の合法手をビット集合で返す。
+
+    端の列・段の相手石は挟まれないので先に落としておく（pre）と、シフトのたびに列の折り返しを
+    マスクしなくてよい。各方向とも連続する相手石を 1, 1, 2, 2 個ずつ伸ばして最大 6 個までたどる。
+    左右・上下・斜め 2 方向 × 正負を展開して書いている（ループより 2 割ほど速い）。
+    """
+    moves = 0
+    pre = opp & 0x7E7E_7E7E_7E7E_7E7E  # 左右
+    pre2 = pre & (pre << 1)
+    t = pre & (me << 1)
+    t |= pre & (t << 1)
+    t |= pre2 & (t << 2)
+    t |= pre2 & (t << 2)
+    moves |= t << 1
+    pre2 = pre & (pre >> 1)
+    t = pre & (me >> 1)
+    t |= pre & (t >> 1)
+    t |= pre2 & (t >> 2)
+    t |= pre2 & (t >> 2)
+    moves |= t >> 1
+    pre = opp & 0x00FF_FFFF_FFFF_FF00  # 上下
+    pre2 = pre & (pre << 8)
+    t = pre & (me << 8)
+    t |= pre & (t << 8)
+    t |= pre2 & (t << 16)
+    t |= pre2 & (t << 16)
+    moves |= t << 8
+    pre2 = pre & (pre >> 8)
+    t = pre & (me >> 8)
+    t |= pre & (t >> 8)
+    t |= pre2 & (t >> 16)
+    t |= pre2 & (t >> 16)
+    moves |= t >> 8
+    pre = opp & 0x007E_7E7E_7E7E_7E00  # 斜め
+    pre2 = pre & (pre << 7)
+    t = pre & (me << 7)
+    t |= pre & (t << 7)
+    t |= pre2 & (t << 14)
+    t |= pre2 & (t << 14)
+    moves |= t << 7
+    pre2 = pre & (pre >> 7)
+    t = pre & (me >> 7)
+    t |= pre & (t >> 7)
+    t |= pre2 & (t >> 14)
+    t |= pre2 & (t >> 14)
+    moves |= t >> 7
+    pre2 = pre & (pre << 9)
+    t = pre & (me << 9)
+    t |= pre & (t << 9)
+    t |= pre2 & (t << 18)
+    t |= pre2 & (t << 18)
+    moves |= t << 9
+    pre2 = pre & (pre >> 9)
+    t = pre & (me >> 9)
+    t |= pre & (t >> 9)
+    t |= pre2 & (t >> 18)
+    t |= pre2 & (t >> 18)
+    moves |= t >> 9
+    return moves & ~(me | opp) & MASK64
+
+def flips_bb(me: int, opp: int, sq: int) -> int:
+    """マス sq に打ったとき反転する相手石のビット集合（非合法なら 0）。"""
+    if ((me | opp) >> sq) & 1:
+        return 0
+    flips = 0
+    for ray, up in RAYS[sq]:
+        blockers = ray & ~opp  # 半直線上の相手石でないマス。sq に一番近いものが自石なら挟める
+        if up:
+            b = blockers & -blockers
+            if b & me:
+                flips |= ray & (b - 1)
+        elif blockers:
+            b = 1 << (blockers.bit_length() - 1)
+            if b & me:
+                flips |= ray & -(b << 1)
+    return flips
+
+def play(me: int, opp: int, sq: int) -> Tuple[int, int, int]:
+    """sq に着手した後の (me, opp, flips) を返す。flips==0 なら非合法。"""
+    f = flips_bb(me, opp, sq)
+    if not f:
+        return me, opp, 0
+    return me | f | (1 << sq), opp & ~f, f
+
+# ----------------------------- Symmetry ------------------------------------
+
+def flip_vertical(b: int) -> int:
+    """上下反転 (x, y) → (x, 7-y)。"""
+    return int.from_bytes(b.to_bytes(8, "little"), "big")
+
+def mirror_horizontal(b: int) -> int:
+    """左右反転 (x, y) → (7-x, y)。"""
+    b = ((b >> 1) & 0x5555_5555_5555_5555) | ((b & 0x5555_5555_5555_5555) << 1)
+    b = ((b >> 2) & 0x3333_3333_3333_3333) | ((b & 0x3333_3333_3333_3333) << 2)
+    b = ((b >> 4) & 0x0F0F_0F0F_0F0F_0F0F) | ((b & 0x0F0F_0F0F_0F0F_0F0F) << 4)
+    return b
+
+def transpose(b: int) -> int:
+    """対角線 A1-H8 で反転 (x, y) → (y, x)。"""
+    t = 0x0F0F_0F0F_0000_0000 & (b ^ (b << 28))
+    b ^= t ^ (t >> 28)
+    t = 0x3333_0000_3333_0000 & (b ^ (b << 14))
+    b ^= t ^ (t >> 14)
+    t = 0x5500_5500_5500_5500 & (b ^ (b << 7))
+    b ^= t ^ (t >> 7)
+    return b & MASK64
+
+def symmetry(b: int, s: int) -> int:
+    """8 通りの対称変換 s (0..7) を適用する。bit0=左右, bit1=上下, bit2=転置。"""
+    if s & 1:
+        b = mirror_horizontal(b)
+    if s & 2:
+        b = flip_vertical(b)
+    if s & 4:
+        b = transpose(b)
+    return b
+
+def canonical(me: int, opp: int) -> Tuple[int, int, int]:
+    """8 通りの対称形のうち (me, opp) が最小のものと、その変換番号を返す。"""
+    best = (me, opp, 0)
+    for s in range(1, 8):
+        cand = (symmetry(me, s), symmetry(opp, s), s)
+        if cand < best:
+            best = cand
+    return best
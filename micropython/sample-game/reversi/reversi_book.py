@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Reversi opening book: 対称形で正規化した局面 → 着手の統計を持つ定石ファイル。
+
+ファイル形式（リトルエンディアン）:
+  ヘッダ  : magic 'RVBK', version(u16), record_size(u16), count(u32)
+  レコード: me(u64), opp(u64), move(u8), games(u32), points(u32) を (me, opp, move) の昇順で count 個
+    - me/opp は手番側/相手側の石。8 通りの対称形のうち最小のもの
+    - points は手番側から見た勝ち点の 2 倍（勝ち=2, 引き分け=1）
+起動時に mmap して二分探索で引くので、ファイル全体は読み込まない。
+
+使い方:
+  # ローカル探索同士の自己対局ログ（1 行 1 局 'F5D6C3...'）を作る
+  python3 reversi_book.py selfplay -n 200 -o selfplay.txt
+  # ログから定石ファイルを作る（既存の reversi_book.bin があれば追記・集計）
+  python3 reversi_book.py build selfplay.txt -o reversi_book.bin --plies 16
+"""
+from __future__ import annotations
+import argparse
+import mmap
+import os
+import random
+import struct
+import sys
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from reversi_bitboard import (
+    BLACK, from_board, iter_bits, legal_moves_bb, name_to_sq, play, popcount,
+    sq_to_name, symmetry,
+)
+
+MAGIC = b"RVBK"
+VERSION = 1
+HEADER = struct.Struct("<4sHHI")
+RECORD = struct.Struct("<QQBII")
+DEFAULT_BOOK = os.path.join(os.path.dirname(os.path.abspath(__file__)), "reversi_book.bin")
+
+Key = Tuple[int, int, int]  # 正規化した (me, opp, move)
+
+def initial_position() -> Tuple[int, int]:
+    """初期局面の (black, white)。"""
+    board = [[0] * 8 for _ in range(8)]
+    board[3][3] = board[4][4] = -1
+    board[3][4] = board[4][3] = 1
+    return from_board(board)
+
+def canonical_move(me: int, opp: int, sq: int) -> Key:
+    """局面と着手をまとめて正規化する（対称な局面でも同じ手は同じキーになる）。"""
+    return min((symmetry(me, s), symmetry(opp, s), symmetry(1 << sq, s).bit_length() - 1) for s in range(8))
+
+def parse_moves(text: str) -> List[int]:
+    """'F5D6C3...' → マス番号のリスト（パスは書かない）。"""
+    text = text.strip()
+    if len(text) % 2:
+        raise ValueError(f"棋譜の長さが不正です: {text!r}")
+    return [name_to_sq(text[i:i+2]) for i in range(0, len(text), 2)]
+
+def replay(moves: Iterable[int]) -> Iterator[Tuple[int, int, int, int]]:
+    """着手列を再生し、各手について (me, opp, sq, color) を返す。非合法手は ValueError。"""
+    black, white = initial_position()
+    color = BLACK
+    for sq in moves:
+        me, opp = (black, white) if color == BLACK else (white, black)
+        if not legal_moves_bb(me, opp):
+            color = -color  # パス
+            me, opp = opp, me
+        if not (legal_moves_bb(me, opp) >> sq) & 1:
+            raise ValueError(f"非合法手: {sq_to_name(sq)}")
+        yield me, opp, sq, color
+        me, opp, _ = play(me, opp, sq)
+        black, white = (me, opp) if color == BLACK else (opp, me)
+        color = -color
+
+def final_position(moves: Iterable[int]) -> Tuple[int, int]:
+    """着手列を最後まで再生した (black, white)。"""
+    black, white = initial_position()
+    for me, opp, sq, color in replay(moves):
+        me, opp, _ = play(me, opp, sq)
+        black, white = (me, opp) if color == BLACK else (opp, me)
+    return black, white
+
+# ------------------------------ Reading ------------------------------------
+
+@dataclass
+class BookMove:
+    sq: int          # 実際の局面でのマス番号
+    games: int
+    win_rate: float  # 手番側から見た勝率（引き分けは 0.5）
+
+    @property
+    def name(self) -> str:
+        return sq_to_name(self.sq)
+
+class OpeningBook:
+    def __init__(self, path: Optional[str] = DEFAULT_BOOK, min_games: int = 1):
+        self.path = path
+        self.min_games = min_games
+        self.count = 0
+        self._mm: Optional[mmap.mmap] = None
+        if path and os.path.exists(path) and os.path.getsize(path) > HEADER.size:
+            with open(path, "rb") as f:
+                self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, rsize, count = HEADER.unpack_from(self._mm, 0)
+            if magic != MAGIC or version != VERSION or rsize != RECORD.size:
+                self.close()
+                raise ValueError(f"定石ファイルの形式が不正です: {path}")
+            self.count = count
+
+    def __len__(self) -> int:
+        return self.count
+
+    def close(self):
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        self.count = 0
+
+    def _record(self, i: int) -> Tuple[int, int, int, int, int]:
+        return RECORD.unpack_from(self._mm, HEADER.size + i * RECORD.size)
+
+    def _records_for(self, me: int, opp: int) -> List[Tuple[int, int, int]]:
+        """正規化済みの (me, opp) のレコード [(move, games, points), ...]。"""
+        lo, hi = 0, self.count
+        key = (me, opp)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._record(mid)[:2] < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        out = []
+        while lo < self.count:
+            r_me, r_opp, move, games, points = self._record(lo)
+            if (r_me, r_opp) != key:
+                break
+            out.append((move, games, points))
+            lo += 1
+        return out
+
+    def lookup_all(self, me: int, opp: int) -> List[BookMove]:
+        """me の手番で定石にある合法手を、勝率→対局数の順に返す。"""
+        if not self.count:
+            return []
+        moves = legal_moves_bb(me, opp)
+        if not moves:
+            return []
+        cme, copp, _ = canonical_move(me, opp, next(iter_bits(moves)))
+        stats = {move: (games, points) for move, games, points in self._records_for(cme, copp)}
+        if not stats:
+            return []
+        found = []
+        for sq in iter_bits(moves):
+            games, points = stats.get(canonical_move(me, opp, sq)[2], (0, 0))
+            if games >= self.min_games:
+                found.append(BookMove(sq=sq, games=games, win_rate=points / (2 * games)))
+        found.sort(key=lambda m: (m.win_rate, m.games), reverse=True)
+        return found
+
+    def lookup(self, me: int, opp: int) -> Optional[BookMove]:
+        found = self.lookup_all(me, opp)
+        return found[0] if found else None
+
+# ------------------------------ Building -----------------------------------
+
+def read_book(path: str) -> Dict[Key, List[int]]:
+    """既存の定石ファイルを {(me, opp, move): [games, points]} に読み込む（追記用）。"""
+    book = OpeningBook(path)
+    stats = {}
+    for i in range(len(book)):
+        me, opp, move, games, points = book._record(i)
+        stats[(me, opp, move)] = [games, points]
+    book.close()
+    return stats
+
+def add_games(stats: Dict[Key, List[int]], lines: Iterable[str], max_plies: int) -> Tuple[int, int]:
+    """棋譜行を集計に加える。(取り込んだ局数, スキップした局数) を返す。"""
+    added = skipped = 0
+    for line in lines:
+        line = line.split("#", 1)[0].strip()
+        if not line:
+            continue
+        try:
+            moves = parse_moves(line.split()[0])
+            plies = list(replay(moves))
+            black, white = final_position(moves)
+        except ValueError as e:
+            print(f"skip: {e}", file=sys.stderr)
+            skipped += 1
+            continue
+        diff = popcount(black) - popcount(white)
+        for me, opp, sq, color in plies[:max_plies]:
+            mover_diff = diff if color == BLACK else -diff
+            entry = stats.setdefault(canonical_move(me, opp, sq), [0, 0])
+            entry[0] += 1
+            entry[1] += 2 if mover_diff > 0 else 1 if mover_diff == 0 else 0
+        added += 1
+    return added, skipped
+
+def write_book(path: str, stats: Dict[Key, List[int]]):
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, RECORD.size, len(stats)))
+        for (me, opp, move), (games, points) in sorted(stats.items()):
+            f.write(RECORD.pack(me, opp, move, games, points))
+    os.replace(tmp, path)
+
+# ------------------------------ Self-play ----------------------------------
+
+def selfplay_game(time_limit: float, random_plies: int, rng: random.Random) -> List[int]:
+    """ローカル探索同士で 1 局打ち、着手列を返す。序盤 random_plies 手はランダム。"""
+    from reversi_search import AlphaBetaSearcher
+    searchers = {BLACK: AlphaBetaSearcher(), -BLACK: AlphaBetaSearcher()}
+    black, white = initial_position()
+    color = BLACK
+    moves: List[int] = []
+    while True:
+        me, opp = (black, white) if color == BLACK else (white, black)
+        legal = legal_moves_bb(me, opp)
+        if not legal:
+            if not legal_moves_bb(opp, me):
+                return moves
+            color = -color
+            continue
+        if len(moves) < random_plies:
+            sq = rng.choice(list(iter_bits(legal)))
+        else:
+            x, y = searchers[color].search(me, opp, time_limit, color=color).move
+            sq = y * 8 + x
+        moves.append(sq)
+        me, opp, _ = play(me, opp, sq)
+        black, white = (me, opp) if color == BLACK else (opp, me)
+        color = -color
+
+def main(argv: Optional[List[str]] = None):
+    ap = argparse.ArgumentParser(description="Reversi opening book builder")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    sp = sub.add_parser("selfplay", help="ローカル探索同士の自己対局ログを作る")
+    sp.add_argument("-n", "--games", type=int, default=100)
+    sp.add_argument("-t", "--time", type=float, default=0.1, help="1手あたりの探索時間（秒）")
+    sp.add_argument("--random-plies", type=int, default=4, help="序盤にランダムに打つ手数")
+    sp.add_argument("--seed", type=int, default=None)
+    sp.add_argument("-o", "--output", default="-", help="出力先（'-' で標準出力、既存ファイルには追記）")
+    bp = sub.add_parser("build", help="自己対局ログから定石ファイルを作る／追記する")
+    bp.add_argument("logs", nargs="+", help="1 行 1 局の棋譜ファイル（'-' で標準入力）")
+    bp.add_argument("-o", "--output", default=DEFAULT_BOOK)
+    bp.add_argument("--plies", type=int, default=16, help="各局の先頭から取り込む手数")
+    bp.add_argument("--new", action="store_true", help="既存の定石ファイルに追記せず作り直す")
+    args = ap.parse_args(argv)
+
+    if args.cmd == "selfplay":
+        rng = random.Random(args.seed)
+        out = sys.stdout if args.output == "-" else open(args.output, "a")
+        try:
+            for i in range(args.games):
+                out.write("".join(sq_to_name(sq) for sq in selfplay_game(args.time, args.random_plies, rng)) + "\n")
+                out.flush()
+                print(f"selfplay {i + 1}/{args.games}", file=sys.stderr)
+        finally:
+            if out is not sys.stdout:
+                out.close()
+        return
+
+    stats = {} if args.new or not os.path.exists(args.output) else read_book(args.output)
+    before = len(stats)
+    added = skipped = 0
+    for path in args.logs:
+        f = sys.stdin if path == "-" else open(path)
+        try:
+            a, s = add_games(stats, f, args.plies)
+        finally:
+            if f is not sys.stdin:
+                f.close()
+        added += a
+        skipped += s
+    write_book(args.output, stats)
+    print(f"{args.output}: {added} games added, {skipped} skipped, "
+          f"{before} -> {len(stats)} entries ({os.path.getsize(args.output)} bytes)")
+
+if __name__ == "__main__":
+    main()
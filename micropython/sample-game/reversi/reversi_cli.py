@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Reversi headless CLI: GUI なしで AI 同士を対戦させ、結果を JSON で出す。
+
+プレイヤー指定:
+  greedy            : best_legal_move（1手先グリーディ）
+  search:d4         : alpha-beta 探索 深さ 4（置換表あり）
+  search:0.2s       : alpha-beta 探索 1手 0.2 秒
+  search:d6,0.5s    : 深さ 6 まで・1手 0.5 秒まで
+  search:d4,pattern : 評価にパターン表（reversi_pattern.bin。別のファイルなら pattern=<file>）を使う
+  engine            : ChatGPTOthello のローカルAI（定石＋探索＋完全読み。OTHELLO_* 環境変数に従う）
+  llm:<file.jsonl>  : 記録済みの ChatGPT 応答（OTHELLO_LLM_LOG）を再生。記録に無い局面は greedy
+
+使い方:
+  python3 reversi_cli.py match greedy search:d4 -n 20 -j 4
+  python3 reversi_cli.py match search:0.1s search:d3 -n 100 --random-plies 4 -o result.json
+"""
+from __future__ import annotations
+import argparse
+import contextlib
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+import reversi_bitboard as bb
+from reversi_engine import (
+    BLACK, EMPTY, SIZE, WHITE, ChatGPTOthello, apply_move, best_legal_move, initial_board,
+    legal_moves, score,
+)
+from reversi_pattern import DEFAULT_WEIGHTS, PatternEvaluator
+from reversi_search import AlphaBetaSearcher
+
+Move = Optional[Tuple[int, int]]
+
+# ------------------------------- Players -----------------------------------
+
+class GreedyPlayer:
+    def new_game(self):
+        pass
+
+    def choose(self, board: List[List[int]], color: int) -> Tuple[Move, int]:
+        return best_legal_move(board, color), 0
+
+class SearchPlayer:
+    def __init__(self, depth: Optional[int] = None, time_limit: Optional[float] = None,
+                 pattern: Optional[str] = None):
+        self.depth = depth or SIZE * SIZE
+        self.time_limit = time_limit if time_limit is not None else float("inf")
+        self.searcher = AlphaBetaSearcher(evaluator=load_pattern(pattern) if pattern else None)
+
+    def new_game(self):
+        self.searcher.new_game()
+
+    def choose(self, board: List[List[int]], color: int) -> Tuple[Move, int]:
+        me, opp = bb.split(*bb.from_board(board), color)
+        res = self.searcher.search(me, opp, self.time_limit, self.depth, color)
+        return res.move, res.nodes
+
+class EnginePlayer:
+    def __init__(self):
+        self.ai = ChatGPTOthello()
+        self.ai.enabled = False  # 対戦計測ではAPIを使わない
+
+    def new_game(self):
+        self.ai.new_game()
+
+    def choose(self, board: List[List[int]], color: int) -> Tuple[Move, int]:
+        self.ai.searcher.nodes = self.ai.solver.nodes = 0
+        with contextlib.redirect_stdout(sys.stderr):  # デバッグ出力で JSON を汚さない
+            mv = ChatGPTOthello.from_notation(self.ai.choose(board, color)["move"])
+        return mv, self.ai.searcher.nodes + self.ai.solver.nodes
+
+@lru_cache(maxsize=None)
+def load_pattern(path: str) -> PatternEvaluator:
+    return PatternEvaluator.load(path)
+
+@lru_cache(maxsize=None)
+def load_llm_replies(path: str) -> Dict[Tuple[int, int, int], str]:
+    """OTHELLO_LLM_LOG の記録 → {(black, white, color): 'C4'}。"""
+    replies = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            rec = json.loads(line)
+            rows = rec["board"]  # 8 段目が先頭
+            board = [[BLACK if ch == "B" else WHITE if ch == "W" else EMPTY for ch in rows[SIZE - 1 - y]]
+                     for y in range(SIZE)]
+            color = BLACK if rec["color"] == "B" else WHITE
+            replies[(*bb.from_board(board), color)] = rec["move"]
+    return replies
+
+class RecordedLLMPlayer:
+    def __init__(self, path: str):
+        self.replies = load_llm_replies(path)
+        self.hits = 0
+        self.misses = 0
+
+    def new_game(self):
+        pass
+
+    def choose(self, board: List[List[int]], color: int) -> Tuple[Move, int]:
+        name = self.replies.get((*bb.from_board(board), color))
+        mv = ChatGPTOthello.from_notation(name) if name else None
+        if mv is not None and mv in legal_moves(board, color):
+            self.hits += 1
+            return mv, 0
+        self.misses += 1
+        return best_legal_move(board, color), 0
+
+def make_player(spec: str):
+    kind, _, arg = spec.partition(":")
+    if kind == "greedy":
+        return GreedyPlayer()
+    if kind == "engine":
+        return EnginePlayer()
+    if kind == "llm":
+        return RecordedLLMPlayer(arg)
+    if kind == "search":
+        depth, time_limit, pattern = None, None, None
+        for part in filter(None, arg.split(",")):
+            if part == "pattern" or part.startswith("pattern="):
+                pattern = part.partition("=")[2] or DEFAULT_WEIGHTS
+            elif part.startswith("d"):
+                depth = int(part[1:])
+            elif part.endswith("s"):
+                time_limit = float(part[:-1])
+            else:
+                raise ValueError(f"search の指定が不正です: {spec!r}")
+        if depth is None and time_limit is None:
+            time_limit = 1.0
+        return SearchPlayer(depth, time_limit, pattern)
+    raise ValueError(f"不明なプレイヤー指定: {spec!r}")
+
+# -------------------------------- Match ------------------------------------
+
+def play_game(spec_a: str, spec_b: str, a_is_black: bool, seed: int, random_plies: int) -> Dict[str, Any]:
+    """1 局打って A/B それぞれの統計を返す（プロセスプールから呼ばれる）。"""
+    rng = random.Random(seed)
+    players = {"A": make_player(spec_a), "B": make_player(spec_b)}
+    side = {BLACK: "A" if a_is_black else "B", WHITE: "B" if a_is_black else "A"}
+    stats = {k: {"moves": 0, "time": 0.0, "nodes": 0} for k in players}
+    for p in players.values():
+        p.new_game()
+    board, color, ply = initial_board(), BLACK, 0
+    while True:
+        moves = legal_moves(board, color)
+        if not moves:
+            if not legal_moves(board, -color):
+                break
+            color = -color
+            continue
+        if ply < random_plies:
+            mv = rng.choice(moves)
+        else:
+            who = side[color]
+            t0 = time.perf_counter()
+            mv, nodes = players[who].choose(board, color)
+            stats[who]["time"] += time.perf_counter() - t0
+            stats[who]["moves"] += 1
+            stats[who]["nodes"] += nodes
+            if mv not in moves:
+                raise RuntimeError(f"{who} ({spec_a if who == 'A' else spec_b}) が非合法手 {mv} を返しました")
+        board = apply_move(board, mv[0], mv[1], color).board
+        color = -color
+        ply += 1
+    b, w = score(board)
+    diff_a = (b - w) if a_is_black else (w - b)
+    return {"diff_a": diff_a, "stats": stats}
+
+def run_match(spec_a: str, spec_b: str, games: int, jobs: int, seed: int, random_plies: int) -> Dict[str, Any]:
+    # 先後は交互。同じ seed の 2 局は同じランダム序盤を先後入れ替えて打つ
+    tasks = [(spec_a, spec_b, i % 2 == 0, seed + i // 2, random_plies) for i in range(games)]
+    t0 = time.perf_counter()
+    if jobs > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(play_game, *zip(*tasks)))
+    else:
+        results = [play_game(*t) for t in tasks]
+    elapsed = time.perf_counter() - t0
+
+    wins_a = sum(r["diff_a"] > 0 for r in results)
+    wins_b = sum(r["diff_a"] < 0 for r in results)
+    draws = games - wins_a - wins_b
+    report: Dict[str, Any] = {"games": games, "draws": draws, "random_plies": random_plies,
+                              "avg_disc_diff_a": sum(r["diff_a"] for r in results) / games if games else 0.0,
+                              "elapsed_s": round(elapsed, 3), "players": {}}
+    for key, spec, wins in (("A", spec_a, wins_a), ("B", spec_b, wins_b)):
+        moves = sum(r["stats"][key]["moves"] for r in results)
+        secs = sum(r["stats"][key]["time"] for r in results)
+        nodes = sum(r["stats"][key]["nodes"] for r in results)
+        report["players"][key] = {
+            "spec": spec,
+            "wins": wins,
+            "win_rate": (wins + 0.5 * draws) / games if games else 0.0,
+            "moves": moves,
+            "avg_move_ms": 1000 * secs / moves if moves else 0.0,
+            "nodes": nodes,
+            "nps": nodes / secs if nodes and secs else None,
+        }
+    return report
+
+def main(argv: Optional[List[str]] = None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    mp = sub.add_parser("match", help="2 つのプレイヤーを N 局対戦させる")
+    mp.add_argument("a", help="プレイヤー A の指定")
+    mp.add_argument("b", help="プレイヤー B の指定")
+    mp.add_argument("-n", "--games", type=int, default=10)
+    mp.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1, help="並列プロセス数")
+    mp.add_argument("--random-plies", type=int, default=2, help="序盤にランダムに打つ手数（対局のばらつき用）")
+    mp.add_argument("--seed", type=int, default=0)
+    mp.add_argument("-o", "--output", default="-", help="JSON の出力先（'-' で標準出力）")
+    args = ap.parse_args(argv)
+
+    if args.cmd == "match":
+        for spec in (args.a, args.b):
+            make_player(spec)  # 指定ミスは対局前に落とす
+        report = run_match(args.a, args.b, args.games, args.jobs, args.seed, args.random_plies)
+        text = json.dumps(report, ensure_ascii=False, indent=2)
+        if args.output == "-":
+            print(text)
+        else:
+            with open(args.output, "w", encoding="utf-8") as f:
+                f.write(text + "\n")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Reversi endgame solver: 残り空きマスが少ない局面を最後まで読み切る完全読み。
+
+- 返す値は終局時の石差（手番側 - 相手側）。正なら勝ち、0 は引き分け。
+  wld=True なら窓 (-1, 1) で勝ち/負け/引き分けだけを判定する（石差は不正確だが速い）。
+- 着手順序:
+  * 空きが多いうちは fastest-first（打った後の相手の合法手数が少ない順）
+  * 空きが少なくなったらパリティ順（空きが奇数個の象限を優先）
+- time_limit を超えるか stop がセットされたら SearchTimeout を投げるので、呼び出し側は
+  通常探索にフォールバックする。
+"""
+from __future__ import annotations
+import threading
+import time
+from typing import List, Optional, Tuple
+
+from reversi_bitboard import MASK64, flips_bb, iter_bits, legal_moves_bb, popcount, sq_to_xy
+from reversi_search import INF, TIME_CHECK_MASK, SearchResult, SearchTimeout
+
+# 4x4 の象限（パリティ判定用）
+QUADRANTS = [0x0000_0000_0F0F_0F0F, 0x0000_0000_F0F0_F0F0,
+             0x0F0F_0F0F_0000_0000, 0xF0F0_F0F0_0000_0000]
+FASTEST_FIRST_EMPTIES = 7  # これより空きが多いノードでは fastest-first で並べる
+
+def odd_regions(empty: int) -> int:
+    """空きが奇数個の象限をまとめたマスク。"""
+    mask = 0
+    for q in QUADRANTS:
+        if popcount(empty & q) & 1:
+            mask |= q
+    return mask
+
+class EndgameSolver:
+    def __init__(self):
+        self.nodes = 0
+        self.deadline: Optional[float] = None
+        self.stop: Optional[threading.Event] = None  # セットされたら探索を打ち切る（先読みの中断用）
+
+    def _out_of_time(self) -> bool:
+        return ((self.deadline is not None and time.perf_counter() > self.deadline)
+                or (self.stop is not None and self.stop.is_set()))
+
+    def solve(self, me: int, opp: int, time_limit: Optional[float] = None, wld: bool = False,
+              stop: Optional[threading.Event] = None) -> SearchResult:
+        """me の手番の局面を完全読みする。score は最善応手での最終石差（wld なら符号のみ有効）。"""
+        t0 = time.perf_counter()
+        self.nodes = 0
+        self.stop = stop
+        self.deadline = t0 + time_limit if time_limit is not None else None
+        empties = popcount(~(me | opp) & MASK64)
+        alpha, beta = (-1, 1) if wld else (-INF, INF)
+        try:
+            moves = legal_moves_bb(me, opp)
+            if not moves:
+                # ルートでのパスは呼び出し側で扱う。石差だけ返す。
+                score = -self._solve(opp, me, -beta, -alpha, False) if legal_moves_bb(opp, me) else popcount(me) - popcount(opp)
+                return SearchResult(move=None, score=score, depth=empties, nodes=self.nodes,
+                                    elapsed=time.perf_counter() - t0, exact=True, wld=wld)
+            best, best_sq = -INF, -1
+            for sq, nme, nopp in self._ordered(me, opp, moves):
+                v = -self._solve(nopp, nme, -beta, -alpha, False)
+                if v > best:
+                    best, best_sq = v, sq
+                    if v > alpha:
+                        alpha = v
+                        if alpha >= beta:
+                            break
+        finally:
+            self.deadline = None
+            self.stop = None
+        return SearchResult(move=sq_to_xy(best_sq), score=best, depth=empties, nodes=self.nodes,
+                            elapsed=time.perf_counter() - t0, exact=True, wld=wld)
+
+    def _ordered(self, me: int, opp: int, moves: int) -> List[Tuple[int, int, int]]:
+        """(sq, 着手後の me, 着手後の opp) を探索順に並べて返す。"""
+        empty = ~(me | opp) & MASK64
+        odd = odd_regions(empty)
+        children = []
+        if popcount(empty) > FASTEST_FIRST_EMPTIES:
+            for sq in iter_bits(moves):
+                f = flips_bb(me, opp, sq)
+                nme, nopp = me | f | (1 << sq), opp ^ f
+                key = popcount(legal_moves_bb(nopp, nme)) * 2 + (0 if (odd >> sq) & 1 else 1)
+                children.append((key, sq, nme, nopp))
+        else:
+            for sq in iter_bits(moves):
+                f = flips_bb(me, opp, sq)
+                children.append((0 if (odd >> sq) & 1 else 1, sq, me | f | (1 << sq), opp ^ f))
+        children.sort()
+        return [c[1:] for c in children]
+
+    def _solve(self, me: int, opp: int, alpha: int, beta: int, passed: bool) -> int:
+        self.nodes += 1
+        if not (self.nodes & TIME_CHECK_MASK) and self._out_of_time():
+            raise SearchTimeout()
+        moves = legal_moves_bb(me, opp)
+        if not moves:
+            if passed:
+                return popcount(me) - popcount(opp)  # 両者パス = 終局
+            return -self._solve(opp, me, -beta, -alpha, True)
+        best = -INF
+        for _, nme, nopp in self._ordered(me, opp, moves):
+            v = -self._solve(nopp, nme, -beta, -alpha, False)
+            if v > best:
+                best = v
+                if v > alpha:
+                    alpha = v
+                    if alpha >= beta:
+                        break
+        return best
@@ -0,0 +1,531 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Reversi engine: ゲームロジックとAI（GUI なしで import できる部分）。
+- リスト盤面 (List[List[int]], board[y][x]) の API。中身はビットボード (reversi_bitboard)。
+- ChatGPTOthello: 定石 → ChatGPT(API) → ローカルAI（探索・完全読み）の順で着手を決める。
+
+環境変数:
+  OPENAI_API_KEY   : APIキー（省略可）
+  OPENAI_MODEL     : 既定 'gpt-5'
+  OTHELLO_OFFLINE  : '1' でオンライン問い合わせを無効化（強制オフライン）
+  OTHELLO_WORKERS  : ローカルAIの並列探索プロセス数（既定 1 = 並列なし）
+  OTHELLO_SEARCH_TIME : ローカルAIの1手あたりの探索時間（秒, 既定 1.0）
+  OTHELLO_ENDGAME_EMPTIES : 空きがこの数以下なら完全読み（既定 12。+2 までは勝敗読み）
+  OTHELLO_ENDGAME_TIME    : 完全読みの制限時間（秒, 既定 5.0。超えたら通常探索）
+  OTHELLO_EVAL     : ローカル探索のパターン評価表（既定 このファイルと同じ場所の reversi_pattern.bin。
+                     無ければ従来の WEIGHTS＋可動性。'0' で常に従来の評価）
+  OTHELLO_BOOK     : 定石ファイル（既定 このファイルと同じ場所の reversi_book.bin）
+  OTHELLO_PONDER   : '0' であなたの手番中の先読み（オフライン時）を無効化
+  OTHELLO_LLM_LOG  : ChatGPTの応答を JSON Lines で追記するファイル（reversi_cli.py の llm:<file> で再生できる）
+  OTHELLO_LLM_CACHE      : ChatGPTの応答キャッシュ（既定 このファイルと同じ場所の reversi_llm_cache.json。'0' で無効）
+  OTHELLO_LLM_DEADLINE   : ChatGPTとローカル探索を同時に走らせる締め切り（秒, 既定 3.0。'0' で従来どおり API の応答を待つ）
+  OTHELLO_LLM_CACHE_SIZE : 応答キャッシュの最大局面数（既定 5000。古く使われていないものから消す）
+"""
+from __future__ import annotations
+import os
+import json
+import threading
+import time
+from dataclasses import dataclass, replace
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# --- OpenAI の有無を判定（無ければオフライン扱い） ---
+try:
+    from openai import OpenAI  # pip install openai
+    _OPENAI_AVAILABLE = True
+except Exception:
+    _OPENAI_AVAILABLE = False
+    OpenAI = None  # type: ignore
+
+import reversi_bitboard as bb
+from reversi_eval import EVALUATOR, WEIGHTS
+from reversi_search import AlphaBetaSearcher, SearchResult, SearchTimeout, search_best_move
+from reversi_endgame import EndgameSolver
+from reversi_parallel import ParallelSearcher
+from reversi_book import DEFAULT_BOOK, OpeningBook
+from reversi_pattern import load_default as load_pattern_evaluator
+from reversi_llm_cache import DEFAULT_CACHE, DEFAULT_MAX_ENTRIES, LLMResponseCache
+
+# ----------------------------- Game constants ------------------------------
+SIZE = 8
+EMPTY, BLACK, WHITE = 0, 1, -1
+DIRS = [
+    (-1, -1), (0, -1), (1, -1),
+    (-1, 0),           (1, 0),
+    (-1, 1),  (0, 1),  (1, 1)
+]
+
+COORD_A = "ABCDEFGH"
+
+@dataclass
+class MoveResult:
+    board: List[List[int]]
+    flips: List[Tuple[int, int]]
+
+# ----------------------------- Game logic ----------------------------------
+
+def initial_board() -> List[List[int]]:
+    b = [[EMPTY for _ in range(SIZE)] for _ in range(SIZE)]
+    b[3][3] = WHITE
+    b[3][4] = BLACK
+    b[4][3] = BLACK
+    b[4][4] = WHITE
+    return b
+
+def on_board(x: int, y: int) -> bool:
+    return 0 <= x < SIZE and 0 <= y < SIZE
+
+def opponent(c: int) -> int:
+    return -c
+
+def capture_line(board: List[List[int]], x: int, y: int, dx: int, dy: int, color: int) -> List[Tuple[int, int]]:
+    # returns list of opponent discs to flip if placing at (x,y) along dir (dx,dy)
+    line = []
+    i, j = x + dx, y + dy
+    while on_board(i, j) and board[j][i] == opponent(color):
+        line.append((i, j))
+        i += dx
+        j += dy
+    if line and on_board(i, j) and board[j][i] == color:
+        return line
+    return []
+
+def legal_flips(board: List[List[int]], x: int, y: int, color: int) -> List[Tuple[int, int]]:
+    if not on_board(x, y) or board[y][x] != EMPTY:
+        return []
+    me, opp = bb.split(*bb.from_board(board), color)
+    return [bb.sq_to_xy(sq) for sq in bb.iter_bits(bb.flips_bb(me, opp, bb.xy_to_sq(x, y)))]
+
+def legal_moves(board: List[List[int]], color: int) -> List[Tuple[int, int]]:
+    # ビットボードで生成（y, x の昇順 = 従来の走査順と同じ）
+    me, opp = bb.split(*bb.from_board(board), color)
+    return [bb.sq_to_xy(sq) for sq in bb.iter_bits(bb.legal_moves_bb(me, opp))]
+
+def apply_move(board: List[List[int]], x: int, y: int, color: int) -> Optional[MoveResult]:
+    flips = legal_flips(board, x, y, color)
+    if not flips:
+        return None
+    nb = [row[:] for row in board]
+    nb[y][x] = color
+    for (i, j) in flips:
+        nb[j][i] = color
+    return MoveResult(board=nb, flips=flips)
+
+def score(board: List[List[int]]) -> Tuple[int, int]:
+    black, white = bb.from_board(board)
+    return bb.popcount(black), bb.popcount(white)
+
+def game_over(board: List[List[int]]) -> bool:
+    black, white = bb.from_board(board)
+    return not bb.legal_moves_bb(black, white) and not bb.legal_moves_bb(white, black)
+
+# Heuristic evaluation used for fallback AI and tie-breakers
+
+def evaluate(board: List[List[int]], color: int) -> int:
+    # positional weights (WEIGHTS) + mobility heuristic
+    return EVALUATOR.evaluate(*bb.split(*bb.from_board(board), color))
+
+# Simple 1-ply greedy fallback
+
+def best_legal_move(board: List[List[int]], color: int) -> Optional[Tuple[int, int]]:
+    # 各合法手の後の局面を評価器でまとめて評価（盤面のコピーは作らない）
+    best = None
+    best_val = -10**9
+    for sq, val, _ in EVALUATOR.score_moves(*bb.split(*bb.from_board(board), color)):
+        if val > best_val:
+            best_val = val
+            best = bb.sq_to_xy(sq)
+    return best
+
+# ------------------------ OpenAI (ChatGPT) integration ----------------------
+
+class ChatGPTOthello:
+    def __init__(self):
+        # ChatGPT（OpenAI API）が利用可能かどうかをAPIキーのみで判定し、OTHELLO_OFFLINEは無視
+        self.enabled = _OPENAI_AVAILABLE and bool(os.environ.get("OPENAI_API_KEY"))
+        self.model = os.environ.get("OPENAI_MODEL", "gpt-5")
+        self.client = OpenAI() if (self.enabled and OpenAI is not None) else None
+        # ローカルAI（alpha-beta 反復深化）の1手あたりの持ち時間
+        self.search_time = float(os.environ.get("OTHELLO_SEARCH_TIME", "1.0"))
+        # 葉の評価器（学習済みのパターン表があればそれ、無ければ WEIGHTS＋可動性）。候補手一覧と探索で共有
+        self.evaluator = EVALUATOR
+        try:
+            self.evaluator = load_pattern_evaluator() or EVALUATOR
+        except (OSError, ValueError) as e:
+            print(f"[ChatGPTOthello] パターン評価表を読めません: {e}")
+        workers = int(os.environ.get("OTHELLO_WORKERS", "1"))
+        self.searcher = (ParallelSearcher(workers, evaluator=self.evaluator) if workers > 1
+                         else AlphaBetaSearcher(evaluator=self.evaluator))
+        # 終盤の完全読み（空き数で自動切替）。閾値はマシンの速さに合わせて調整する
+        self.endgame_empties = int(os.environ.get("OTHELLO_ENDGAME_EMPTIES", "12"))
+        self.endgame_time = float(os.environ.get("OTHELLO_ENDGAME_TIME", "5.0"))
+        self.solver = EndgameSolver()
+        # 相手の手番中の先読み結果 {(black, white, color): SearchResult}
+        self.ponder_enabled = os.environ.get("OTHELLO_PONDER", "1") != "0"
+        self.ponder_cache: Dict[Tuple[int, int, int], SearchResult] = {}
+        self.llm_log = os.environ.get("OTHELLO_LLM_LOG")
+        # 定石（mmap で開くだけ。無ければ空）
+        try:
+            self.book = OpeningBook(os.environ.get("OTHELLO_BOOK", DEFAULT_BOOK))
+        except (OSError, ValueError) as e:
+            print(f"[ChatGPTOthello] 定石ファイルを読めません: {e}")
+            self.book = OpeningBook(None)
+        # ChatGPT とローカル探索の競争（締め切りまでに合法手を返した ChatGPT を優先）
+        self.llm_deadline = float(os.environ.get("OTHELLO_LLM_DEADLINE", "3.0"))
+        # ChatGPT の応答キャッシュ（同じ局面・対称な局面では API を呼ばない）
+        cache_path = os.environ.get("OTHELLO_LLM_CACHE", DEFAULT_CACHE)
+        cache_size = int(os.environ.get("OTHELLO_LLM_CACHE_SIZE", str(DEFAULT_MAX_ENTRIES)))
+        try:
+            self.llm_cache = LLMResponseCache(None if cache_path == "0" else cache_path, cache_size)
+        except (OSError, ValueError) as e:
+            print(f"[ChatGPTOthello] 応答キャッシュを読めません: {e}")
+            self.llm_cache = LLMResponseCache(None, cache_size)
+        # 応答の記録（llm_log / llm_cache）は競争で打ち切ったスレッドからも来るので、このロックの中で書く
+        self._llm_lock = threading.Lock()
+
+    @staticmethod
+    def to_notation(x: int, y: int) -> str:
+        return f"{COORD_A[x]}{y+1}"
+
+    # クラス変数として定義
+    all_coords = [(x, y) for y in range(SIZE) for x in range(SIZE)]  # for small helpers
+
+    @staticmethod
+    def from_notation(s: str) -> Optional[Tuple[int, int]]:
+        s = s.strip().upper()
+        if s == "PASS":
+            return None
+        if len(s) != 2:
+            return None
+        col, row = s[0], s[1]
+        if col not in COORD_A or row < '1' or row > '8':
+            return None
+        x = COORD_A.index(col)
+        y = int(row) - 1
+        return (x, y)
+
+    @staticmethod
+    def board_as_strings(board: List[List[int]]) -> List[str]:
+        # '.' empty, 'B' black, 'W' white; row 8 at top for readability
+        lines = []
+        for y in range(SIZE-1, -1, -1):  # 7..0 so that display is 8..1 top->bottom
+            row = ''.join('B' if v == BLACK else 'W' if v == WHITE else '.' for v in board[y])
+            lines.append(row)
+        return lines
+
+    @staticmethod
+    def detect_phase(board: List[List[int]]) -> str:
+        empties = sum(1 for row in board for v in row if v == EMPTY)
+        if empties > 40:
+            return "序盤"
+        elif empties > 15:
+            return "中盤"
+        else:
+            return "終盤"
+
+    def _local_candidates(self, board, color, k=3):
+        scored = []
+        for sq, val, _ in self.evaluator.score_moves(*bb.split(*bb.from_board(board), color)):
+            x, y = bb.sq_to_xy(sq)
+            # 簡易ノート
+            note = []
+            if (x, y) in [(0,0),(0,7),(7,0),(7,7)]:
+                note.append("角")
+            elif x in (0,7) or y in (0,7):
+                note.append("辺")
+            scored.append((val, (x, y), " / ".join(note)))
+        scored.sort(reverse=True, key=lambda t: t[0])
+        cands = [{"move": self.to_notation(x, y), "score": val, "note": note} for val, (x, y), note in scored[:k]]
+        analysis = "（ローカルAI）位置評価＋可動性を考慮した1手先グリーディ。角・辺をやや優遇。"
+        return cands, analysis
+
+    def new_game(self):
+        # 置換表はゲーム中の手番をまたいで使い回し、新規ゲームで捨てる
+        self.searcher.new_game()
+        self.ponder_cache.clear()
+
+    def ponder(self, board: List[List[int]], color: int, stop: threading.Event):
+        """相手(color)の手番中に、相手の各合法手の後の局面を探索して ponder_cache に入れる。
+
+        stop がセットされたら途中で抜ける（途中までの結果はキャッシュしない）。
+        置換表を共有するので、choose() と同時には呼ばないこと。
+        """
+        self.ponder_cache.clear()
+        replies = []
+        for (x, y) in legal_moves(board, color):
+            res = apply_move(board, x, y, color)
+            replies.append((evaluate(res.board, color), res.board))
+        replies.sort(key=lambda t: t[0], reverse=True)  # 相手が打ちそうな手から
+        for _, nb in replies:
+            if stop.is_set():
+                return
+            if not legal_moves(nb, opponent(color)):
+                continue
+            res = self._local_search(nb, opponent(color), stop=stop)
+            if stop.is_set():
+                return
+            self.ponder_cache[(*bb.from_board(nb), opponent(color))] = replace(res, pondered=True)
+
+    def _local_search(self, board: List[List[int]], color: int, stop: Optional[threading.Event] = None) -> SearchResult:
+        black, white = bb.from_board(board)
+        cached = self.ponder_cache.get((black, white, color))
+        if cached is not None:
+            print(f"[ChatGPTOthello] ponder hit depth={cached.depth} nodes={cached.nodes}")
+            return cached
+        me, opp = bb.split(black, white, color)
+        empties = SIZE * SIZE - bb.popcount(me | opp)
+        if empties <= self.endgame_empties + 2:
+            wld = empties > self.endgame_empties
+            try:
+                res = self.solver.solve(me, opp, self.endgame_time, wld=wld, stop=stop)
+                print(f"[ChatGPTOthello] endgame solve empties={empties} wld={wld} score={res.score} "
+                      f"nodes={res.nodes} time={res.elapsed:.3f}s")
+                return res
+            except SearchTimeout:
+                print(f"[ChatGPTOthello] endgame solve timeout empties={empties} nodes={self.solver.nodes}")
+        res = search_best_move(board, color, self.search_time, self.searcher, stop=stop)
+        print(f"[ChatGPTOthello] search depth={res.depth} nodes={res.nodes} {self.searcher.tt.stats_text()}")
+        return res
+
+    @staticmethod
+    def search_summary(res: SearchResult) -> str:
+        if res.pondered:
+            return "（先読み済み）" + ChatGPTOthello.search_summary(replace(res, pondered=False))
+        if res.exact:
+            outcome = "勝ち" if res.score > 0 else "負け" if res.score < 0 else "引き分け"
+            value = outcome if res.wld else f"{outcome} (石差 {res.score:+d})"
+            return (f"（ローカルAI）{'勝敗読み' if res.wld else '完全読み'}: 空き {res.depth} / {res.nodes} ノード / "
+                    f"{res.elapsed:.2f}s ({res.nps:,.0f} nps) / {value}")
+        return (f"（ローカルAI）alpha-beta 反復深化: 深さ {res.depth} / {res.nodes} ノード / "
+                f"{res.elapsed:.2f}s ({res.nps:,.0f} nps) / 評価値 {res.score}")
+
+    def _record_llm_reply(self, board: List[List[int]], color: int, move: str, cand: List[Any], analysis: str):
+        rec = {"board": self.board_as_strings(board), "color": "B" if color == BLACK else "W",
+               "model": self.model, "move": move, "candidates": cand, "analysis": analysis}
+        with open(self.llm_log, "a", encoding="utf-8") as f:
+            f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+
+    def build_prompt(self, board: List[List[int]], color: int) -> Dict[str, Any]:
+        legal = legal_moves(board, color)
+        legal_not = [self.to_notation(x, y) for (x, y) in legal]
+        b_lines = self.board_as_strings(board)
+        phase = self.detect_phase(board)
+        who = "白(White)" if color == WHITE else "黒(Black)"
+        instructions = (
+            "あなたはオセロ(Reversi)のコーチ兼対戦相手です。\n"
+            "与えられた盤面と合法手一覧から、あなた(\"{who}\")の着手を1つ選び、"
+            "JSONだけを返してください。違法手は絶対に選ばないでください。\n"
+            "評価では隅(角)・辺・可動性・パリティ・相手にX/Squareを打たせる筋などを考慮し、"
+            "日本語で簡潔に解説してください。合法手が無い場合は move に 'PASS' を設定。".format(who=who)
+        )
+        schema = {
+            "name": "ReversiAdvice",
+            "schema": {
+                "type": "object",
+                "properties": {
+                    "move": {"type": "string", "pattern": "^(?:[A-H][1-8]|PASS)$"},
+                    "candidates": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "move": {"type": "string", "pattern": "^(?:[A-H][1-8]|PASS)$"},
+                                "score": {"type": "number"},
+                                "note": {"type": "string"}
+                            },
+                            "required": ["move"],
+                            "additionalProperties": False
+                        },
+                        "maxItems": 5
+                    },
+                    "analysis": {"type": "string"},
+                    "lookahead": {"type": "string"},
+                    "win_prob": {"type": "number"}
+                },
+                "required": ["move"],
+                "additionalProperties": False
+            }
+        }
+        user_payload = {
+            "role": "user",
+            "content": (
+                "盤面(上から8段目→1段目の順で8行):\n" + "\n".join(b_lines) + "\n\n"+
+                f"手番: {who}\n"+
+                f"局面フェーズ: {phase}\n"+
+                f"合法手一覧: {legal_not if legal_not else '[]'}\n"+
+                "出力は必ず JSON のみ。候補手は最大3つ程度で十分です。\n"
+            )
+        }
+        return {
+            "instructions": instructions,
+            "input": [user_payload],
+            "response_format": {"type": "json_schema", "json_schema": schema},
+            "temperature": 0.2,
+            "max_output_tokens": 500,
+        }
+
+    def _ask_llm(self, board: List[List[int]], color: int, legal_not: set,
+                 timeout: Optional[float] = None, abandoned: Optional[threading.Event] = None,
+                 publish: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """API に 1 回問い合わせる。move は合法手（無ければ候補手の合法手）で、どちらも無ければ None。
+
+        abandoned が立っていたら（競争で締め切りを過ぎて見捨てられた問い合わせ）、応答を記録しない。
+        publish は記録と同じ _llm_lock の中で応答を渡す先（見捨てられていなければ呼ぶ）。
+        """
+        prompt = self.build_prompt(board, color)
+        messages = [
+            {"role": "system", "content": prompt["instructions"]},
+            *prompt["input"]
+        ]
+        kwargs = {"timeout": timeout} if timeout is not None else {}
+        resp = self.client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            temperature=prompt.get("temperature", 0.2),
+            max_tokens=prompt.get("max_output_tokens", 500),
+            **kwargs,
+        )
+        text = resp.choices[0].message.content
+        data = json.loads(text)
+        move = str(data.get("move", "")).upper()
+        cand = data.get("candidates", []) or []
+        analysis = data.get("analysis", "")
+
+        if move not in legal_not and not (move == "PASS" and not legal_not):
+            legal_c = next((c for c in cand if str(c.get("move", "")).upper() in legal_not), None)
+            move = str(legal_c.get("move")).upper() if legal_c else None
+        reply = {"move": move, "candidates": cand, "analysis": analysis}
+        with self._llm_lock:
+            if abandoned is not None and abandoned.is_set():
+                return reply
+            if move is not None:
+                if self.llm_log:
+                    self._record_llm_reply(board, color, move, cand, analysis)
+                me, opp = bb.split(*bb.from_board(board), color)
+                try:
+                    self.llm_cache.put(me, opp, color, self.model, move, cand, analysis)
+                except OSError as e:
+                    print(f"[ChatGPTOthello] 応答キャッシュを書けません: {e}")
+            if publish is not None:
+                publish(reply)
+        return reply
+
+    def _race_llm(self, board: List[List[int]], color: int, legal_not: set) -> Dict[str, Any]:
+        """API とローカル探索を同時に走らせる。
+
+        締め切り (llm_deadline 秒) までに ChatGPT が合法手を返せばそれを採用してローカル探索を
+        打ち切り、間に合わなければ（失敗・非合法手も同じ）ローカル探索の手を使う。
+        ローカル探索も締め切りで打ち切る（深さ 1 は必ず完了するので手は必ずある）。
+        間に合わなかった API 呼び出しは timeout 付きなので、締め切り後しばらくで自然に終わる。
+        その応答は使わず、llm_log / llm_cache にも書かない（次の手のキャッシュ参照と同時に書かないように）。
+        """
+        t0 = time.perf_counter()
+        stop = threading.Event()
+        llm_done = threading.Event()
+        abandoned = threading.Event()
+        box: Dict[str, Any] = {}
+
+        def publish(reply: Optional[Dict[str, Any]] = None, error: Optional[Exception] = None):
+            # _llm_lock の中で呼ぶ。キャッシュへの記録と結果の公開を、見捨てる判定と分けられないようにする
+            box["reply"], box["error"] = reply, error
+            box["time"] = time.perf_counter() - t0
+            if reply is not None and reply["move"] is not None:
+                stop.set()  # ChatGPT の勝ち。ローカル探索を打ち切る
+            llm_done.set()
+
+        def ask():
+            try:
+                self._ask_llm(board, color, legal_not, timeout=self.llm_deadline,
+                              abandoned=abandoned, publish=publish)
+            except Exception as e:
+                with self._llm_lock:
+                    if not abandoned.is_set():
+                        publish(error=e)
+
+        threading.Thread(target=ask, daemon=True).start()
+        timer = threading.Timer(self.llm_deadline, stop.set)
+        timer.daemon = True
+        timer.start()
+        try:
+            res = self._local_search(board, color, stop=stop)
+        finally:
+            timer.cancel()
+        local_time = time.perf_counter() - t0
+        llm_done.wait(max(0.0, self.llm_deadline - local_time))
+        with self._llm_lock:
+            # 記録・公開の途中ならそれが終わるのを待ってから見捨てる。ここで終わっていなければ以後 ask は
+            # キャッシュにも box にも何も書かない（キャッシュに書いた応答は必ず採用される）
+            abandoned.set()
+            finished = llm_done.is_set()
+
+        error = box.get("error") if finished else None
+        if error is not None and ("insufficient_quota" in str(error) or "exceeded your current quota" in str(error)):
+            self.enabled = False
+        reply = box.get("reply") if finished else None
+        if reply is not None and reply["move"] is not None:
+            timing = f"（競争）採用: ChatGPT {box['time']:.2f}s / ローカル {local_time:.2f}s で打ち切り"
+            return {"move": reply["move"], "candidates": reply["candidates"],
+                    "analysis": f"{reply['analysis']}\n{timing}", "source": "chatgpt",
+                    "timing": {"chatgpt": box["time"], "local": local_time}}
+
+        if not finished:
+            llm_note = f"ChatGPT {self.llm_deadline:.1f}s 締め切り超過"
+        elif error is not None:
+            llm_note = f"ChatGPT {box['time']:.2f}s 失敗: {error}"
+        else:
+            llm_note = f"ChatGPT {box['time']:.2f}s 非合法手"
+        timing = f"（競争）採用: ローカル {local_time:.2f}s / {llm_note}"
+        print(f"[ChatGPTOthello] {timing}")
+        if res.move is None:
+            return {"move": "PASS", "candidates": [], "analysis": f"(ローカルAI) 合法手なし。\n{timing}", "source": "local"}
+        cands, _ = self._local_candidates(board, color, k=3)
+        return {"move": self.to_notation(*res.move), "candidates": cands,
+                "analysis": f"{self.search_summary(res)}\n{timing}", "source": "local",
+                "timing": {"chatgpt": box.get("time"), "local": local_time}}
+
+    def choose(self, board: List[List[int]], color: int) -> Dict[str, Any]:
+        """Return dict with keys: move(str A1..H8 or 'PASS'), candidates(list), analysis(str), source(str)."""
+        legal_not = {self.to_notation(x, y) for (x, y) in legal_moves(board, color)}
+
+        # --- 定石 ---
+        book_moves = self.book.lookup_all(*bb.split(*bb.from_board(board), color))
+        if book_moves:
+            cands = [{"move": m.name, "score": round(m.win_rate * 100), "note": f"定石 {m.games}局"} for m in book_moves[:3]]
+            top = book_moves[0]
+            analysis = f"（定石）{top.name}: 勝率 {top.win_rate:.0%} / {top.games}局"
+            return {"move": top.name, "candidates": cands, "analysis": analysis, "source": "book"}
+
+        # --- 完全ローカル ---
+        if not self.enabled or self.client is None:
+            res = self._local_search(board, color)
+            if res.move is None:
+                return {"move": "PASS", "candidates": [], "analysis": "(ローカルAI) 合法手なし。", "source": "local"}
+            cands, _ = self._local_candidates(board, color, k=3)
+            return {"move": self.to_notation(*res.move), "candidates": cands, "analysis": self.search_summary(res), "source": "local"}
+
+        # --- オンライン（API） ---
+        me, opp = bb.split(*bb.from_board(board), color)
+        hit = self.llm_cache.get(me, opp, color, self.model)
+        if hit is not None and (hit["move"] in legal_not or (hit["move"] == "PASS" and not legal_not)):
+            print(f"[ChatGPTOthello] {self.llm_cache.stats_text()}")
+            return dict(hit, source="chatgpt-cache")
+        if self.llm_deadline > 0:
+            return self._race_llm(board, color, legal_not)
+        try:
+            reply = self._ask_llm(board, color, legal_not)
+            if reply["move"] is None:
+                mv_xy = best_legal_move(board, color)
+                reply["move"] = self.to_notation(*mv_xy) if mv_xy else "PASS"
+            return dict(reply, source="chatgpt")
+
+        except Exception as e:
+            # 429等が出たら以後はローカル固定に切替
+            if "insufficient_quota" in str(e) or "exceeded your current quota" in str(e):
+                self.enabled = False
+            res = self._local_search(board, color)
+            if res.move is None:
+                return {"move": "PASS", "candidates": [], "analysis": f"(API失敗→ローカル) {e}", "source": "local"}
+            cands, _ = self._local_candidates(board, color, k=3)
+            return {"move": self.to_notation(*res.move), "candidates": cands,
+                    "analysis": f"(API失敗→ローカル) {e}\n{self.search_summary(res)}", "source": "local"}
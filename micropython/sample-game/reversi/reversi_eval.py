@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Reversi evaluator: 「WEIGHTS の位置評価＋可動性」を前計算した表で速く求める評価器。
+
+- 位置評価は行ごとの表 row_tables[r][その行の 8bit] を 8 回引くだけ（石を 1 個ずつ数えない）。
+- 着手による位置評価の変化は「打ったマスの重み＋反転した石の重み × 2」なので、
+  親の値から child_position() で差分更新できる（探索ではこれを子へ渡す）。
+- 可動性は両者の合法手数の差。ビットボードでは局面全体の合法手生成（reversi_bitboard の
+  Kogge-Stone 型）が数 µs なので、マスごとの差分管理はせず毎回数え直す。
+
+グリーディAI (best_legal_move)・候補手一覧 (_local_candidates)・探索 (AlphaBetaSearcher) は
+同じ評価器 EVALUATOR を共有する。探索で使う評価器は position / child_position / leaf /
+evaluate / score_moves を持てば差し替えられる（reversi_pattern.PatternEvaluator など）。
+"""
+from __future__ import annotations
+from typing import List, Optional, Tuple
+
+from reversi_bitboard import SIZE, flips_bb, iter_bits, legal_moves_bb, popcount
+
+# A classic positional weight matrix (corners > edges > center; avoid X-squares early)
+WEIGHTS = [
+    [120, -20,  20,   5,   5,  20, -20, 120],
+    [-20, -40,  -5,  -5,  -5,  -5, -40, -20],
+    [ 20,  -5,  15,   3,   3,  15,  -5,  20],
+    [  5,  -5,   3,   3,   3,   3,  -5,   5],
+    [  5,  -5,   3,   3,   3,   3,  -5,   5],
+    [ 20,  -5,  15,   3,   3,  15,  -5,  20],
+    [-20, -40,  -5,  -5,  -5,  -5, -40, -20],
+    [120, -20,  20,   5,   5,  20, -20, 120],
+]
+SQ_WEIGHTS = [WEIGHTS[sq >> 3][sq & 7] for sq in range(SIZE * SIZE)]
+MOBILITY_WEIGHT = 5
+
+class Evaluator:
+    def __init__(self, weights: List[List[int]] = WEIGHTS, mobility_weight: int = MOBILITY_WEIGHT):
+        self.sq_weights = [weights[sq >> 3][sq & 7] for sq in range(SIZE * SIZE)]
+        self.mobility_weight = mobility_weight
+        self.row_tables = [
+            [sum(weights[r][i] for i in range(SIZE) if (byte >> i) & 1) for byte in range(256)]
+            for r in range(SIZE)
+        ]
+
+    def positional(self, b: int) -> int:
+        """石の集合 b の重みの合計。"""
+        t0, t1, t2, t3, t4, t5, t6, t7 = self.row_tables
+        return (t0[b & 255] + t1[(b >> 8) & 255] + t2[(b >> 16) & 255] + t3[(b >> 24) & 255]
+                + t4[(b >> 32) & 255] + t5[(b >> 40) & 255] + t6[(b >> 48) & 255] + t7[b >> 56])
+
+    def position(self, me: int, opp: int) -> int:
+        """me から見た位置評価。"""
+        return self.positional(me) - self.positional(opp)
+
+    def child_position(self, pos: int, sq: int, flips: int) -> int:
+        """位置評価 pos の局面で me が sq に打ち flips を返した後の、me から見た位置評価。"""
+        return pos + self.sq_weights[sq] + 2 * self.positional(flips)
+
+    def mobility(self, me: int, opp: int) -> int:
+        return self.mobility_weight * (popcount(legal_moves_bb(me, opp)) - popcount(legal_moves_bb(opp, me)))
+
+    def leaf(self, me: int, opp: int, pos: int) -> int:
+        """探索の葉の評価値。pos は親から差分更新した位置評価。"""
+        return pos + self.mobility_weight * (popcount(legal_moves_bb(me, opp)) - popcount(legal_moves_bb(opp, me)))
+
+    def evaluate(self, me: int, opp: int, pos: Optional[int] = None) -> int:
+        """me から見た評価値。位置評価が分かっていれば pos に渡す。"""
+        if pos is None:
+            pos = self.position(me, opp)
+        return pos + self.mobility(me, opp)
+
+    def score_moves(self, me: int, opp: int) -> List[Tuple[int, int, int]]:
+        """me の各合法手の (sq, 打った後の me から見た評価値, flips)。sq の昇順（= y, x の昇順）。"""
+        pos = self.position(me, opp)
+        out = []
+        for sq in iter_bits(legal_moves_bb(me, opp)):
+            f = flips_bb(me, opp, sq)
+            nme, nopp = me | f | (1 << sq), opp ^ f
+            out.append((sq, self.evaluate(nme, nopp, self.child_position(pos, sq, f)), f))
+        return out
+
+EVALUATOR = Evaluator()
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Reversi LLM response cache: ChatGPT の応答を局面ごとに保存して、同じ局面では API を呼ばない。
+
+- キーは (対称形で正規化した盤面, 手番, モデル名)。回転・反転した局面でも当たり、
+  手・候補手・解説中のマス名は実際の局面の向きに戻して返す。
+- メモリ上は OrderedDict の LRU（上限 max_entries）。当たりは辞書引き 1 回＋座標変換だけ。
+- put のたびに JSON ファイルへ書き出す（一時ファイル → os.replace）。API 呼び出しは
+  秒単位なので、書き出しのコストは問題にならない。
+
+動作確認（API キー不要。呼び出し回数を数える偽クライアントで確かめる）:
+  python3 reversi_llm_cache.py --selftest
+"""
+from __future__ import annotations
+import argparse
+import json
+import os
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from reversi_bitboard import canonical, name_to_sq, sq_to_name, symmetry
+
+DEFAULT_CACHE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "reversi_llm_cache.json")
+DEFAULT_MAX_ENTRIES = 5000
+CACHE_VERSION = 1
+
+# symmetry(b, s) の逆変換の番号（非対称な盤面で総当たりして求める）
+_PROBE = 0x0000_0000_0000_0106
+INVERSE = [next(t for t in range(8) if symmetry(symmetry(_PROBE, s), t) == _PROBE) for s in range(8)]
+
+# マス名。\b は日本語の文字も単語の一部とみなすので（'次はD3が良い'）、前後は英数字かどうかだけを見る
+_SQUARE = re.compile(r"(?<![A-Za-z0-9])([A-H][1-8])(?![0-9])")
+
+def transform_name(name: str, s: int) -> str:
+    """マス名 'C4' に対称変換 s を適用する（'PASS' などはそのまま）。"""
+    name = name.strip().upper()
+    if not _SQUARE.fullmatch(name):
+        return name
+    return sq_to_name(symmetry(1 << name_to_sq(name), s).bit_length() - 1)
+
+def transform_reply(move: str, candidates: List[Any], analysis: str, s: int) -> Tuple[str, List[Any], str]:
+    """応答の手・候補手・解説中のマス名をまとめて変換する。"""
+    if s == 0:
+        return move, candidates, analysis
+    cands = []
+    for c in candidates:
+        if isinstance(c, dict) and "move" in c:
+            c = dict(c, move=transform_name(str(c["move"]), s))
+        cands.append(c)
+    text = _SQUARE.sub(lambda m: transform_name(m.group(1), s), analysis) if isinstance(analysis, str) else analysis
+    return transform_name(move, s), cands, text
+
+class LLMResponseCache:
+    def __init__(self, path: Optional[str] = DEFAULT_CACHE, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != CACHE_VERSION:
+                raise ValueError(f"LLM キャッシュの形式が不正です: {path}")
+            for key, value in data.get("entries", []):  # 古い順に並んでいる
+                self._entries[key] = value
+            self._evict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def make_key(me: int, opp: int, color: int, model: str) -> Tuple[str, int]:
+        """(キー文字列, 正規化に使った対称変換) を返す。"""
+        cme, copp, s = canonical(me, opp)
+        return f"{cme:016x}{copp:016x}{'B' if color > 0 else 'W'}:{model}", s
+
+    def get(self, me: int, opp: int, color: int, model: str) -> Optional[Dict[str, Any]]:
+        """{move, candidates, analysis} を実際の局面の向きで返す。無ければ None。"""
+        key, s = self.make_key(me, opp, color, model)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        move, cands, analysis = transform_reply(entry["move"], entry["candidates"], entry["analysis"], INVERSE[s])
+        return {"move": move, "candidates": cands, "analysis": analysis}
+
+    def put(self, me: int, opp: int, color: int, model: str,
+            move: str, candidates: List[Any], analysis: str):
+        key, s = self.make_key(me, opp, color, model)
+        move, cands, analysis = transform_reply(move, candidates, analysis, s)
+        self._entries[key] = {"move": move, "candidates": cands, "analysis": analysis}
+        self._entries.move_to_end(key)
+        self._evict()
+        self.save()
+
+    def _evict(self):
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def save(self):
+        if not self.path:
+            return
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": CACHE_VERSION, "entries": list(self._entries.items())}, f, ensure_ascii=False)
+        os.replace(tmp, self.path)
+
+    def stats_text(self) -> str:
+        total = self.hits + self.misses
+        rate = self.hits / total if total else 0.0
+        return f"llm-cache {len(self)}/{self.max_entries} hit {rate:.0%} ({self.hits}/{total})"
+
+# ------------------------------ Self-test ----------------------------------
+
+class _FakeCompletions:
+    """client.chat.completions.create の代わり。呼ばれた回数を数え、最初の合法手を返す。"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def create(self, model: str, messages: List[Dict[str, str]], **kwargs):
+        from types import SimpleNamespace
+        self.calls += 1
+        content = messages[-1]["content"]
+        legal = re.findall(r"'([A-H][1-8])'", content.split("合法手一覧:", 1)[1].splitlines()[0])
+        move = legal[0] if legal else "PASS"
+        text = json.dumps({"move": move, "candidates": [{"move": m} for m in legal[:3]],
+                           "analysis": f"{move}は辺に近い手です。次は{legal[-1]}も候補。"}, ensure_ascii=False)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=text))])
+
+def selftest(path: str) -> None:
+    import reversi_bitboard as bb
+    from types import SimpleNamespace
+    from reversi_engine import BLACK, ChatGPTOthello, apply_move, initial_board, legal_moves
+
+    if os.path.exists(path):
+        os.remove(path)
+    fake = _FakeCompletions()
+    ai = ChatGPTOthello()
+    ai.enabled = True
+    ai.client = SimpleNamespace(chat=SimpleNamespace(completions=fake))
+    ai.book = type(ai.book)(None)  # 定石を使わずに API 経路を通す
+    ai.llm_cache = LLMResponseCache(path, max_entries=3)
+
+    board = apply_move(initial_board(), 5, 4, BLACK).board  # F5
+    first = ai.choose(board, -BLACK)
+    assert fake.calls == 1 and first["source"] == "chatgpt", first
+    again = ai.choose(board, -BLACK)
+    assert fake.calls == 1 and again["source"] == "chatgpt-cache" and again["move"] == first["move"], again
+
+    # 対称な局面（E6 から始めた形）でも当たり、手は実際の向きで返る
+    mirror = apply_move(initial_board(), 4, 5, BLACK).board
+    hit = ai.choose(mirror, -BLACK)
+    assert fake.calls == 1 and hit["source"] == "chatgpt-cache", hit
+    assert ChatGPTOthello.from_notation(hit["move"]) in legal_moves(mirror, -BLACK), hit
+    assert hit["analysis"].startswith(hit["move"]), hit
+    # 日本語に挟まれたマス名も変換する
+    assert transform_reply("D3", [], "次はD3が良い。C4よりF5", 1)[2] == \
+        f"次は{transform_name('D3', 1)}が良い。{transform_name('C4', 1)}より{transform_name('F5', 1)}"
+
+    # 当たりの速さ（局面の正規化＋辞書引き）
+    me, opp = bb.split(*bb.from_board(mirror), -BLACK)
+    n = 2000
+    t0 = time.perf_counter()
+    for _ in range(n):
+        ai.llm_cache.get(me, opp, -BLACK, ai.model)
+    per_hit = (time.perf_counter() - t0) / n
+    assert per_hit < 1e-3, per_hit
+
+    # ファイルから読み直しても当たる。上限を超えたら古いものから消える
+    reloaded = LLMResponseCache(path, max_entries=3)
+    assert reloaded.get(me, opp, -BLACK, ai.model) is not None
+    assert reloaded.get(me, opp, -BLACK, "other-model") is None
+    for i in range(3):
+        reloaded.put(1 << i, 1 << 63, BLACK, ai.model, "PASS", [], "")
+    assert len(reloaded) == 3 and reloaded.get(me, opp, -BLACK, ai.model) is None
+    os.remove(path)
+    print(f"selftest ok: api calls={fake.calls}, hit {per_hit * 1e6:.1f}us, {ai.llm_cache.stats_text()}")
+
+def main(argv: Optional[List[str]] = None):
+    ap = argparse.ArgumentParser(description="Reversi LLM response cache")
+    ap.add_argument("--selftest", action="store_true", help="偽クライアントでキャッシュの動作を確かめる")
+    ap.add_argument("--path", default=DEFAULT_CACHE, help="キャッシュファイル（--selftest では一時ファイル）")
+    args = ap.parse_args(argv)
+    if args.selftest:
+        import tempfile
+        selftest(os.path.join(tempfile.gettempdir(), "reversi_llm_cache_selftest.json"))
+        return
+    cache = LLMResponseCache(args.path)
+    print(f"{args.path}: {len(cache)} entries (max {cache.max_entries})")
+
+if __name__ == "__main__":
+    main()
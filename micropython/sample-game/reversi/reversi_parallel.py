@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Reversi parallel search: ProcessPoolExecutor によるルート分割の並列 alpha-beta。
+
+- 反復深化の各深さで、ルートの最初の手（前の反復の最善手）を親プロセスで全窓探索して
+  alpha を決め（young brothers wait）、残りの手を窓 (alpha, ∞) でワーカーに振り分ける。
+- 置換表はワーカープロセスごとに持ち、ゲーム中は使い回す。ワーカーが返した
+  ルート子局面の値は親の置換表にマージして、次の反復・次の手番で再利用する。
+- 時間切れ・中断はプロセス間で共有する multiprocessing.Event でワーカーに伝える。
+
+AlphaBetaSearcher と同じ search() / new_game() / tt を持つので、差し替えて使える。
+"""
+from __future__ import annotations
+import multiprocessing
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Dict, List, Optional, Tuple
+
+from reversi_bitboard import BLACK, SIZE, flips_bb, iter_bits, legal_moves_bb, sq_to_xy
+from reversi_search import (
+    DISC_SCORE, INF, SQ_WEIGHTS, AlphaBetaSearcher, SearchResult, SearchTimeout,
+)
+from reversi_tt import EXACT, LOWER, zobrist_hash, zobrist_play
+
+PARALLEL_MIN_DEPTH = 4  # これより浅い反復は親プロセスだけで探索する（プロセス間通信の方が高くつく）
+POLL_INTERVAL = 0.02    # 秒。ワーカー待ちの間に時間切れ・中断を確認する間隔
+
+# ------------------------------ Worker side --------------------------------
+
+_worker: Optional[AlphaBetaSearcher] = None
+
+def _init_worker(abort, tt_bits: int, evaluator):
+    global _worker
+    _worker = AlphaBetaSearcher(tt_bits, evaluator)
+    _worker.stop = abort  # 親が set すると数十ms以内に SearchTimeout
+
+def _search_child(me: int, opp: int, depth: int, alpha: int, beta: int, color: int,
+                  wall_deadline: Optional[float]) -> Tuple[Optional[int], int]:
+    """ワーカーで 1 局面を探索する。(値 or 時間切れなら None, ノード数) を返す。"""
+    _worker.nodes = 0
+    _worker.tt.new_search()
+    # プロセス間では time.time() で締め切りを渡し、手元の perf_counter に換算する
+    deadline = None if wall_deadline is None else time.perf_counter() + (wall_deadline - time.time())
+    try:
+        return _worker.search_node(me, opp, depth, alpha, beta, color, deadline), _worker.nodes
+    except SearchTimeout:
+        return None, _worker.nodes
+
+# ------------------------------ Parent side --------------------------------
+
+class ParallelSearcher:
+    def __init__(self, workers: int, tt_bits: int = 18, evaluator=None):
+        self.workers = workers
+        self.tt_bits = tt_bits
+        self.local = AlphaBetaSearcher(tt_bits, evaluator)  # 長兄の探索と浅い反復用
+        self.nodes = 0
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._abort = multiprocessing.Event()
+
+    @property
+    def tt(self):
+        return self.local.tt
+
+    def new_game(self):
+        # ワーカーの置換表は局面そのものをキーにしているので、残っていても正しい（古い世代として上書きされる）
+        self.local.new_game()
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                             initargs=(self._abort, self.tt_bits, self.local.evaluator))
+        return self._pool
+
+    def search(self, me: int, opp: int, time_limit: float = 1.0, max_depth: int = SIZE * SIZE,
+               color: int = BLACK, stop: Optional[threading.Event] = None) -> SearchResult:
+        """AlphaBetaSearcher.search と同じ。深い反復のルート手をワーカーに分配する。"""
+        root_moves = list(iter_bits(legal_moves_bb(me, opp)))
+        if self.workers <= 1 or len(root_moves) <= 1:
+            res = self.local.search(me, opp, time_limit, max_depth, color, stop)
+            self.nodes = self.local.nodes
+            return res
+        t0 = time.perf_counter()
+        wall0 = time.time()
+        self.nodes = 0
+        self.local.nodes = 0
+        self.local.stop = stop
+        self.tt.new_search()
+        h = zobrist_hash(*((me, opp) if color == BLACK else (opp, me)), color)
+        root_moves.sort(key=SQ_WEIGHTS.__getitem__, reverse=True)
+        hit = self.tt.probe(h)
+        if hit is not None and hit[4] in root_moves:
+            root_moves.remove(hit[4])
+            root_moves.insert(0, hit[4])
+
+        best_sq, best_val, done_depth = root_moves[0], -INF, 0
+        try:
+            for depth in range(1, max_depth + 1):
+                deadline = t0 + time_limit if depth > 1 else None  # 深さ 1 は必ず完了させる
+                wall_deadline = wall0 + time_limit if depth > 1 else None
+                try:
+                    val, scores = self._search_root(me, opp, root_moves, depth, h, color,
+                                                    deadline, wall_deadline, stop)
+                except SearchTimeout:
+                    break
+                root_moves.sort(key=lambda sq: scores[sq], reverse=True)
+                best_sq, best_val, done_depth = root_moves[0], val, depth
+                self.tt.store(h, depth, EXACT, val, best_sq)
+                if abs(val) >= DISC_SCORE or time.perf_counter() - t0 >= time_limit:
+                    break
+        finally:
+            self.local.stop = None
+            self.nodes += self.local.nodes
+        return SearchResult(move=sq_to_xy(best_sq), score=best_val, depth=done_depth,
+                            nodes=self.nodes, elapsed=time.perf_counter() - t0)
+
+    def _search_root(self, me: int, opp: int, moves: List[int], depth: int, h: int, color: int,
+                     deadline: Optional[float], wall_deadline: Optional[float],
+                     stop: Optional[threading.Event]) -> Tuple[int, Dict[int, int]]:
+        children = {}
+        for sq in moves:
+            f = flips_bb(me, opp, sq)
+            children[sq] = (opp ^ f, me | f | (1 << sq), zobrist_play(h, sq, f, color))
+
+        # 長兄（前の反復の最善手）は親で全窓探索して alpha を決める
+        first = moves[0]
+        c_opp, c_me, _ = children[first]
+        alpha = -self.local.search_node(c_opp, c_me, depth - 1, -INF, INF, -color, deadline)
+        scores = {first: alpha}
+        rest = moves[1:]
+        if depth < PARALLEL_MIN_DEPTH:
+            for sq in rest:
+                c_opp, c_me, _ = children[sq]
+                v = -self.local.search_node(c_opp, c_me, depth - 1, -INF, -alpha, -color, deadline)
+                scores[sq] = v
+                alpha = max(alpha, v)
+            return alpha, scores
+
+        # 弟たちは窓 (alpha, ∞) でワーカーへ
+        pool = self._get_pool()
+        futures = {pool.submit(_search_child, children[sq][0], children[sq][1], depth - 1,
+                               -INF, -alpha, -color, wall_deadline): sq for sq in rest}
+        pending = set(futures)
+        timed_out = False
+        while pending and not timed_out:
+            done, pending = wait(pending, timeout=POLL_INTERVAL, return_when=FIRST_COMPLETED)
+            for fut in done:
+                w, n = fut.result()
+                self.nodes += n
+                if w is None:
+                    timed_out = True
+                    continue
+                sq = futures[fut]
+                scores[sq] = -w
+                # ワーカーの結果を親の置換表にマージ（子局面の手番側から見た値）
+                self.tt.store(children[sq][2], depth - 1, LOWER if w >= -alpha else EXACT, w, -1)
+            if (stop is not None and stop.is_set()) or (deadline is not None and time.perf_counter() > deadline):
+                timed_out = True
+        if timed_out:
+            self._abort.set()
+            for fut in pending:
+                fut.cancel()
+            wait(pending)  # 走っているワーカーが止まるのを待ってから abort を下ろす
+            for fut in pending:
+                if not fut.cancelled():
+                    self.nodes += fut.result()[1]
+            self._abort.clear()
+            raise SearchTimeout()
+        return max(scores.values()), scores
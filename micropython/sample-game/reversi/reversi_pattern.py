@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Reversi pattern evaluation: 辺・隅・斜めのパターン表による評価関数と、その学習。
+
+- パターンは 11 種類（辺+X, 隅 3x3, 隅 2x5, 2〜4 段目の横一列, 長さ 4〜8 の斜め）。
+  盤の 8 通りの対称変換で位置を変えた全インスタンスを同じ表で評価する。
+- 各インスタンスのマスを 3 進数（空=0, 手番側=1, 相手=2）で読んだ値が表の添字。
+  辺や斜めのように自分自身と対称なパターンは、同じマスを逆順に読んだ値と揃えた正規の添字を使う
+  （鏡像の局面が同じ評価になる）。
+  表は全パターン分を 1 本の配列に並べ、ステージ（石数で区切った進行度）ごとに持つ。
+- 値は手番側から見た最終石差の予測（1/100 石単位の整数）。
+- 学習: 棋譜（1 行 1 局 'F5D6C3...'）の全局面について、パターン添字 → 最終石差 を
+  リッジ回帰で当てはめる。特徴は疎なので、NumPy の添字演算（x[idx].sum / bincount）で
+  正規方程式を共役勾配法で解く。NumPy は学習にだけ使い、評価は標準ライブラリだけで動く。
+
+ファイル形式（リトルエンディアン）:
+  ヘッダ : magic 'RVPT', version(u16), stages(u16), table_size(u32)
+  本体   : int16 × (stages × table_size)   ステージ s の表は s*table_size から
+
+使い方:
+  python3 reversi_book.py selfplay -n 2000 -t 0.05 --random-plies 8 -o games.txt
+  python3 reversi_pattern.py train games.txt -o reversi_pattern.bin
+  python3 reversi_pattern.py info reversi_pattern.bin
+"""
+from __future__ import annotations
+import argparse
+import os
+import struct
+import sys
+import time
+from array import array
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+try:
+    import numpy as np  # 学習にだけ使う
+except ImportError:  # pragma: no cover - numpy が無くても評価はできる
+    np = None  # type: ignore
+
+from reversi_bitboard import (
+    MASK64, SIZE, flips_bb, flip_vertical, iter_bits, legal_moves_bb, mirror_horizontal,
+    popcount, symmetry, transpose,
+)
+
+MAGIC = b"RVPT"
+VERSION = 2  # 2: 自己対称なパターンの添字を正規化
+HEADER = struct.Struct("<4sHHI")
+DEFAULT_WEIGHTS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "reversi_pattern.bin")
+DEFAULT_STAGES = 4
+SCORE_UNIT = 100  # 表の値は 1/100 石単位
+
+POW3 = [3 ** i for i in range(11)]
+B3 = [sum(POW3[i] for i in range(8) if (byte >> i) & 1) for byte in range(256)]  # 8bit → 各桁 0/1 の 3 進数
+
+def _sq(name: str) -> int:
+    return (int(name[1]) - 1) * SIZE + "ABCDEFGH".index(name[0])
+
+# 正規形（変換前）のマス。添字の桁の順番もこの順
+PATTERNS: List[Tuple[str, List[int]]] = [
+    ("edge2x", [_sq(c + "1") for c in "ABCDEFGH"] + [_sq("B2"), _sq("G2")]),
+    ("corner3x3", [_sq(c + r) for r in "123" for c in "ABC"]),
+    ("corner2x5", [_sq(c + r) for r in "12" for c in "ABCDE"]),
+    ("hv2", [_sq(c + "2") for c in "ABCDEFGH"]),
+    ("hv3", [_sq(c + "3") for c in "ABCDEFGH"]),
+    ("hv4", [_sq(c + "4") for c in "ABCDEFGH"]),
+] + [(f"diag{n}", [i * SIZE + i + SIZE - n for i in range(n)]) for n in (8, 7, 6, 5, 4)]
+
+def _instances() -> List[List[int]]:
+    """INSTANCES[s] = 対称変換 s で新しい位置になるパターン番号の一覧（同じマス集合は 1 回だけ）。"""
+    seen = set()
+    out: List[List[int]] = [[] for _ in range(8)]
+    for p, (_, squares) in enumerate(PATTERNS):
+        for s in range(8):
+            # 変換後の盤で squares を読む = 元の盤では symmetry(1 << q, s) が squares に入るマス q を読む
+            cells = frozenset(q for q in range(SIZE * SIZE) if symmetry(1 << q, s).bit_length() - 1 in squares)
+            if (p, cells) not in seen:
+                seen.add((p, cells))
+                out[s].append(p)
+    return out
+
+def _canonical_codes(squares: List[int]) -> array:
+    """添字 → 正規の添字。パターンを自分自身に重ねる対称変換でマスの順番を入れ替えた添字のうち最小のもの。"""
+    codes = []
+    for s in range(8):
+        image = [symmetry(1 << q, s).bit_length() - 1 for q in squares]
+        if set(image) != set(squares):
+            continue
+        table = [0]  # 桁 i（マス squares[i]）を、変換後の位置の桁に置いた添字
+        for i, q in enumerate(image):
+            w = POW3[squares.index(q)]
+            table = [t + d * w for d in range(3) for t in table]
+        codes.append(table)
+    return array("i", map(min, zip(*codes)))
+
+INSTANCES = _instances()
+CANONICAL = [_canonical_codes(squares) for _, squares in PATTERNS]
+OFFSETS = []
+_size = 0
+for _, _squares in PATTERNS:
+    OFFSETS.append(_size)
+    _size += POW3[len(_squares)]
+BIAS_INDEX = _size              # ステージごとの定数項
+TABLE_SIZE = _size + 1
+NUM_FEATURES = sum(len(ps) for ps in INSTANCES) + 1  # 1 局面あたりの添字の数（定数項を含む）
+del _size, _squares
+
+DIAG_MULT = 0x0101_0101_0101_0101
+DIAG_MASKS = {n: sum(1 << sq for sq in squares) for name, squares in PATTERNS if name.startswith("diag")
+              for n in [len(squares)]}
+
+def _codes(m: int, o: int, patterns: List[int], out: List[int]):
+    """変換済みの盤 (m=手番側, o=相手) で正規形のパターンを読み、表の添字を out に足す。"""
+    m0, m1, m2, m3 = m & 255, (m >> 8) & 255, (m >> 16) & 255, (m >> 24) & 255
+    o0, o1, o2, o3 = o & 255, (o >> 8) & 255, (o >> 16) & 255, (o >> 24) & 255
+    for p in patterns:
+        if p == 0:    # edge2x
+            c = (B3[m0] + 2 * B3[o0] + 6561 * (((m1 >> 1) & 1) + 2 * ((o1 >> 1) & 1))
+                 + 19683 * (((m1 >> 6) & 1) + 2 * ((o1 >> 6) & 1)))
+        elif p == 1:  # corner3x3
+            c = (B3[m0 & 7] + 2 * B3[o0 & 7] + 27 * (B3[m1 & 7] + 2 * B3[o1 & 7])
+                 + 729 * (B3[m2 & 7] + 2 * B3[o2 & 7]))
+        elif p == 2:  # corner2x5
+            c = B3[m0 & 31] + 2 * B3[o0 & 31] + 243 * (B3[m1 & 31] + 2 * B3[o1 & 31])
+        elif p == 3:
+            c = B3[m1] + 2 * B3[o1]
+        elif p == 4:
+            c = B3[m2] + 2 * B3[o2]
+        elif p == 5:
+            c = B3[m3] + 2 * B3[o3]
+        else:         # 斜め: 掛け算で各段のビットを最上位バイトに集める
+            n = 14 - p
+            mask = DIAG_MASKS[n]
+            mb = (((m & mask) * DIAG_MULT) >> (56 + SIZE - n)) & 255
+            ob = (((o & mask) * DIAG_MULT) >> (56 + SIZE - n)) & 255
+            c = B3[mb] + 2 * B3[ob]
+        out.append(OFFSETS[p] + CANONICAL[p][c])
+
+def _transforms(b: int) -> List[int]:
+    """symmetry(b, s) を s = 0..7 の順にまとめて求める（共通部分を使い回す）。"""
+    h = mirror_horizontal(b)
+    v = flip_vertical(b)
+    hv = flip_vertical(h)
+    return [b, h, v, hv, transpose(b), transpose(h), transpose(v), transpose(hv)]
+
+def stage_of(me: int, opp: int, stages: int) -> int:
+    """石数で区切ったステージ番号（0 = 序盤）。"""
+    return min(stages - 1, (popcount(me | opp) - 4) * stages // 61)
+
+def features(me: int, opp: int) -> List[int]:
+    """me の手番の局面の添字（ステージ内の位置）を NUM_FEATURES 個。"""
+    out: List[int] = []
+    ms, os_ = _transforms(me), _transforms(opp)
+    for s in range(8):
+        if INSTANCES[s]:
+            _codes(ms[s], os_[s], INSTANCES[s], out)
+    out.append(BIAS_INDEX)
+    return out
+
+# ------------------------------ Evaluation ---------------------------------
+
+class PatternEvaluator:
+    """reversi_eval.Evaluator と同じ使い方ができるパターン評価器。
+
+    位置評価を差分更新できないので position / child_position は 0 を返し、
+    leaf() で毎回パターンを読み直す。
+    """
+
+    def __init__(self, weights: List[int], stages: int):
+        if len(weights) != stages * TABLE_SIZE:
+            raise ValueError("パターン表の大きさが合いません")
+        self.weights = weights
+        self.stages = stages
+        self.path: Optional[str] = None
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_WEIGHTS) -> "PatternEvaluator":
+        with open(path, "rb") as f:
+            magic, version, stages, size = HEADER.unpack(f.read(HEADER.size))
+            if magic != MAGIC or version != VERSION or size != TABLE_SIZE:
+                raise ValueError(f"パターン表の形式が不正です: {path}")
+            data = array("h")
+            data.frombytes(f.read())
+        if sys.byteorder != "little":
+            data.byteswap()
+        ev = cls(data.tolist(), stages)
+        ev.path = path
+        return ev
+
+    def save(self, path: str):
+        data = array("h", self.weights)
+        if sys.byteorder != "little":
+            data.byteswap()
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, self.stages, TABLE_SIZE))
+            f.write(data.tobytes())
+        os.replace(tmp, path)
+
+    def position(self, me: int, opp: int) -> int:
+        return 0
+
+    def child_position(self, pos: int, sq: int, flips: int) -> int:
+        return 0
+
+    def leaf(self, me: int, opp: int, pos: int) -> int:
+        w = self.weights
+        base = stage_of(me, opp, self.stages) * TABLE_SIZE
+        return sum(w[base + i] for i in features(me, opp))
+
+    def evaluate(self, me: int, opp: int, pos: Optional[int] = None) -> int:
+        return self.leaf(me, opp, 0)
+
+    def score_moves(self, me: int, opp: int) -> List[Tuple[int, int, int]]:
+        out = []
+        for sq in iter_bits(legal_moves_bb(me, opp)):
+            f = flips_bb(me, opp, sq)
+            out.append((sq, -self.leaf(opp ^ f, me | f | (1 << sq), 0), f))
+        return out
+
+def load_default() -> Optional[PatternEvaluator]:
+    """OTHELLO_EVAL（既定 reversi_pattern.bin）があれば読む。無ければ None。"""
+    path = os.environ.get("OTHELLO_EVAL", DEFAULT_WEIGHTS)
+    if not path or path == "0" or not os.path.exists(path):
+        return None
+    return PatternEvaluator.load(path)
+
+# ------------------------------- Training ----------------------------------
+
+def training_samples(lines: Iterable[str], stages: int) -> Iterator[Tuple[int, List[int], int]]:
+    """棋譜行から (ステージ, 添字, 手番側から見た最終石差) を局面ごとに返す。"""
+    from reversi_book import final_position, parse_moves, replay
+    for line in lines:
+        line = line.split("#", 1)[0].strip()
+        if not line:
+            continue
+        try:
+            moves = parse_moves(line.split()[0])
+            plies = list(replay(moves))
+            black, white = final_position(moves)
+        except ValueError as e:
+            print(f"skip: {e}", file=sys.stderr)
+            continue
+        if (black | white) != MASK64 and (legal_moves_bb(black, white) or legal_moves_bb(white, black)):
+            continue  # 途中で終わった棋譜は最終石差が分からない
+        diff = popcount(black) - popcount(white)
+        for me, opp, _, color in plies:
+            yield stage_of(me, opp, stages), features(me, opp), diff if color > 0 else -diff
+
+def fit(idx: "np.ndarray", y: "np.ndarray", n: int, ridge: float, iters: int, tol: float = 1e-6) -> "np.ndarray":
+    """min |A x - y|^2 + ridge |x|^2 を共役勾配法で解く。A は各行 idx[i] の位置が 1 の疎行列。"""
+    flat = idx.ravel()
+    k = idx.shape[1]
+
+    def normal(x):  # (A^T A + ridge I) x
+        ax = x[idx].sum(axis=1)
+        return np.bincount(flat, weights=np.repeat(ax, k), minlength=n) + ridge * x
+
+    x = np.zeros(n)
+    r = np.bincount(flat, weights=np.repeat(y, k), minlength=n)  # A^T y
+    p = r.copy()
+    rr = r @ r
+    rr0 = rr
+    for it in range(iters):
+        q = normal(p)
+        alpha = rr / (p @ q)
+        x += alpha * p
+        r -= alpha * q
+        rr_new = r @ r
+        if rr_new <= tol * tol * rr0:
+            break
+        p = r + (rr_new / rr) * p
+        rr = rr_new
+    return x
+
+def train(paths: List[str], stages: int, ridge: float, iters: int) -> PatternEvaluator:
+    if np is None:
+        raise SystemExit("学習には NumPy が必要です: pip install numpy")
+    t0 = time.perf_counter()
+    rows: List[List[int]] = []
+    ys: List[int] = []
+    for path in paths:
+        f = sys.stdin if path == "-" else open(path)
+        try:
+            for stage, feats, diff in training_samples(f, stages):
+                base = stage * TABLE_SIZE
+                rows.append([base + i for i in feats])
+                ys.append(diff)
+        finally:
+            if f is not sys.stdin:
+                f.close()
+    if not rows:
+        raise SystemExit("学習に使える棋譜がありません")
+    idx = np.asarray(rows, dtype=np.int32)
+    y = np.asarray(ys, dtype=np.float64)
+    print(f"{len(ys)} positions, {idx.shape[1]} features each ({time.perf_counter() - t0:.1f}s)")
+
+    t1 = time.perf_counter()
+    x = fit(idx, y, stages * TABLE_SIZE, ridge, iters)
+    pred = x[idx].sum(axis=1)
+    print(f"fit {time.perf_counter() - t1:.1f}s  rmse {np.sqrt(np.mean((pred - y) ** 2)):.2f} discs "
+          f"(baseline {np.sqrt(np.mean((y - y.mean()) ** 2)):.2f})")
+    w = np.clip(np.rint(x * SCORE_UNIT), -32767, 32767).astype(np.int16)
+    return PatternEvaluator(w.tolist(), stages)
+
+def main(argv: Optional[List[str]] = None):
+    ap = argparse.ArgumentParser(description="Reversi pattern evaluation tables")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    tp = sub.add_parser("train", help="棋譜からパターン表を学習する")
+    tp.add_argument("logs", nargs="+", help="1 行 1 局の棋譜ファイル（'-' で標準入力）")
+    tp.add_argument("-o", "--output", default=DEFAULT_WEIGHTS)
+    tp.add_argument("--stages", type=int, default=DEFAULT_STAGES)
+    tp.add_argument("--ridge", type=float, default=1.0, help="リッジ正則化の強さ（出現の少ないパターンを 0 に寄せる）")
+    tp.add_argument("--iters", type=int, default=300, help="共役勾配法の最大反復回数")
+    ip = sub.add_parser("info", help="パターン表の概要を表示する")
+    ip.add_argument("path", nargs="?", default=DEFAULT_WEIGHTS)
+    args = ap.parse_args(argv)
+
+    if args.cmd == "train":
+        ev = train(args.logs, args.stages, args.ridge, args.iters)
+        ev.save(args.output)
+        print(f"{args.output}: {args.stages} stages x {TABLE_SIZE} entries ({os.path.getsize(args.output)} bytes)")
+        return
+    ev = PatternEvaluator.load(args.path)
+    print(f"{args.path}: {ev.stages} stages x {TABLE_SIZE} entries")
+    for s in range(ev.stages):
+        table = ev.weights[s * TABLE_SIZE:(s + 1) * TABLE_SIZE]
+        used = sum(1 for v in table if v)
+        print(f"  stage {s}: {used} non-zero, bias {table[BIAS_INDEX] / SCORE_UNIT:+.2f} discs")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Reversi perft: 深さ N までの葉の数を数えて、着手生成の正しさと速さを確かめる。
+
+数え方（一般的なオセロの perft と同じ）:
+  - 合法手が無ければパスを 1 手として数える（深さを 1 消費する）
+  - 両者とも打てない（終局）局面は、残り深さに関係なく葉 1 個
+盤面の表現ごとに同じ木を数え、既知の値と照合して nodes/sec を表示する。
+  list     : 従来のリスト盤面（capture_line で 8 方向を走査。比較の基準）
+  adapter  : reversi_engine の legal_moves / apply_move（リスト API、中身はビットボード）
+  bitboard : reversi_bitboard の legal_moves_bb / play
+
+使い方:
+  python3 reversi_perft.py                     # 既知の値で全表現を照合（correctness suite）
+  python3 reversi_perft.py -d 8 --impl bitboard
+  python3 reversi_perft.py -d 6 --moves F5D6C3 --divide  # 任意の局面から数える（保存局面なら照合）
+"""
+from __future__ import annotations
+import argparse
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import reversi_bitboard as bb
+from reversi_book import parse_moves, replay
+from reversi_engine import (
+    BLACK, DIRS, EMPTY, SIZE, apply_move, capture_line, initial_board, legal_moves,
+)
+
+# 初期局面からの既知の値
+INITIAL_COUNTS = {1: 4, 2: 12, 3: 56, 4: 244, 5: 1396, 6: 8200, 7: 55092, 8: 390216,
+                  9: 3005288, 10: 24571284, 11: 212258800}
+
+# 保存局面: (名前, 初期局面からの着手列, {深さ: 葉の数})。値は list 表現で数えたもの
+POSITIONS: List[Tuple[str, str, Dict[int, int]]] = [
+    ("tiger", "F5D6C3D3C4F4F6F3E6E7",
+     {1: 11, 2: 134, 3: 1433, 4: 16466, 5: 188748}),
+    ("buffalo", "F5D6C3D3C4F4C5B3C2",
+     {1: 6, 2: 68, 3: 666, 4: 7528, 5: 81513}),
+    ("midgame", "F5F6E6F4E3C5C4D3C3D6F3B4G5",
+     {1: 12, 2: 147, 3: 1784, 4: 23105, 5: 287285}),
+    # 2 手目でパスになる手順がある
+    ("pass", "F5F4D3F6G7C5G4H8D6E7D7H3B6C3G5D2G3D8F7H4E3F8F3H2H5G6H1B4E6A7B3F2H6B2",
+     {1: 15, 2: 31, 3: 458, 4: 1692, 5: 24236}),
+    # 残り 6 マス。深さ 7 以降はすべて終局
+    ("endgame", "E6F6G6D6C6G7G8B6C4H8F7E3F2E7F5C3D3H5B2G5H7C5A6A7B4D7H4A1C2A3B5H6A2A4D8H3F8D2B3C8A5E8C1F4F3G1C7G3G4B1A8B7E2E1",
+     {1: 5, 2: 13, 3: 43, 4: 83, 5: 154, 6: 160, 7: 163, 8: 163}),
+]
+
+# ------------------------------ Positions ----------------------------------
+
+def position_from_moves(text: str) -> Tuple[int, int, int]:
+    """着手列を再生した局面の (black, white, 手番)。"""
+    black, white = bb.from_board(initial_board())
+    color = BLACK
+    for me, opp, sq, color in replay(parse_moves(text)):
+        me, opp, _ = bb.play(me, opp, sq)
+        black, white = (me, opp) if color == BLACK else (opp, me)
+    if text.strip():
+        color = -color
+    return black, white, color
+
+# ------------------------------ Counters -----------------------------------
+
+def perft_list(board: List[List[int]], color: int, depth: int) -> int:
+    """従来のリスト盤面だけで数える（基準実装。ビットボードは使わない）。"""
+    if depth == 0:
+        return 1
+    children = []
+    for y in range(SIZE):
+        for x in range(SIZE):
+            if board[y][x] != EMPTY:
+                continue
+            flips = []
+            for dx, dy in DIRS:
+                flips.extend(capture_line(board, x, y, dx, dy, color))
+            if flips:
+                nb = [row[:] for row in board]
+                nb[y][x] = color
+                for i, j in flips:
+                    nb[j][i] = color
+                children.append(nb)
+    if not children:
+        if not any(capture_line(board, x, y, dx, dy, -color)
+                   for y in range(SIZE) for x in range(SIZE) if board[y][x] == EMPTY
+                   for dx, dy in DIRS):
+            return 1  # 終局
+        return perft_list(board, -color, depth - 1)
+    return sum(perft_list(nb, -color, depth - 1) for nb in children)
+
+def perft_adapter(board: List[List[int]], color: int, depth: int) -> int:
+    if depth == 0:
+        return 1
+    moves = legal_moves(board, color)
+    if not moves:
+        if not legal_moves(board, -color):
+            return 1
+        return perft_adapter(board, -color, depth - 1)
+    return sum(perft_adapter(apply_move(board, x, y, color).board, -color, depth - 1) for x, y in moves)
+
+def perft_bitboard(me: int, opp: int, depth: int) -> int:
+    if depth == 0:
+        return 1
+    moves = bb.legal_moves_bb(me, opp)
+    if not moves:
+        if not bb.legal_moves_bb(opp, me):
+            return 1
+        return perft_bitboard(opp, me, depth - 1)
+    total = 0
+    for sq in bb.iter_bits(moves):
+        nme, nopp, _ = bb.play(me, opp, sq)
+        total += perft_bitboard(nopp, nme, depth - 1)
+    return total
+
+def _run_list(black: int, white: int, color: int, depth: int) -> int:
+    return perft_list(bb.to_board(black, white), color, depth)
+
+def _run_adapter(black: int, white: int, color: int, depth: int) -> int:
+    return perft_adapter(bb.to_board(black, white), color, depth)
+
+def _run_bitboard(black: int, white: int, color: int, depth: int) -> int:
+    return perft_bitboard(*bb.split(black, white, color), depth)
+
+IMPLS: Dict[str, Callable[[int, int, int, int], int]] = {
+    "list": _run_list,
+    "adapter": _run_adapter,
+    "bitboard": _run_bitboard,
+}
+
+# ------------------------------- Driver ------------------------------------
+
+def perft(impl: str, black: int, white: int, color: int, depth: int) -> Tuple[int, float]:
+    """(葉の数, 秒) を返す。"""
+    t0 = time.perf_counter()
+    n = IMPLS[impl](black, white, color, depth)
+    return n, time.perf_counter() - t0
+
+def run_suite(impls: List[str], max_depth: int, pos_depth: int) -> bool:
+    """初期局面（深さ max_depth まで）と保存局面（深さ pos_depth まで）を照合する。"""
+    cases = [("initial", "", {d: n for d, n in INITIAL_COUNTS.items() if d <= max_depth})]
+    cases += [(name, moves, {d: n for d, n in counts.items() if d <= pos_depth})
+              for name, moves, counts in POSITIONS]
+    ok = True
+    print(f"{'position':<9} {'impl':<9} {'depth':>5} {'leaves':>11} {'result':>6} {'sec':>8} {'nodes/s':>11}")
+    for name, moves, counts in cases:
+        black, white, color = position_from_moves(moves)
+        for impl in impls:
+            for depth, expected in sorted(counts.items()):
+                n, secs = perft(impl, black, white, color, depth)
+                good = n == expected
+                ok &= good
+                print(f"{name:<9} {impl:<9} {depth:>5} {n:>11} {'ok' if good else 'NG':>6} "
+                      f"{secs:>8.3f} {n / secs if secs else 0:>11,.0f}")
+                if not good:
+                    print(f"  expected {expected}", file=sys.stderr)
+    return ok
+
+def main(argv: Optional[List[str]] = None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("-d", "--depth", type=int, default=None,
+                    help="数える深さ（省略時は照合モード）")
+    ap.add_argument("--suite-depth", type=int, nargs=2, default=[7, 4], metavar=("INITIAL", "STORED"),
+                    help="照合モードで数える最大深さ（初期局面, 保存局面。既定 7 4）")
+    ap.add_argument("--impl", nargs="+", choices=sorted(IMPLS), default=["list", "adapter", "bitboard"])
+    ap.add_argument("--moves", default=None, help="初期局面からの着手列 'F5D6C3...'（この局面から数える）")
+    ap.add_argument("--divide", action="store_true", help="ルートの手ごとの内訳も表示する（bitboard で数える）")
+    args = ap.parse_args(argv)
+
+    if args.moves is None and args.depth is None:
+        sys.exit(0 if run_suite(args.impl, *args.suite_depth) else 1)
+
+    black, white, color = position_from_moves(args.moves or "")
+    depth = args.depth or 6
+    if args.divide:
+        me, opp = bb.split(black, white, color)
+        for sq in bb.iter_bits(bb.legal_moves_bb(me, opp)):
+            nme, nopp, _ = bb.play(me, opp, sq)
+            print(f"{bb.sq_to_name(sq)}: {perft_bitboard(nopp, nme, depth - 1)}")
+    if args.moves:
+        expected = next((c.get(depth) for _, m, c in POSITIONS if m == args.moves.upper()), None)
+    else:
+        expected = INITIAL_COUNTS.get(depth)
+    ok = True
+    for impl in args.impl:
+        n, secs = perft(impl, black, white, color, depth)
+        mark = "" if expected is None else ("  ok" if n == expected else f"  NG (expected {expected})")
+        ok &= expected is None or n == expected
+        print(f"{impl:<9} depth {depth}: {n} leaves  {secs:.3f}s  {n / secs if secs else 0:,.0f} nodes/s{mark}")
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Reversi game records: 対局の記録（棋譜＋手ごとの出所・思考時間・解説）と、その再生・分析。
+
+記録形式: 1 行 1 局の JSON（JSON Lines。'.gz' なら gzip）。追記だけで書き、読むときは 1 行ずつ。
+  {"ts": "2025-08-01T12:00:00", "black": "human", "white": "ai:gpt-5",
+   "moves": "F5D6C3...",        # パスは書かない（合法手が無ければ自動でパス）
+   "sources": "hlhc...",        # 1 手 1 文字（SOURCE_CODES）
+   "ms": [1200, 35, ...],       # 1 手ごとの思考時間（ミリ秒）
+   "analysis": ["", "...", ...],
+   "result": 12}                # 黒 - 白 の石差。途中で終わった対局は null
+reversi_book.py の棋譜（1 行 'F5D6C3...'）もそのまま読める。
+
+使い方:
+  python3 reversi_record.py scan reversi_games.jsonl                # 件数・勝敗・出所ごとの手数と思考時間
+  python3 reversi_record.py export reversi_games.jsonl > games.txt  # 定石・パターン学習用の 1 行 1 局
+  python3 reversi_record.py analyze reversi_games.jsonl -d 6 -j 4   # 全局面を読み直して悪手を挙げる
+"""
+from __future__ import annotations
+import argparse
+import gzip
+import json
+import os
+import sys
+import time
+from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Dict, IO, Iterable, Iterator, List, Optional
+
+from reversi_bitboard import MASK64, legal_moves_bb, play, popcount, sq_to_name, sq_to_xy
+from reversi_book import final_position, parse_moves, replay
+
+DEFAULT_RECORD = os.path.join(os.path.dirname(os.path.abspath(__file__)), "reversi_games.jsonl")
+SOURCE_CODES = {"human": "h", "local": "l", "chatgpt": "c", "chatgpt-cache": "C", "book": "b", "random": "r"}
+SOURCE_NAMES = {v: k for k, v in SOURCE_CODES.items()}
+
+@dataclass
+class GameRecord:
+    moves: str = ""                 # 'F5D6C3...'
+    sources: str = ""               # 1 手 1 文字
+    ms: List[int] = field(default_factory=list)
+    analysis: List[str] = field(default_factory=list)
+    result: Optional[int] = None    # 黒 - 白。途中で終わった対局は None
+    black: str = ""
+    white: str = ""
+    ts: str = ""
+
+    def __len__(self) -> int:
+        return len(self.moves) // 2
+
+    def add(self, name: str, source: str = "", ms: float = 0.0, analysis: str = ""):
+        self.moves += name.upper()
+        self.sources += SOURCE_CODES.get(source, "?")
+        self.ms.append(int(round(ms)))
+        self.analysis.append(analysis)
+
+    def source_of(self, ply: int) -> str:
+        return SOURCE_NAMES.get(self.sources[ply:ply + 1], "unknown")
+
+    def to_json(self) -> str:
+        return json.dumps({"ts": self.ts, "black": self.black, "white": self.white, "moves": self.moves,
+                           "sources": self.sources, "ms": self.ms, "analysis": self.analysis,
+                           "result": self.result}, ensure_ascii=False, separators=(",", ":"))
+
+    @classmethod
+    def from_line(cls, line: str) -> Optional["GameRecord"]:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            return None
+        if not line.startswith("{"):
+            return cls(moves=line.split()[0].upper())  # reversi_book.py の棋譜
+        d = json.loads(line)
+        return cls(moves=d.get("moves", ""), sources=d.get("sources", ""), ms=d.get("ms", []),
+                   analysis=d.get("analysis", []), result=d.get("result"), black=d.get("black", ""),
+                   white=d.get("white", ""), ts=d.get("ts", ""))
+
+def _open(path: str, mode: str = "rt") -> IO[str]:
+    if path == "-":
+        return sys.stdin if "r" in mode else sys.stdout
+    if path.endswith(".gz"):
+        return gzip.open(path, mode, encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+def append_game(path: str, rec: GameRecord):
+    """1 局を記録ファイルに追記する。"""
+    with _open(path, "at") as f:
+        f.write(rec.to_json() + "\n")
+
+def iter_games(paths: Iterable[str]) -> Iterator[GameRecord]:
+    """記録ファイルを 1 行ずつ読み、GameRecord を順に返す（全体をメモリに載せない）。"""
+    for path in paths:
+        f = _open(path)
+        try:
+            for lineno, line in enumerate(f, 1):
+                try:
+                    rec = GameRecord.from_line(line)
+                except ValueError as e:
+                    print(f"{path}:{lineno}: skip: {e}", file=sys.stderr)
+                    continue
+                if rec is not None:
+                    yield rec
+        finally:
+            if f is not sys.stdin:
+                f.close()
+
+# ------------------------------- Scan --------------------------------------
+
+def scan(paths: List[str]) -> Dict[str, Any]:
+    games = finished = black_wins = white_wins = plies = 0
+    by_source: Dict[str, List[int]] = defaultdict(lambda: [0, 0])  # [手数, 合計ミリ秒]
+    for rec in iter_games(paths):
+        games += 1
+        plies += len(rec)
+        if rec.result is not None:
+            finished += 1
+            black_wins += rec.result > 0
+            white_wins += rec.result < 0
+        for i, ms in enumerate(rec.ms):
+            entry = by_source[rec.source_of(i)]
+            entry[0] += 1
+            entry[1] += ms
+    return {
+        "games": games, "finished": finished, "black_wins": black_wins, "white_wins": white_wins,
+        "draws": finished - black_wins - white_wins, "avg_plies": plies / games if games else 0.0,
+        "sources": {k: {"moves": n, "avg_ms": total / n if n else 0.0} for k, (n, total) in sorted(by_source.items())},
+    }
+
+# ------------------------------ Analysis -----------------------------------
+
+_searcher = None
+_solver = None
+
+def _init_analysis():
+    global _searcher, _solver
+    from reversi_endgame import EndgameSolver
+    from reversi_search import AlphaBetaSearcher
+    _searcher = AlphaBetaSearcher()
+    _solver = EndgameSolver()
+
+def analyze_game(index: int, rec: GameRecord, depth: int, exact_empties: int,
+                 blunder_eval: int, blunder_discs: int) -> Dict[str, Any]:
+    """1 局の全局面を読み直し、手ごとの損失と悪手を返す（プロセスプールから呼ばれる）。"""
+    if _searcher is None:
+        _init_analysis()
+    from reversi_search import INF
+    _searcher.new_game()
+    try:
+        plies = list(replay(parse_moves(rec.moves)))
+    except ValueError as e:
+        return {"index": index, "error": str(e)}
+    losses = []
+    blunders = []
+    for ply, (me, opp, sq, color) in enumerate(plies):
+        nme, nopp, _ = play(me, opp, sq)
+        empties = popcount(~(me | opp) & MASK64)
+        if empties <= exact_empties:
+            best_res = _solver.solve(me, opp)
+            best = best_res.score
+            played = best if best_res.move == sq_to_xy(sq) else -_solver.solve(nopp, nme).score
+            unit, limit = "discs", blunder_discs
+        else:
+            best_res = _searcher.search(me, opp, time_limit=float("inf"), max_depth=depth, color=color)
+            best = best_res.score
+            played = best if best_res.move == sq_to_xy(sq) else \
+                -_searcher.search_node(nopp, nme, depth - 1, -INF, INF, -color)
+            unit, limit = "eval", blunder_eval
+        loss = best - played
+        losses.append(loss)
+        if loss >= limit:
+            bx, by = best_res.move
+            blunders.append({"ply": ply + 1, "color": "B" if color > 0 else "W", "move": sq_to_name(sq),
+                             "best": sq_to_name(by * 8 + bx), "loss": loss, "unit": unit,
+                             "source": rec.source_of(ply)})
+    return {"index": index, "plies": len(plies), "result": rec.result, "blunders": blunders,
+            "sources": rec.sources, "losses": losses}
+
+def analyze(paths: List[str], jobs: int, **kwargs) -> Iterator[Dict[str, Any]]:
+    """全対局を並列に分析する。読み込みは逐次で、実行中の対局は jobs*4 までに抑える。"""
+    games = enumerate(iter_games(paths))
+    if jobs <= 1:
+        _init_analysis()
+        for i, rec in games:
+            yield analyze_game(i, rec, **kwargs)
+        return
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_analysis) as pool:
+        pending = set()
+        exhausted = False
+        while pending or not exhausted:
+            while not exhausted and len(pending) < jobs * 4:
+                item = next(games, None)
+                if item is None:
+                    exhausted = True
+                else:
+                    pending.add(pool.submit(analyze_game, item[0], item[1], **kwargs))
+            if pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    yield fut.result()
+
+def main(argv: Optional[List[str]] = None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    sp = sub.add_parser("scan", help="記録を流し読みして集計する")
+    sp.add_argument("records", nargs="+")
+    ep = sub.add_parser("export", help="1 行 1 局の棋譜 'F5D6C3...' にする（終局した対局だけ）")
+    ep.add_argument("records", nargs="+")
+    ep.add_argument("--all", action="store_true", help="途中で終わった対局も出す")
+    np_ = sub.add_parser("analyze", help="全局面をローカルエンジンで読み直して悪手を挙げる")
+    np_.add_argument("records", nargs="+")
+    np_.add_argument("-d", "--depth", type=int, default=5, help="中盤の探索深さ")
+    np_.add_argument("--exact", type=int, default=10, help="空きがこの数以下なら完全読みで石差の損失を出す")
+    np_.add_argument("--blunder-eval", type=int, default=80, help="中盤で悪手とみなす評価値の損失")
+    np_.add_argument("--blunder-discs", type=int, default=6, help="終盤で悪手とみなす石差の損失")
+    np_.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1)
+    np_.add_argument("-o", "--output", default="-", help="対局ごとの分析結果 (JSON Lines) の出力先")
+    args = ap.parse_args(argv)
+
+    if args.cmd == "scan":
+        print(json.dumps(scan(args.records), ensure_ascii=False, indent=2))
+        return
+    if args.cmd == "export":
+        for rec in iter_games(args.records):
+            if args.all or rec.result is not None or _finished(rec.moves):
+                print(rec.moves)
+        return
+
+    t0 = time.perf_counter()
+    out = _open(args.output, "wt")
+    games = positions = 0
+    by_source: Dict[str, List[int]] = defaultdict(lambda: [0, 0])  # [手数, 悪手数]
+    try:
+        for res in analyze(args.records, args.jobs, depth=args.depth, exact_empties=args.exact,
+                           blunder_eval=args.blunder_eval, blunder_discs=args.blunder_discs):
+            out.write(json.dumps({k: v for k, v in res.items() if k != "losses"}, ensure_ascii=False) + "\n")
+            if "error" in res:
+                continue
+            games += 1
+            positions += res["plies"]
+            for i in range(res["plies"]):
+                by_source[SOURCE_NAMES.get(res["sources"][i:i + 1], "unknown")][0] += 1
+            for b in res["blunders"]:
+                by_source[b["source"]][1] += 1
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    elapsed = time.perf_counter() - t0
+    print(f"{games} games, {positions} positions in {elapsed:.1f}s "
+          f"({positions / elapsed if elapsed else 0:.1f} positions/s)", file=sys.stderr)
+    for source, (n, bad) in sorted(by_source.items()):
+        print(f"  {source:<14} {n:6d} moves  {bad:5d} blunders ({bad / n if n else 0:.1%})", file=sys.stderr)
+
+def _finished(moves: str) -> bool:
+    try:
+        black, white = final_position(parse_moves(moves))
+    except ValueError:
+        return False
+    return not legal_moves_bb(black, white) and not legal_moves_bb(white, black)
+
+if __name__ == "__main__":
+    main()
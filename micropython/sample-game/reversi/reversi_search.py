@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Reversi search: ビットボード上の negamax / alpha-beta 探索（反復深化＋時間制限）。
+
+- 葉の評価は reversi_eval.Evaluator（「WEIGHTS の位置評価＋可動性」）。位置評価は
+  親から差分更新した値を子へ渡し、葉では可動性だけを数える。
+- 反復深化で深さ 1, 2, 3, ... と探索し、時間切れになったら
+  最後に完了した深さの最善手を返す（深さ 1 は必ず完了させる）。
+- Zobrist ハッシュの置換表 (reversi_tt) で同一局面の再探索を省く。
+  置換表は探索器インスタンスが持つので、同じ探索器を使えば次の手番でも再利用される。
+"""
+from __future__ import annotations
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from reversi_bitboard import (
+    BLACK, SIZE, flips_bb, from_board, iter_bits, legal_moves_bb, popcount,
+    split, sq_to_xy,
+)
+from reversi_eval import EVALUATOR, MOBILITY_WEIGHT, SQ_WEIGHTS, WEIGHTS, Evaluator  # noqa: F401
+from reversi_tt import (
+    EXACT, LOWER, UPPER, TranspositionTable, zobrist_hash, zobrist_pass, zobrist_play,
+)
+
+DISC_SCORE = 10000  # 終局時の石差 1 個あたりの点（評価関数の最大値より十分大きい）
+INF = 10**9
+TIME_CHECK_MASK = 1023  # 何ノードごとに時計を見るか
+NO_MOVE = -1
+
+def evaluate_bb(me: int, opp: int) -> int:
+    """手番側 me から見た評価値（位置評価＋可動性）。"""
+    return EVALUATOR.evaluate(me, opp)
+
+def final_score(me: int, opp: int) -> int:
+    return (popcount(me) - popcount(opp)) * DISC_SCORE
+
+@dataclass
+class SearchResult:
+    move: Optional[Tuple[int, int]]  # (x, y)。合法手が無ければ None
+    score: int
+    depth: int      # 完了した探索深さ
+    nodes: int
+    elapsed: float  # 秒
+    exact: bool = False  # 終局まで読み切った値なら True（score は石差）
+    wld: bool = False    # 勝敗のみの読み切りなら True（score は符号だけ有効）
+    pondered: bool = False  # 相手の手番中に先読みしておいた結果なら True
+
+    @property
+    def nps(self) -> float:
+        return self.nodes / self.elapsed if self.elapsed > 0 else float(self.nodes)
+
+class SearchTimeout(Exception):
+    pass
+
+class AlphaBetaSearcher:
+    def __init__(self, tt_bits: int = 18, evaluator=None):
+        self.evaluator = evaluator or EVALUATOR
+        self.nodes = 0
+        self.deadline: Optional[float] = None
+        self.stop: Optional[threading.Event] = None  # セットされたら探索を打ち切る（先読みの中断用）
+        self.tt = TranspositionTable(tt_bits)
+
+    def new_game(self):
+        self.tt.clear()
+
+    def _out_of_time(self) -> bool:
+        return ((self.deadline is not None and time.perf_counter() > self.deadline)
+                or (self.stop is not None and self.stop.is_set()))
+
+    def search(self, me: int, opp: int, time_limit: float = 1.0, max_depth: int = SIZE * SIZE,
+               color: int = BLACK, stop: Optional[threading.Event] = None) -> SearchResult:
+        """me (= color) の手番で time_limit 秒まで反復深化し、最善手を返す。"""
+        t0 = time.perf_counter()
+        self.nodes = 0
+        self.stop = stop
+        self.tt.new_search()
+        root_moves = list(iter_bits(legal_moves_bb(me, opp)))
+        if not root_moves:
+            return SearchResult(move=None, score=self.evaluator.evaluate(me, opp), depth=0, nodes=0, elapsed=0.0)
+        h = zobrist_hash(*((me, opp) if color == BLACK else (opp, me)), color)
+        root_moves.sort(key=SQ_WEIGHTS.__getitem__, reverse=True)
+        hit = self.tt.probe(h)
+        if hit is not None and hit[4] in root_moves:
+            root_moves.remove(hit[4])
+            root_moves.insert(0, hit[4])  # 前の手番で読んだ最善手から
+
+        best_sq, best_val, done_depth = root_moves[0], -INF, 0
+        for depth in range(1, max_depth + 1):
+            # 深さ 1 は時間制限なしで必ず完了させる
+            self.deadline = t0 + time_limit if depth > 1 else None
+            try:
+                val, scores = self._search_root(me, opp, root_moves, depth, h, color)
+            except SearchTimeout:
+                break
+            # 次の反復は今回の評価順に並べ替える（最善手から探索）
+            root_moves.sort(key=lambda sq: scores[sq], reverse=True)
+            best_sq, best_val, done_depth = root_moves[0], val, depth
+            self.tt.store(h, depth, EXACT, val, best_sq)
+            if abs(val) >= DISC_SCORE or time.perf_counter() - t0 >= time_limit:
+                break  # 終局まで読み切った / 時間切れ
+        self.deadline = None
+        self.stop = None
+        return SearchResult(move=sq_to_xy(best_sq), score=best_val, depth=done_depth,
+                            nodes=self.nodes, elapsed=time.perf_counter() - t0)
+
+    def search_node(self, me: int, opp: int, depth: int, alpha: int, beta: int, color: int,
+                    deadline: Optional[float] = None) -> int:
+        """1 局面を固定深さ・窓 (alpha, beta) で探索した値（並列探索のワーカー用）。
+
+        deadline（perf_counter 基準）を過ぎるか stop がセットされたら SearchTimeout。
+        """
+        self.deadline = deadline
+        try:
+            h = zobrist_hash(*((me, opp) if color == BLACK else (opp, me)), color)
+            return self._negamax(me, opp, depth, alpha, beta, h, color, self.evaluator.position(me, opp))
+        finally:
+            self.deadline = None
+
+    def _search_root(self, me: int, opp: int, moves: List[int], depth: int,
+                     h: int, color: int) -> Tuple[int, Dict[int, int]]:
+        alpha, beta = -INF, INF
+        scores: Dict[int, int] = {}
+        ev = self.evaluator
+        pos = ev.position(me, opp)
+        for sq in moves:
+            f = flips_bb(me, opp, sq)
+            v = -self._negamax(opp ^ f, me | f | (1 << sq), depth - 1, -beta, -alpha,
+                               zobrist_play(h, sq, f, color), -color, -ev.child_position(pos, sq, f))
+            scores[sq] = v
+            if v > alpha:
+                alpha = v
+        return alpha, scores
+
+    def _negamax(self, me: int, opp: int, depth: int, alpha: int, beta: int, h: int, color: int, pos: int) -> int:
+        """pos は me から見た位置評価（親から差分更新して渡す）。"""
+        self.nodes += 1
+        if not (self.nodes & TIME_CHECK_MASK) and self._out_of_time():
+            raise SearchTimeout()
+        if depth <= 0:
+            return self.evaluator.leaf(me, opp, pos)
+        moves = legal_moves_bb(me, opp)
+        if not moves:
+            if not legal_moves_bb(opp, me):
+                return final_score(me, opp)
+            return -self._negamax(opp, me, depth - 1, -beta, -alpha, zobrist_pass(h), -color, -pos)  # パス
+
+        alpha0 = alpha
+        tt_move = NO_MOVE
+        e = self.tt.probe(h)
+        if e is not None:
+            _, e_depth, e_bound, e_score, tt_move, _ = e
+            if e_depth >= depth:
+                if e_bound == EXACT:
+                    return e_score
+                if e_bound == LOWER:
+                    alpha = max(alpha, e_score)
+                else:
+                    beta = min(beta, e_score)
+                if alpha >= beta:
+                    return e_score
+
+        ordered = sorted(iter_bits(moves), key=SQ_WEIGHTS.__getitem__, reverse=True)
+        if tt_move != NO_MOVE and (moves >> tt_move) & 1:
+            ordered.remove(tt_move)
+            ordered.insert(0, tt_move)
+        best, best_sq = -INF, ordered[0]
+        ev = self.evaluator
+        for sq in ordered:
+            f = flips_bb(me, opp, sq)
+            v = -self._negamax(opp ^ f, me | f | (1 << sq), depth - 1, -beta, -alpha,
+                               zobrist_play(h, sq, f, color), -color, -ev.child_position(pos, sq, f))
+            if v > best:
+                best, best_sq = v, sq
+                if v > alpha:
+                    alpha = v
+                    if alpha >= beta:
+                        break
+
+        bound = UPPER if best <= alpha0 else LOWER if best >= beta else EXACT
+        self.tt.store(h, depth, bound, best, best_sq)
+        return best
+
+def search_best_move(board: List[List[int]], color: int, time_limit: float = 1.0,
+                     searcher: Optional[AlphaBetaSearcher] = None,
+                     stop: Optional[threading.Event] = None) -> SearchResult:
+    """リスト盤面用の入口。searcher を渡すと同じインスタンスを使い回す。"""
+    me, opp = split(*from_board(board), color)
+    return (searcher or AlphaBetaSearcher()).search(me, opp, time_limit, color=color, stop=stop)
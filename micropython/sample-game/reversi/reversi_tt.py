@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Reversi transposition table: Zobrist ハッシュと固定サイズの置換表。
+
+- ハッシュは着手ごとに差分更新する（置いた石＋反転した石＋手番）。
+  石の反転は「黒→白」「白→黒」どちらでも FLIP_KEYS[sq] の XOR で済む。
+- 置換表はハッシュ下位ビットで引く固定長の配列。各エントリは
+  (key, depth, bound, score, best_sq, generation) を持つ。
+- 置き換え方針: 空き・古い探索(generation違い)・同じ以上の深さなら上書き。
+  generation は探索ごとに進めるので、1 ゲーム中は前の手番の結果を再利用できる。
+"""
+from __future__ import annotations
+import random
+from typing import List, Optional, Tuple
+
+from reversi_bitboard import BLACK, SIZE, iter_bits
+
+EXACT, LOWER, UPPER = 0, 1, 2  # bound type
+
+_rng = random.Random(20250801)  # 固定シードで再現性を保つ
+BLACK_KEYS = [_rng.getrandbits(64) for _ in range(SIZE * SIZE)]
+WHITE_KEYS = [_rng.getrandbits(64) for _ in range(SIZE * SIZE)]
+FLIP_KEYS = [b ^ w for b, w in zip(BLACK_KEYS, WHITE_KEYS)]
+SIDE_KEY = _rng.getrandbits(64)  # 白番のとき XOR する
+
+Entry = Tuple[int, int, int, int, int, int]  # key, depth, bound, score, best_sq, generation
+
+def zobrist_hash(black: int, white: int, color: int) -> int:
+    h = 0
+    for sq in iter_bits(black):
+        h ^= BLACK_KEYS[sq]
+    for sq in iter_bits(white):
+        h ^= WHITE_KEYS[sq]
+    if color != BLACK:
+        h ^= SIDE_KEY
+    return h
+
+def zobrist_play(h: int, sq: int, flips: int, color: int) -> int:
+    """color が sq に打って flips を反転した後のハッシュ（手番も相手に移る）。"""
+    h ^= (BLACK_KEYS if color == BLACK else WHITE_KEYS)[sq] ^ SIDE_KEY
+    while flips:
+        low = flips & -flips
+        h ^= FLIP_KEYS[low.bit_length() - 1]
+        flips ^= low
+    return h
+
+def zobrist_pass(h: int) -> int:
+    return h ^ SIDE_KEY
+
+class TranspositionTable:
+    def __init__(self, bits: int = 18):
+        self.size = 1 << bits
+        self.mask = self.size - 1
+        self.clear()
+
+    def clear(self):
+        self.table: List[Optional[Entry]] = [None] * self.size
+        self.generation = 0
+        self.filled = 0
+        self.probes = 0
+        self.hits = 0
+
+    def new_search(self):
+        """探索 1 回ごとに呼ぶ。古いエントリは上書き優先になる（削除はしない）。"""
+        self.generation += 1
+        self.probes = 0
+        self.hits = 0
+
+    def probe(self, key: int) -> Optional[Entry]:
+        self.probes += 1
+        e = self.table[key & self.mask]
+        if e is not None and e[0] == key:
+            self.hits += 1
+            return e
+        return None
+
+    def store(self, key: int, depth: int, bound: int, score: int, best_sq: int):
+        i = key & self.mask
+        old = self.table[i]
+        if old is None:
+            self.filled += 1
+        elif old[5] == self.generation and old[1] > depth and old[0] != key:
+            return  # 今回の探索で得た、より深いエントリは残す
+        self.table[i] = (key, depth, bound, score, best_sq, self.generation)
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.probes if self.probes else 0.0
+
+    @property
+    def occupancy(self) -> float:
+        return self.filled / self.size
+
+    def stats_text(self) -> str:
+        return (f"TT: hit {self.hit_rate:.1%} ({self.hits}/{self.probes}) / "
+                f"occupancy {self.occupancy:.1%} ({self.filled}/{self.size})")
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+起動時の import 時間の内訳（python -X importtime を集計）。
+
+tictactoe_gui_select_ai を新しいインタプリタで import し、直下の import ごとの累積時間を多い順に出す。
+プロバイダの SDK（openai / google.generativeai）は打ち手が選ばれるまで読み込まないので、
+それぞれ単独で import した時間を「起動時に読み込まなくなった分」として並べる。
+
+  python3 bench_import.py --repeat 5
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Optional, Tuple
+
+from player_registry import SDK_MODULES
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+def importtime(module: str) -> Tuple[Optional[int], Dict[str, int]]:
+    """module を import した累積時間（µs、失敗なら None）と、直下の import ごとの累積時間。"""
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          cwd=HERE, capture_output=True, text=True)
+    total = None
+    children: Dict[str, int] = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit():
+            continue  # 見出し行
+        depth = (len(name) - len(name.lstrip())) // 2
+        if depth == 0 and name.strip() == module:
+            total = int(cumulative)
+        elif depth == 1:
+            children[name.strip()] = children.get(name.strip(), 0) + int(cumulative)
+    return (total if proc.returncode == 0 else None), children
+
+def median_importtime(module: str, repeat: int) -> Tuple[Optional[float], Dict[str, float]]:
+    runs = [importtime(module) for _ in range(repeat)]
+    if any(total is None for total, _ in runs):
+        return None, {}
+    names = set().union(*(children for _, children in runs))
+    return (statistics.median(total for total, _ in runs),
+            {name: statistics.median(children.get(name, 0) for _, children in runs) for name in names})
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--repeat", type=int, default=5, help="同じ計測を何回して中央値を取るか")
+    ap.add_argument("--top", type=int, default=10)
+    args = ap.parse_args()
+
+    total, children = median_importtime("tictactoe_gui_select_ai", args.repeat)
+    if total is None:
+        sys.exit("tictactoe_gui_select_ai を import できませんでした")
+    print(f"import tictactoe_gui_select_ai: {total / 1000:7.1f} ms (median of {args.repeat})")
+    ranked: List[Tuple[str, float]] = sorted(children.items(), key=lambda kv: kv[1], reverse=True)
+    for name, us in ranked[:args.top]:
+        print(f"  {name:<28} {us / 1000:7.1f} ms  {us / total:6.1%}")
+
+    deferred = 0.0
+    print("provider SDKs (imported only when that player is selected):")
+    for provider, module in SDK_MODULES.items():
+        sdk_total, _ = median_importtime(module, args.repeat)
+        if sdk_total is None:
+            print(f"  {module:<28} not installed")
+            continue
+        deferred += sdk_total
+        print(f"  {module:<28} {sdk_total / 1000:7.1f} ms")
+    if deferred:
+        print(f"startup saved vs. importing the SDKs eagerly: ~{deferred / 1000:.1f} ms "
+              f"({deferred / (total + deferred):.0%} of the old import time)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+三目並べ minimax のノード数ベンチマーク。
+
+  naive : 従来の PlayerLocalMinimax（メモなし、毎ノード全ラインを作って勝ち判定）
+  memo  : 対称形で正規化したメモ表つき negamax（1 回目 = メモ表が空 / 2 回目 = 対局をまたいで再利用）
+  table : 完全読みの表（tictactoe_table）を引くだけ（PlayerLocalMinimax.select_move の 3×3）
+
+空の盤面での初手と、到達可能な全局面（自分=1 の手番）での手を比べ、naive と memo が同じ手を選ぶこと、
+table の手が最善（minimax の値が同じ）であることも確かめる。
+  python3 bench_minimax.py
+"""
+import math
+import time
+
+import player_local_minimax
+from player_local_minimax import PlayerLocalMinimax
+from tictactoe_table import get_table
+
+class NaiveMinimax(PlayerLocalMinimax):
+    """従来の minimax（ノード数を数えるだけ追加）。"""
+    def search_move(self, board):
+        self.nodes = 0
+        best_score = -math.inf
+        best_move = None
+        for i in range(len(board)):
+            for j in range(len(board[i])):
+                if board[i][j] == 0:
+                    board[i][j] = 1
+                    score = self.minimax(board, False)
+                    board[i][j] = 0
+                    if score > best_score:
+                        best_score = score
+                        best_move = (i, j)
+        return best_move
+
+    def minimax(self, board, is_maximizing):
+        self.nodes += 1
+        winner = self.check_winner(board)
+        if winner is not None:
+            return winner
+        if all(cell != 0 for row in board for cell in row):
+            return 0
+        mark, pick = (1, max) if is_maximizing else (-1, min)
+        best_score = -math.inf if is_maximizing else math.inf
+        for i in range(len(board)):
+            for j in range(len(board[i])):
+                if board[i][j] == 0:
+                    board[i][j] = mark
+                    best_score = pick(best_score, self.minimax(board, not is_maximizing))
+                    board[i][j] = 0
+        return best_score
+
+def reachable_positions():
+    """勝負が付いていない到達可能な局面のうち、自分(1)の手番のもの（先手・後手の両方）。"""
+    seen = set()
+    out = []
+    judge = PlayerLocalMinimax()
+    def walk(board, to_move):
+        key = tuple(c for row in board for c in row)
+        if key in seen:
+            return
+        seen.add(key)
+        if judge.check_winner(board) is not None or 0 not in key:
+            return
+        if to_move == 1:
+            out.append([row[:] for row in board])
+        for i in range(3):
+            for j in range(3):
+                if board[i][j] == 0:
+                    board[i][j] = to_move
+                    walk(board, -to_move)
+                    board[i][j] = 0
+    empty = [[0] * 3 for _ in range(3)]
+    walk(empty, 1)   # 自分が先手
+    walk(empty, -1)  # 自分が後手
+    return out
+
+def timed(player, board, table=False):
+    select = player.select_move if table else player.search_move
+    t0 = time.perf_counter()
+    mv = select([row[:] for row in board])
+    return mv, time.perf_counter() - t0
+
+def main():
+    naive, memo = NaiveMinimax(), PlayerLocalMinimax()
+    empty = [[0] * 3 for _ in range(3)]
+    player_local_minimax._MEMO.clear()
+    get_table()  # 表の読み込み（無ければ作成）は計測に含めない
+    rows = [("naive", *timed(naive, empty), naive.nodes, 0)]
+    rows.append(("memo (cold)", *timed(memo, empty), memo.nodes, memo.lookups))
+    rows.append(("memo (warm)", *timed(memo, empty), memo.nodes, memo.lookups))
+    rows.append(("table", *timed(memo, empty, table=True), memo.nodes, memo.lookups))
+    print("first move on the empty board")
+    for name, mv, t, nodes, lookups in rows:
+        print(f"  {name:<12} move {mv}  {nodes:7d} nodes  {lookups:5d} lookups  {t * 1000:9.2f} ms")
+    print(f"  memo table: {len(player_local_minimax._MEMO)} canonical positions")
+
+    positions = reachable_positions()
+    t_naive = t_memo = t_table = 0.0
+    nodes_naive = nodes_memo = 0
+    for board in positions:
+        mv_a, t = timed(naive, board)
+        t_naive += t
+        nodes_naive += naive.nodes
+        mv_b, t = timed(memo, board)
+        t_memo += t
+        nodes_memo += memo.nodes + memo.lookups
+        assert mv_a == mv_b, (board, mv_a, mv_b)
+        mv_c, t = timed(memo, board, table=True)
+        t_table += t
+        best = memo.minimax(board, True)
+        board[mv_c[0]][mv_c[1]] = 1
+        assert memo.minimax(board, False) == best, (board, mv_c)
+        board[mv_c[0]][mv_c[1]] = 0
+    print(f"all {len(positions)} reachable positions (naive and memo pick the same moves, table moves are optimal)")
+    print(f"  naive {nodes_naive:9d} nodes  {t_naive:8.2f} s")
+    print(f"  memo  {nodes_memo:9d} nodes+lookups  {t_memo:8.2f} s  ({t_naive / t_memo:.0f}x)")
+    print(f"  table {len(positions):9d} lookups        {t_table:8.2f} s  ({t_naive / t_table:.0f}x)")
+
+if __name__ == "__main__":
+    main()
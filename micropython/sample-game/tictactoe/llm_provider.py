@@ -0,0 +1,146 @@
+"""
+三目並べの LLM の打ち手（GUI の AIPlayer、PlayerOpenAI / PlayerGemini）が使うプロンプト・応答の解析・プロバイダ。
+
+  OpenAIProvider / GeminiProvider : 本物の API（SDK は available() か最初の問い合わせで player_registry.load_sdk から import）
+  StubProvider                    : API を使わない偽物。プロンプトの合法手から選び、遅延・失敗・非合法手を真似る
+
+環境変数 TTT_LLM_STUB=1 で default_provider() が StubProvider を返す（API なしでのベンチマーク用）。
+  TTT_LLM_STUB_LATENCY : 平均の応答時間（秒、指数分布。既定 0）
+  TTT_LLM_STUB_ILLEGAL : 非合法手を返す割合（既定 0）
+  TTT_LLM_STUB_ERROR   : 例外を投げる割合（既定 0）
+  TTT_LLM_STUB_SEED    : 乱数の種（省略時は毎回違う）
+その他: OPENAI_MODEL（既定 'gpt-3.5-turbo'）、GEMINI_MODEL（既定 'gemini-pro'）
+"""
+import json
+import os
+import random
+import re
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from player_registry import load_sdk
+
+def build_prompt(board: List[List[int]], mark: int = 1, k: Optional[int] = None) -> str:
+    """board[y][x]（X=1, O=-1, 空=0）で mark の手番の手を、[x, y] の JSON で答えさせるプロンプト。k は省略すると盤の一辺。"""
+    n = len(board)
+    k = k or n
+    who = "O" if mark == -1 else "X"
+    game = "三目並べ(Tic-Tac-Toe)" if (n, k) == (3, 3) else f"{n}×{n}の盤で縦・横・斜めに{k}個並べたら勝ちのゲーム"
+    rows = "\n".join(" ".join({1: "X", -1: "O"}.get(v, ".") for v in row) for row in board)
+    legal = [[x, y] for y in range(n) for x in range(n) if board[y][x] == 0]
+    return f"""あなたは{game}のAIです。盤面と合法手から、あなた({who})の最善手を1つ選び、JSONで返してください。
+座標は [x, y]（x=列, y=行, 0始まり）です。
+盤面:
+{rows}
+合法手: {json.dumps(legal)}
+出力例: {{"move": [x, y], "reason": "中央が空いているので有利"}}"""
+
+def parse_response(text: str) -> Dict[str, Any]:
+    """応答テキストの JSON（```json ... ``` で囲まれていても、前後に文があってもよい）。"""
+    try:
+        if "```json" in text:
+            text = text.split("```json")[1].split("```")[0]
+        elif "```" in text:
+            text = text.split("```")[1].split("```")[0]
+        return json.loads(text)
+    except (json.JSONDecodeError, IndexError):
+        start, end = text.find("{"), text.rfind("}")
+        if start != -1 and end != -1:
+            return json.loads(text[start:end + 1])
+        raise ValueError(f"JSON応答の解析に失敗しました: {text[:80]!r}")
+
+def parse_move(text: str) -> Tuple[int, int]:
+    """応答テキストの "move" を (x, y) で返す。"""
+    move = parse_response(text)["move"]
+    return int(move[0]), int(move[1])
+
+def ask_move(provider, board: List[List[int]], k: Optional[int] = None) -> Tuple[int, int]:
+    """自分=1 / 相手=-1 の盤面で provider に手を尋ね、PlayerBase と同じ (row, col) で返す（合法かどうかは確かめない）。"""
+    x, y = parse_move(provider.complete(build_prompt(board, 1, k)))
+    return (y, x)
+
+def percentile(values: List[float], p: float) -> float:
+    """最近順位法の p パーセンタイル（values が空なら 0）。応答時間の集計用。"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, min(len(ordered) - 1, int(round(p / 100 * len(ordered))) - 1))]
+
+class OpenAIProvider:
+    def __init__(self, model: Optional[str] = None):
+        self.model = model or os.environ.get("OPENAI_MODEL", "gpt-3.5-turbo")
+        self.client = None
+
+    def available(self) -> bool:
+        """APIキーがあり SDK を import できるか（ここで初めて SDK を読み込む）。"""
+        return bool(os.environ.get("OPENAI_API_KEY")) and load_sdk("openai") is not None
+
+    def complete(self, prompt: str) -> str:
+        if self.client is None:
+            if not self.available():
+                raise RuntimeError("OpenAI APIキーが設定されていません（または openai SDK がありません）。")
+            self.client = load_sdk("openai").OpenAI()
+        resp = self.client.chat.completions.create(
+            model=self.model,
+            messages=[{"role": "system", "content": "あなたは三目並べの強いAIです。"},
+                      {"role": "user", "content": prompt}],
+            temperature=0.1,
+            max_tokens=100,
+        )
+        return resp.choices[0].message.content
+
+class GeminiProvider:
+    def __init__(self, model: Optional[str] = None):
+        self.model_name = model or os.environ.get("GEMINI_MODEL", "gemini-pro")
+        self.model = None
+
+    def available(self) -> bool:
+        """APIキーがあり SDK を import できるか（ここで初めて SDK を読み込む）。"""
+        return bool(os.environ.get("GEMINI_API_KEY")) and load_sdk("gemini") is not None
+
+    def complete(self, prompt: str) -> str:
+        if self.model is None:
+            if not self.available():
+                raise RuntimeError("Gemini APIキーが設定されていません（または google-generativeai SDK がありません）。")
+            genai = load_sdk("gemini")
+            genai.configure(api_key=os.environ["GEMINI_API_KEY"])
+            self.model = genai.GenerativeModel(self.model_name)
+        return self.model.generate_content(prompt).text
+
+class StubProvider:
+    """API を呼ばない偽のプロバイダ。"""
+    def __init__(self, latency: float = 0.0, illegal_rate: float = 0.0, error_rate: float = 0.0,
+                 seed: Optional[int] = None):
+        self.latency = latency
+        self.illegal_rate = illegal_rate
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+
+    @classmethod
+    def from_env(cls) -> "StubProvider":
+        seed = os.environ.get("TTT_LLM_STUB_SEED")
+        return cls(latency=float(os.environ.get("TTT_LLM_STUB_LATENCY", "0")),
+                   illegal_rate=float(os.environ.get("TTT_LLM_STUB_ILLEGAL", "0")),
+                   error_rate=float(os.environ.get("TTT_LLM_STUB_ERROR", "0")),
+                   seed=int(seed) if seed else None)
+
+    def available(self) -> bool:
+        return True
+
+    def complete(self, prompt: str) -> str:
+        if self.latency > 0:
+            time.sleep(self.rng.expovariate(1.0 / self.latency))
+        if self.rng.random() < self.error_rate:
+            raise RuntimeError("stub: 応答エラー")
+        legal = json.loads(re.search(r"^合法手: (.*)$", prompt, re.M).group(1))
+        if not legal or self.rng.random() < self.illegal_rate:
+            move = [-1, -1]
+        else:
+            move = self.rng.choice(legal)
+        return json.dumps({"move": move, "reason": "stub"})
+
+def default_provider(name: str):
+    """name ('openai' / 'gemini') のプロバイダ。TTT_LLM_STUB=1 なら StubProvider。"""
+    if os.environ.get("TTT_LLM_STUB", "0") == "1":
+        return StubProvider.from_env()
+    return {"openai": OpenAIProvider, "gemini": GeminiProvider}[name]()
@@ -1,11 +1,16 @@
 from player_base import PlayerBase
+from llm_provider import ask_move, default_provider
 
 class PlayerGemini(PlayerBase):
     CLASS_LABEL = "Gemini"
     """
     Gemini APIを使った打ち手クラス。
+    盤面は 0:空, 1:自分, -1:相手。provider を省略すると GeminiProvider
+    （TTT_LLM_STUB=1 なら API を呼ばない StubProvider）。
     """
+    def __init__(self, provider=None, k=None):
+        self.provider = provider or default_provider("gemini")
+        self.k = k  # 並べる数（プロンプト用。省略時は盤の一辺）
+
     def select_move(self, board):
-        # 仮実装: API呼び出し部分は未実装
-        # 実際はGemini APIを使って手を決定する
-        return (0, 0)
+        return ask_move(self.provider, board, self.k)
@@ -0,0 +1,22 @@
+from player_base import PlayerBase
+from tictactoe_nk import NKBoard, NKSearcher, X
+
+class PlayerLocalAlphaBeta(PlayerBase):
+    CLASS_LABEL = "Local(αβ)"
+    """
+    N×N・k 目並べの alpha-beta 探索（tictactoe_nk）で手を選ぶローカルAI。
+    盤面は 0:空, 1:自分, -1:相手 で表現されていると仮定。k を省略すると盤の一辺と同じ。
+    """
+    def __init__(self, k=None, time_limit=1.0, width=12):
+        self.k = k
+        self.time_limit = time_limit
+        self.searcher = NKSearcher(width)
+        self.last_result = None
+
+    def select_move(self, board):
+        b = NKBoard.from_board(board, self.k or len(board), X)  # 自分(1)を X として読む
+        self.last_result = self.searcher.search(b, self.time_limit)
+        if self.last_result.move is None:
+            return None
+        x, y = self.last_result.move
+        return (y, x)
@@ -1,52 +1,138 @@
 from player_base import PlayerBase
-import math
+from tictactoe_table import get_table
+from typing import Dict, List, Tuple
+
+def _lines_through(n: int) -> List[List[Tuple[int, ...]]]:
+    """マス k (= i*n + j) を通る縦・横・斜めのライン（マス番号の組）の一覧。"""
+    lines = [tuple(i * n + j for j in range(n)) for i in range(n)]             # 横
+    lines += [tuple(i * n + j for i in range(n)) for j in range(n)]            # 縦
+    lines.append(tuple(i * n + i for i in range(n)))                           # 斜め
+    lines.append(tuple(i * n + n - 1 - i for i in range(n)))                   # 逆斜め
+    return [[line for line in lines if k in line] for k in range(n * n)]
+
+def _symmetries(n: int) -> List[Tuple[int, ...]]:
+    """盤の 8 対称（回転 4 × 鏡映 2）。perm[k] = 変換後のマス k に来る元のマス番号。"""
+    perms = []
+    for transpose in (False, True):
+        for flip_i in (False, True):
+            for flip_j in (False, True):
+                perm = []
+                for i in range(n):
+                    for j in range(n):
+                        si, sj = (j, i) if transpose else (i, j)
+                        if flip_i:
+                            si = n - 1 - si
+                        if flip_j:
+                            sj = n - 1 - sj
+                        perm.append(si * n + sj)
+                perms.append(tuple(perm))
+    return perms
+
+# 盤の大きさごとに 1 度だけ作る表と、対局・インスタンスをまたいで共有するメモ表
+_TABLES: Dict[int, Tuple[List[List[Tuple[int, ...]]], List[Tuple[int, ...]]]] = {}
+_MEMO: Dict[Tuple[int, int], int] = {}  # (n, 正規化した局面の 3 進コード) → 手番側から見た値
+
+def _tables(n: int):
+    if n not in _TABLES:
+        _TABLES[n] = (_lines_through(n), _symmetries(n))
+    return _TABLES[n]
 
 class PlayerLocalMinimax(PlayerBase):
     CLASS_LABEL = "Local(minimax)"
     """
     Minimax法で最善手を選ぶローカルAI。
     盤面は 0:空, 1:自分, -1:相手 で表現されていると仮定。
+
+    3×3 は完全読みの表（tictactoe_table）を引くだけ。表に無い局面や他の大きさの盤は
+    手番側から見た値（勝ち 1 / 引き分け 0 / 負け -1）の negamax で、局面を 8 対称のうち
+    3 進コードが最小のものに正規化してメモ表に覚える。勝ち判定は直前に置いたマスを通るラインだけ見る。
     """
+    def __init__(self):
+        self.nodes = 0    # 実際に展開した局面数
+        self.lookups = 0  # メモ表で済んだ局面数
+
     def select_move(self, board):
-        best_score = -math.inf
+        if len(board) == 3:
+            flat = [cell for row in board for cell in row]
+            # 自分(1)の石が相手と同数なら自分が X（先手）、1 個少なければ O
+            sign = 1 if flat.count(1) == flat.count(-1) else -1
+            self.nodes = self.lookups = 0
+            mv = get_table().best_move([[cell * sign for cell in row] for row in board], sign)
+            if mv is not None:
+                self.lookups = 1
+                return (mv[1], mv[0])
+        return self.search_move(board)
+
+    def search_move(self, board):
+        """表を使わずに探索で選ぶ（値が同じ手は先に見つけたもの）。"""
+        n = len(board)
+        lines, _ = _tables(n)
+        cells = [cell for row in board for cell in row]
+        self.nodes = self.lookups = 0
+        best_score = -2
         best_move = None
-        for i in range(len(board)):
-            for j in range(len(board[i])):
-                if board[i][j] == 0:
-                    board[i][j] = 1
-                    score = self.minimax(board, False)
-                    board[i][j] = 0
-                    if score > best_score:
-                        best_score = score
-                        best_move = (i, j)
+        for k in range(n * n):
+            if cells[k] == 0:
+                cells[k] = 1
+                score = self._value_after(cells, k, 1, n, lines)
+                cells[k] = 0
+                if score > best_score:
+                    best_score = score
+                    best_move = (k // n, k % n)
         return best_move
 
     def minimax(self, board, is_maximizing):
+        """自分(1)から見た値。is_maximizing なら自分の手番。"""
         winner = self.check_winner(board)
         if winner is not None:
             return winner
         if all(cell != 0 for row in board for cell in row):
             return 0  # 引き分け
-        if is_maximizing:
-            best_score = -math.inf
-            for i in range(len(board)):
-                for j in range(len(board[i])):
-                    if board[i][j] == 0:
-                        board[i][j] = 1
-                        score = self.minimax(board, False)
-                        board[i][j] = 0
-                        best_score = max(score, best_score)
-            return best_score
-        else:
-            best_score = math.inf
-            for i in range(len(board)):
-                for j in range(len(board[i])):
-                    if board[i][j] == 0:
-                        board[i][j] = -1
-                        score = self.minimax(board, True)
-                        board[i][j] = 0
-                        best_score = min(score, best_score)
-            return best_score
+        cells = [cell for row in board for cell in row]
+        me = 1 if is_maximizing else -1
+        return me * self._negamax(cells, me, len(board))
+
+    def _value_after(self, cells: List[int], k: int, me: int, n: int, lines) -> int:
+        """me がマス k に置いた直後の局面の、me から見た値。"""
+        for line in lines[k]:
+            if all(cells[c] == me for c in line):
+                return 1
+        if 0 not in cells:
+            return 0  # 引き分け
+        return -self._negamax(cells, -me, n)
+
+    def _key(self, cells: List[int], me: int, n: int) -> Tuple[int, int]:
+        digits = [0 if c == 0 else (1 if c == me else 2) for c in cells]  # 手番側=1, 相手=2
+        best = None
+        for perm in _tables(n)[1]:
+            code = 0
+            for src in perm:
+                code = code * 3 + digits[src]
+            if best is None or code < best:
+                best = code
+        return (n, best)
+
+    def _negamax(self, cells: List[int], me: int, n: int) -> int:
+        """me の手番（勝負はまだ付いていない）の局面の、me から見た値。"""
+        key = self._key(cells, me, n)
+        value = _MEMO.get(key)
+        if value is not None:
+            self.lookups += 1
+            return value
+        self.nodes += 1
+        lines = _tables(n)[0]
+        value = -1
+        for k in range(n * n):
+            if cells[k] == 0:
+                cells[k] = me
+                score = self._value_after(cells, k, me, n, lines)
+                cells[k] = 0
+                if score > value:
+                    value = score
+                    if value == 1:
+                        break  # 勝ちより良い値は無い
+        _MEMO[key] = value
+        return value
 
     def check_winner(self, board):
         # 横・縦・斜めの勝敗判定
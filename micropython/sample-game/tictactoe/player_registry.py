@@ -0,0 +1,58 @@
+"""
+三目並べの打ち手の一覧（GUI の選択肢などで共有する）。
+
+打ち手のモジュールやプロバイダの SDK（openai / google.generativeai）は、その打ち手が
+選ばれて初めて import する。ローカルの打ち手だけで遊ぶときは SDK を読み込まないので起動が速い。
+"""
+import importlib
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+@dataclass(frozen=True)
+class PlayerSpec:
+    key: str
+    label: str
+    target: Optional[str] = None  # PlayerBase のサブクラス "module:Class"。None なら GUI の AIPlayer(key)
+    sdk: Optional[str] = None     # 使うプロバイダ（SDK_MODULES のキー）
+
+    def load(self):
+        """打ち手のクラスを import して返す。"""
+        module, attr = self.target.split(":")
+        return getattr(importlib.import_module(module), attr)
+
+PLAYERS: Dict[str, PlayerSpec] = {}
+
+def register(key: str, label: str, target: Optional[str] = None, sdk: Optional[str] = None):
+    PLAYERS[key] = PlayerSpec(key, label, target, sdk)
+
+# 表示名は各クラスの CLASS_LABEL と同じ（一覧を出すだけならモジュールを import しない）
+register("human", "人間", "player_human:PlayerHuman")
+register("openai", "OpenAI", sdk="openai")
+register("gemini", "Gemini", sdk="gemini")
+register("ensemble", "Ensemble")  # 設定済みの全プロバイダに同時に問い合わせる
+register("local_random", "Local(random)", "player_local_random:PlayerLocalRandom")
+register("local_minimax", "Local(minimax)", "player_local_minimax:PlayerLocalMinimax")
+register("local_alphabeta", "Local(αβ)", "player_local_alphabeta:PlayerLocalAlphaBeta")
+register("offline", "オフライン(従来)AI")
+
+def player_types() -> List[Tuple[str, str]]:
+    """(key, 表示名) の一覧（登録順）。"""
+    return [(spec.key, spec.label) for spec in PLAYERS.values()]
+
+def get(key: str) -> PlayerSpec:
+    if key not in PLAYERS:
+        raise KeyError(f"未登録の打ち手です: {key}")
+    return PLAYERS[key]
+
+# ---- プロバイダ SDK ----
+
+SDK_MODULES = {"openai": "openai", "gemini": "google.generativeai"}
+
+@lru_cache(maxsize=None)
+def load_sdk(provider: str):
+    """provider の SDK モジュール（入っていなければ None）。初めて呼ばれたときだけ import する。"""
+    try:
+        return importlib.import_module(SDK_MODULES[provider])
+    except Exception:
+        return None
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+三目並べ（N×N・k 目並べ）の headless 対戦: GUI なしで PlayerBase の打ち手同士を何千局も打たせ、結果を JSON で出す。
+
+打ち手の指定:
+  local_random / local_minimax / local_alphabeta : player_registry に登録された打ち手
+  openai / gemini  : PlayerOpenAI / PlayerGemini（--stub-llm で API を呼ばない StubProvider に差し替え）
+  module:Class     : 任意の PlayerBase のサブクラス（コンストラクタが k / time_limit を取るなら渡す）
+
+打ち手には自分=1 / 相手=-1 の盤面を渡し、(row, col) を受け取る。盤の外・埋まったマス・None・例外は
+非合法手としてその局を負けにし、回数を数える。先後は 1 局ごとに入れ替える。
+局はまとめて（バッチ単位で）ProcessPoolExecutor に投げ、打ち手はバッチごとに 1 回だけ作る。
+
+使い方:
+  python3 tictactoe_arena.py local_minimax local_random -n 2000 -j 4
+  python3 tictactoe_arena.py openai local_minimax -n 500 --stub-llm --stub-latency 0.002 --stub-illegal 0.05
+  python3 tictactoe_arena.py local_alphabeta local_random --size 9 -k 5 -t 0.05 -n 20 -o result.json
+"""
+from __future__ import annotations
+import argparse
+import importlib
+import inspect
+import json
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+import player_registry
+from llm_provider import percentile
+from tictactoe_nk import NKBoard, O, X
+
+# registry で GUI 側の AIPlayer 扱いになっている打ち手の PlayerBase 版
+LLM_PLAYERS = {"openai": "player_openai:PlayerOpenAI", "gemini": "player_gemini:PlayerGemini"}
+
+# ------------------------------- Players -----------------------------------
+
+def load_player_class(spec: str):
+    if spec in LLM_PLAYERS:
+        spec = LLM_PLAYERS[spec]
+    if ":" in spec:
+        module, attr = spec.split(":")
+        return getattr(importlib.import_module(module), attr)
+    entry = player_registry.get(spec)
+    if entry.target is None:
+        raise ValueError(f"PlayerBase の打ち手ではありません: {spec}")
+    return entry.load()
+
+def make_player(spec: str, k: int, time_limit: float):
+    cls = load_player_class(spec)
+    params = inspect.signature(cls).parameters
+    kwargs = {name: value for name, value in (("k", k), ("time_limit", time_limit)) if name in params}
+    return cls(**kwargs)
+
+# ------------------------------- Match -------------------------------------
+
+def _legal(move, board: List[List[int]]) -> bool:
+    n = len(board)
+    return (isinstance(move, (tuple, list)) and len(move) == 2
+            and all(isinstance(v, int) for v in move)
+            and 0 <= move[0] < n and 0 <= move[1] < n and board[move[0]][move[1]] == 0)
+
+def play_game(players: Dict[str, Any], a_first: bool, n: int, k: int, stats: Dict[str, Dict[str, Any]]) -> int:
+    """1 局打つ。A から見た結果（勝ち 1 / 引き分け 0 / 負け -1）を返し、stats に手ごとの記録を足す。"""
+    marks = {X: "A", O: "B"} if a_first else {X: "B", O: "A"}
+    b = NKBoard(n, k)
+    board = [[0] * n for _ in range(n)]
+    while b.winner is None and not b.is_full():
+        mark = b.mark
+        key = marks[mark]
+        relative = [[v * mark for v in row] for row in board]
+        t0 = time.perf_counter()
+        try:
+            move = players[key].select_move(relative)
+            error = False
+        except Exception:
+            move, error = None, True
+        stats[key]["latency"].append(time.perf_counter() - t0)
+        stats[key]["moves"] += 1
+        if error or not _legal(move, board):
+            stats[key]["errors" if error else "illegal"] += 1
+            return -1 if key == "A" else 1  # 非合法手は負け
+        row, col = move
+        board[row][col] = mark
+        b.play(row * n + col)
+    if b.winner is None:
+        return 0
+    return 1 if marks[b.winner] == "A" else -1
+
+def play_batch(spec_a: str, spec_b: str, first: int, count: int, n: int, k: int,
+               time_limit: float, seed: int) -> Dict[str, Any]:
+    """first 局目から count 局打つ（偶数局目は A が先手）。"""
+    random.seed(seed + first)
+    players = {}
+    for i, key in enumerate(("A", "B")):
+        # --stub-llm の StubProvider もバッチごとに決まった種で作る（同じ --seed なら同じ結果）
+        os.environ["TTT_LLM_STUB_SEED"] = str((seed + first) * 2 + i)
+        players[key] = make_player(spec_a if key == "A" else spec_b, k, time_limit)
+    stats = {key: {"moves": 0, "illegal": 0, "errors": 0, "latency": []} for key in players}
+    results = [play_game(players, i % 2 == 0, n, k, stats) for i in range(first, first + count)]
+    return {"results": results, "stats": stats}
+
+def run_match(spec_a: str, spec_b: str, games: int, jobs: int, seed: int, n: int = 3, k: int = 3,
+              time_limit: float = 0.1, batch: Optional[int] = None) -> Dict[str, Any]:
+    # バッチはワーカーあたり 4 つ程度（打ち手の生成とプロセス間のやり取りを局数で割る）
+    batch = batch or max(1, -(-games // (max(1, jobs) * 4)))
+    tasks = [(spec_a, spec_b, first, min(batch, games - first), n, k, time_limit, seed)
+             for first in range(0, games, batch)]
+    t0 = time.perf_counter()
+    if jobs > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            batches = list(pool.map(play_batch, *zip(*tasks)))
+    else:
+        batches = [play_batch(*t) for t in tasks]
+    elapsed = time.perf_counter() - t0
+
+    results = [r for out in batches for r in out["results"]]
+    wins_a = results.count(1)
+    wins_b = results.count(-1)
+    draws = games - wins_a - wins_b
+    report: Dict[str, Any] = {"games": games, "size": n, "k": k, "draws": draws,
+                              "elapsed_s": round(elapsed, 3),
+                              "games_per_s": round(games / elapsed, 1) if elapsed else None,
+                              "players": {}}
+    for key, spec, wins, losses in (("A", spec_a, wins_a, wins_b), ("B", spec_b, wins_b, wins_a)):
+        latency = [t for out in batches for t in out["stats"][key]["latency"]]
+        report["players"][key] = {
+            "spec": spec,
+            "wins": wins,
+            "losses": losses,
+            "win_rate": (wins + 0.5 * draws) / games if games else 0.0,
+            "moves": sum(out["stats"][key]["moves"] for out in batches),
+            "mean_ms": round(1000 * sum(latency) / len(latency), 4) if latency else 0.0,
+            "p95_ms": round(1000 * percentile(latency, 95), 4),
+            "illegal": sum(out["stats"][key]["illegal"] for out in batches),
+            "errors": sum(out["stats"][key]["errors"] for out in batches),
+        }
+    return report
+
+def main(argv: Optional[List[str]] = None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("a", help="打ち手 A の指定")
+    ap.add_argument("b", help="打ち手 B の指定")
+    ap.add_argument("-n", "--games", type=int, default=1000)
+    ap.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1, help="並列プロセス数")
+    ap.add_argument("--size", type=int, default=3, help="盤の一辺")
+    ap.add_argument("-k", type=int, default=None, help="何個並べたら勝ちか（既定は盤の一辺）")
+    ap.add_argument("-t", "--time-limit", type=float, default=0.1, help="時間制限つきの打ち手の 1 手の秒数")
+    ap.add_argument("--batch", type=int, default=None, help="1 タスクの局数（既定は自動）")
+    ap.add_argument("--seed", type=int, default=0,
+                    help="乱数の種（local_random と --stub-llm のスタブ。同じ種・同じ -j / --batch なら同じ結果）")
+    ap.add_argument("--stub-llm", action="store_true", help="openai / gemini を API なしの StubProvider で打たせる")
+    ap.add_argument("--stub-latency", type=float, default=0.0, help="スタブの平均応答時間（秒）")
+    ap.add_argument("--stub-illegal", type=float, default=0.0, help="スタブが非合法手を返す割合")
+    ap.add_argument("--stub-error", type=float, default=0.0, help="スタブが例外を投げる割合")
+    ap.add_argument("-o", "--output", default="-", help="JSON の出力先（'-' で標準出力）")
+    args = ap.parse_args(argv)
+
+    if args.stub_llm:
+        # ワーカープロセスにも環境変数で伝わる（llm_provider.default_provider が読む）
+        os.environ["TTT_LLM_STUB"] = "1"
+        os.environ["TTT_LLM_STUB_LATENCY"] = str(args.stub_latency)
+        os.environ["TTT_LLM_STUB_ILLEGAL"] = str(args.stub_illegal)
+        os.environ["TTT_LLM_STUB_ERROR"] = str(args.stub_error)
+    k = args.k or args.size
+    NKBoard(args.size, k)  # n / k の指定ミスは対局前に落とす
+    for spec in (args.a, args.b):
+        load_player_class(spec)
+    report = run_match(args.a, args.b, args.games, args.jobs, args.seed, args.size, k,
+                       args.time_limit, args.batch)
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output == "-":
+        print(text)
+    else:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+
+if __name__ == "__main__":
+    main()
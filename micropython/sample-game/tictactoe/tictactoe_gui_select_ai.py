@@ -5,38 +5,36 @@ from dataclasses import dataclass
 Tic-Tac-Toe (三目並べ) GUI for macOS/Windows/Linux.
 - マウスで着手（あなた=X）、AI=O。
 - 対戦相手を OpenAI / Gemini / オフラインAI から選択可能。
+  Ensemble は設定済みの全プロバイダに同時に問い合わせ、最初の合法な答え（または過半数）で打つ。
+- 盤の大きさ（3×3 の三目並べ〜15×15 の五目並べ）を開始時に選べる。
+  3×3 以外のオフラインAIは tictactoe_nk の alpha-beta 探索で打つ。
 
 環境変数:
   OPENAI_API_KEY   : OpenAI APIキー（省略可）
   GEMINI_API_KEY   : Gemini APIキー（省略可）
   OPENAI_MODEL     : 既定 'gpt-3.5-turbo'
+  TTT_AI_TIMEOUT   : AIの 1 手の制限時間（秒、既定 15）。超えたらオフラインAIの手で打つ
+  TTT_ENSEMBLE_QUORUM : Ensemble で何個の合法な答えがそろったら多数決するか（既定 1 = 最初の答え）
 """
 import os
-import json
+import threading
 import time
+from collections import Counter, deque
+from concurrent.futures import FIRST_COMPLETED, Future, wait
 from typing import List, Optional, Tuple, Dict, Any
 
-try:
-    from openai import OpenAI
-    _OPENAI_AVAILABLE = True
-except Exception:
-    _OPENAI_AVAILABLE = False
-    OpenAI = None
-
-try:
-    import google.generativeai as genai
-    _GEMINI_AVAILABLE = True
-except Exception:
-    _GEMINI_AVAILABLE = False
-    genai = None
-
-
 import tkinter as tk
 from tkinter import messagebox
 
+import player_registry
+from llm_provider import build_prompt, default_provider, parse_response, percentile
+from tictactoe_table import get_table
+
 SIZE = 3
 EMPTY, X, O = 0, 1, -1
 MARKS = {X: 'X', O: 'O', EMPTY: ''}
+BOARD_CHOICES = [(3, 3, "3×3 三目"), (5, 4, "5×5 四目"), (9, 5, "9×9 五目"), (15, 5, "15×15 五目")]  # (n, k, 表示)
+OFFLINE_TIME = 1.0  # 3×3 以外のオフラインAIの 1 手の時間（秒）
 
 @dataclass
 class MoveResult:
@@ -45,22 +43,47 @@ class MoveResult:
     draw: bool
 
 # --- Game Logic ---
-def initial_board() -> List[List[int]]:
-    return [[EMPTY for _ in range(SIZE)] for _ in range(SIZE)]
+# 盤の大きさは len(board)、k（並べる数）は省略すると盤の一辺と同じ（3×3 なら三目並べ）
+def initial_board(n: int = SIZE) -> List[List[int]]:
+    return [[EMPTY for _ in range(n)] for _ in range(n)]
 
 def legal_moves(board: List[List[int]]) -> List[Tuple[int, int]]:
-    return [(x, y) for y in range(SIZE) for x in range(SIZE) if board[y][x] == EMPTY]
+    n = len(board)
+    return [(x, y) for y in range(n) for x in range(n) if board[y][x] == EMPTY]
 
-def apply_move(board: List[List[int]], x: int, y: int, mark: int) -> Optional[MoveResult]:
+def apply_move(board: List[List[int]], x: int, y: int, mark: int, k: Optional[int] = None) -> Optional[MoveResult]:
     if board[y][x] != EMPTY:
         return None
     nb = [row[:] for row in board]
     nb[y][x] = mark
-    win = check_win(nb)
-    draw = all(nb[j][i] != EMPTY for j in range(SIZE) for i in range(SIZE)) and win is None
+    win = check_win_at(nb, x, y, k)
+    draw = all(v != EMPTY for row in nb for v in row) and win is None
     return MoveResult(board=nb, win=win, draw=draw)
 
-def check_win(board: List[List[int]]) -> Optional[int]:
+def check_win_at(board: List[List[int]], x: int, y: int, k: Optional[int] = None) -> Optional[int]:
+    """(x, y) を通る縦・横・斜めに k 個並んでいれば、その印を返す（直前の手の勝ち判定）。"""
+    n, mark = len(board), board[y][x]
+    k = k or n
+    if mark == EMPTY:
+        return None
+    for dx, dy in ((1, 0), (0, 1), (1, 1), (1, -1)):
+        run = 1
+        for sgn in (1, -1):
+            cx, cy = x + sgn * dx, y + sgn * dy
+            while 0 <= cx < n and 0 <= cy < n and board[cy][cx] == mark:
+                run += 1
+                cx, cy = cx + sgn * dx, cy + sgn * dy
+        if run >= k:
+            return mark
+    return None
+
+def check_win(board: List[List[int]], k: Optional[int] = None) -> Optional[int]:
+    if len(board) != SIZE or (k or SIZE) != SIZE:
+        for y, row in enumerate(board):
+            for x, v in enumerate(row):
+                if v != EMPTY and check_win_at(board, x, y, k):
+                    return v
+        return None
     for i in range(SIZE):
         if abs(sum(board[i])) == SIZE and board[i][0] != EMPTY:
             return board[i][0]
@@ -73,10 +96,17 @@ def check_win(board: List[List[int]]) -> Optional[int]:
     return None
 
 # --- Offline AI ---
-def best_legal_move(board: List[List[int]], mark: int) -> Optional[Tuple[int, int]]:
+def best_legal_move(board: List[List[int]], mark: int, k: Optional[int] = None) -> Optional[Tuple[int, int]]:
     moves = legal_moves(board)
     if not moves:
         return None
+    if len(board) != SIZE or (k or SIZE) != SIZE:
+        from tictactoe_nk import best_move
+        return best_move(board, mark, k or len(board), OFFLINE_TIME)
+    # 3×3 は完全読みの表を引く（表に無い局面＝手番と石の数が合わない盤面だけ以下の手順で選ぶ）
+    mv = get_table().best_move(board, mark)
+    if mv is not None:
+        return mv
     # 1. 勝てる手
     for x, y in moves:
         res = apply_move(board, x, y, mark)
@@ -98,106 +128,157 @@ def best_legal_move(board: List[List[int]], mark: int) -> Optional[Tuple[int, in
     return moves[0]
 
 # --- AI Player Integration ---
+AI_TIMEOUT = float(os.environ.get("TTT_AI_TIMEOUT", "15"))
+ENSEMBLE_QUORUM = int(os.environ.get("TTT_ENSEMBLE_QUORUM", "1"))
+# Ensemble が待つ時間。全プロバイダ失敗時のオフラインAI（最大 OFFLINE_TIME）と結果の受け渡しの分を
+# AI_TIMEOUT より短くしておかないと、GUI の時間切れが先に来て Ensemble の結果（理由・応答時間）が捨てられる
+ENSEMBLE_TIMEOUT = AI_TIMEOUT - min(OFFLINE_TIME + 0.5, AI_TIMEOUT / 2)
+LATENCY_WINDOW = 100  # プロバイダごとに覚えておく応答時間の数
+
 class AIPlayer:
-    def __init__(self, ai_type: str):
+    def __init__(self, ai_type: str, k: Optional[int] = None):
         self.ai_type = ai_type
-        self.online_mode = ai_type in ["openai", "gemini"]
-
-        # ChatGPT setup
-        self.openai_available = _OPENAI_AVAILABLE and bool(os.environ.get("OPENAI_API_KEY"))
-        self.openai_model_name = os.environ.get("OPENAI_MODEL", "gpt-3.5-turbo")
-        self.openai_client = OpenAI() if self.openai_available else None
-
-        # Gemini setup
-        self.gemini_available = _GEMINI_AVAILABLE and bool(os.environ.get("GEMINI_API_KEY"))
-        if self.gemini_available and genai:
-            genai.configure(api_key=os.environ["GEMINI_API_KEY"])
-            self.gemini_model = genai.GenerativeModel('gemini-pro')
-        else:
-            self.gemini_model = None
-
-    def board_to_str(self, board: List[List[int]]) -> str:
-        return '\n'.join(' '.join(MARKS[v] or '.' for v in row) for row in board)
+        self.k = k  # 並べる数（省略時は盤の一辺）
+        self.online_mode = ai_type in ["openai", "gemini", "ensemble"]
+
+        # プロバイダ（llm_provider。TTT_LLM_STUB=1 なら API を呼ばないスタブ）。
+        # SDK はこの種類の AI が選ばれたときに初めて import する（player_registry.load_sdk）
+        # Ensemble は使えるプロバイダすべてに同時に問い合わせる
+        self.providers = {}
+        for name in ("openai", "gemini"):
+            if ai_type in (name, "ensemble"):
+                provider = default_provider(name)
+                if provider.available():
+                    self.providers[name] = provider
+        self.openai_available = "openai" in self.providers
+        self.gemini_available = "gemini" in self.providers
+        self.quorum = ENSEMBLE_QUORUM
+        self.latency: Dict[str, deque] = {}
+        self._latency_lock = threading.Lock()
 
     def build_prompt(self, board: List[List[int]], mark: int) -> str:
-        legal = legal_moves(board)
-        who = 'O' if mark == O else 'X'
-        return f'''あなたは三目並べ(Tic-Tac-Toe)のAIです。盤面と合法手から、あなた({who})の最善手を1つ選び、JSONで返してください。
-盤面:
-{self.board_to_str(board)}
-合法手: {legal}
-出力例: {{'move': [x, y], 'reason': '中央が空いているので有利'}}'''
+        return build_prompt(board, mark, self.k)
 
     def choose(self, board: List[List[int]], mark: int) -> Dict[str, Any]:
         if self.ai_type == "offline":
-            mv = best_legal_move(board, mark)
+            mv = best_legal_move(board, mark, self.k)
             return {"move": mv, "reason": "オフラインAI"}
+        if self.ai_type == "ensemble":
+            return self._choose_ensemble(board, mark)
 
         prompt = self.build_prompt(board, mark)
         try:
-            if self.ai_type == "openai":
-                if not self.openai_client:
-                    raise Exception("OpenAI APIキーが設定されていません。")
-                text = self._choose_openai_text(prompt)
-            elif self.ai_type == "gemini":
-                if not self.gemini_model:
-                    raise Exception("Gemini APIキーが設定されていません。")
-                text = self._choose_gemini_text(prompt)
-            else:
+            if self.ai_type not in ("openai", "gemini"):
                 raise Exception(f"Unknown AI type: {self.ai_type}")
-
-            data = self._parse_json_response(text)
+            # キーが無ければ default_provider の complete が理由つきの例外を出す
+            provider = self.providers.get(self.ai_type) or default_provider(self.ai_type)
+            data = parse_response(provider.complete(prompt))
             move = tuple(data.get("move", [None, None]))
             reason = data.get("reason", "")
             return {"move": move, "reason": reason}
 
         except Exception as e:
-            mv = best_legal_move(board, mark)
+            mv = best_legal_move(board, mark, self.k)
             return {"move": mv, "reason": f"(API失敗→オフラインAI) {e}"}
 
-    def _choose_openai_text(self, prompt: str) -> str:
-        payload = {
-            "messages": [
-                {"role": "system", "content": "あなたは三目並べの強いAIです。"},
-                {"role": "user", "content": prompt}
-            ],
-            "temperature": 0.1,
-            "max_tokens": 100,
-        }
-        resp = self.openai_client.chat.completions.create(
-            model=self.openai_model_name,
-            **payload
-        )
-        return resp.choices[0].message.content
-
-    def _choose_gemini_text(self, prompt: str) -> str:
-        response = self.gemini_model.generate_content(prompt)
-        return response.text
-
-    def _parse_json_response(self, text: str) -> Dict[str, Any]:
-        try:
-            # Handle potential markdown code blocks
-            if "```json" in text:
-                text = text.split("```json")[1].split("```")[0]
-            elif "```" in text:
-                text = text.split("```")[1].split("```")[0]
-
-            return json.loads(text)
-        except (json.JSONDecodeError, IndexError):
-            # Fallback for non-json responses
-            # Try to find a json-like string
-            start = text.find('{')
-            end = text.rfind('}')
-            if start != -1 and end != -1:
-                json_str = text[start:end+1]
-                return json.loads(json_str)
-            raise ValueError("JSON応答の解析に失敗しました。")
+    def _choose_ensemble(self, board: List[List[int]], mark: int) -> Dict[str, Any]:
+        """全プロバイダに同時に問い合わせ、quorum 個の合法な答えがそろった時点の多数決で打つ。
+
+        quorum=1 なら最初の合法な答え。残りの問い合わせは待たずに打ち切る（応答時間だけは記録する）。
+        """
+        if not self.providers:
+            mv = best_legal_move(board, mark, self.k)
+            return {"move": mv, "reason": "(APIキー未設定→オフラインAI)"}
+        prompt = self.build_prompt(board, mark)
+        legal = set(legal_moves(board))
+        t0 = time.perf_counter()
+        futures: Dict[Future, str] = {}
+        for name, provider in self.providers.items():
+            future = run_in_thread(provider.complete, prompt)
+            future.add_done_callback(lambda f, name=name: self._record_latency(name, time.perf_counter() - t0))
+            futures[future] = name
+        quorum = max(1, min(self.quorum, len(futures)))
+        answers: List[Tuple[str, Tuple[int, int], str]] = []  # 届いた順の (プロバイダ, 手, 理由)
+        errors: List[str] = []
+        pending = set(futures)
+        while pending and len(answers) < quorum:
+            remaining = ENSEMBLE_TIMEOUT - (time.perf_counter() - t0)
+            if remaining <= 0:
+                break
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = futures[future]
+                try:
+                    data = parse_response(future.result())
+                    move = tuple(data.get("move", [None, None]))
+                except Exception as e:
+                    errors.append(f"{name}: {e}")
+                    continue
+                if move in legal:
+                    answers.append((name, move, data.get("reason", "")))
+                else:
+                    errors.append(f"{name}: 非合法手 {move}")
+        for future in pending:
+            future.cancel()  # 実行中の問い合わせは止められないので、結果が来ても使わない
+        if not answers:
+            if pending:
+                errors.append(f"{', '.join(sorted(futures[f] for f in pending))}: 時間切れ {ENSEMBLE_TIMEOUT:g}s")
+            mv = best_legal_move(board, mark, self.k)
+            return {"move": mv, "reason": f"(全プロバイダ失敗→オフラインAI) {'; '.join(errors)}\n{self.latency_text()}"}
+        votes = Counter(move for _, move, _ in answers)
+        # 票が多い手、同数なら先に届いた手
+        move = max(votes, key=lambda m: (votes[m], -next(i for i, a in enumerate(answers) if a[1] == m)))
+        name, _, reason = next(a for a in answers if a[1] == move)
+        voters = ", ".join(f"{n}={m}" for n, m, _ in answers)
+        return {"move": move, "reason": f"[{name}] {reason}\n(採用 {votes[move]}/{len(answers)}票: {voters})\n{self.latency_text()}"}
+
+    def _record_latency(self, name: str, seconds: float):
+        with self._latency_lock:
+            self.latency.setdefault(name, deque(maxlen=LATENCY_WINDOW)).append(seconds)
+
+    def latency_text(self) -> str:
+        """プロバイダごとの応答時間のパーセンタイル（打ち切った問い合わせも、応答が来た時点で数える）。"""
+        with self._latency_lock:
+            samples = {name: list(values) for name, values in self.latency.items()}
+        parts = [f"{name} p50 {percentile(v, 50):.2f}s p90 {percentile(v, 90):.2f}s p99 {percentile(v, 99):.2f}s (n={len(v)})"
+                 for name, v in sorted(samples.items()) if v]
+        return "応答時間: " + (" / ".join(parts) if parts else "まだありません")
+
+
+class PlayerAdapter:
+    """PlayerBase（select_move は自分=1 の盤面で (row, col) を返す）を AIPlayer と同じ choose で使う。"""
+    def __init__(self, ai_type: str, player):
+        self.ai_type = ai_type
+        self.player = player
 
+    def choose(self, board: List[List[int]], mark: int) -> Dict[str, Any]:
+        mine = [[v * mark for v in row] for row in board]  # 自分=1, 相手=-1
+        mv = self.player.select_move(mine)
+        return {"move": (mv[1], mv[0]) if mv else None, "reason": self.player.CLASS_LABEL}
+
+def run_in_thread(fn, *args) -> Future:
+    """fn(*args) をデーモンスレッドで実行し、結果を Future で返す。
+
+    応答待ちの API 呼び出しは止められないので、ウィンドウを閉じたときに待たされないようデーモンにする。
+    """
+    future: Future = Future()
+    def work():
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(fn(*args))
+        except BaseException as e:
+            future.set_exception(e)
+    threading.Thread(target=work, daemon=True).start()
+    return future
 
 # --- GUI ---
 CELL = 100
+MIN_CELL = 32  # 大きな盤でのマスの最小サイズ
 PAD = 24
 BOARD_SIZE = SIZE * CELL
+POLL_MS = 50  # AIの結果を見に行く間隔
+SPINNER = "◐◓◑◒"
 
 class TicTacToeGUI:
     def __init__(self, root: tk.Tk):
@@ -215,10 +296,16 @@ class TicTacToeGUI:
         self.info.grid(row=1, column=0, sticky="ew")
         self.advice = tk.Text(root, width=40, height=4, wrap="word")
         self.advice.grid(row=2, column=0, sticky="ew")
+        tk.Button(root, text="新規ゲーム", command=self.new_game).grid(row=3, column=0, pady=4)
+        self.generation = 0  # 対局ごとに増やす。古い対局向けのAI結果・予約した処理は捨てる
+        # (future, generation, 開始時刻, 印, 結果の処理, オフラインAIの代打ちか)
+        self._pending: Optional[Tuple[Future, int, float, int, Any, bool]] = None
         self.human_player = None
         self.game_mode = None
         self.last_x_player = 'human'
         self.last_o_player = 'offline'
+        self.n, self.k = SIZE, SIZE
+        self.cell = CELL
         self.ask_game_mode()
 
     def on_keypress(self, event):
@@ -226,7 +313,7 @@ class TicTacToeGUI:
             return
 
         if self.game_mode == 'hvh' or self.turn == self.human_player:
-            if event.char in '123456789':
+            if self.n == SIZE and event.char in '123456789':
                 idx = int(event.char) - 1
                 x, y = idx % 3, idx // 3
                 if 0 <= x < SIZE and 0 <= y < SIZE:
@@ -238,7 +325,7 @@ class TicTacToeGUI:
             return
 
         current_player = self.turn
-        res = apply_move(self.board, x, y, current_player)
+        res = apply_move(self.board, x, y, current_player, self.k)
         if not res:
             return
         self.board = res.board
@@ -255,28 +342,89 @@ class TicTacToeGUI:
         if self.game_mode == 'hvh':
             self.info.config(text=self.status_text())
         else: # Human vs AI
-            self.update_advice("AI思考中…")
             self.busy = True
-            self.root.after(100, self.ai_move)
+            self.after_in_game(100, self.ai_move)
+
+    # --- AIの手番（ワーカースレッドで考え、結果はメインスレッドで root.after から受け取る） ---
+    def after_in_game(self, ms: int, fn):
+        """今の対局が続いていれば ms 後に fn を呼ぶ（リセット後に古い予約が動かないように）。"""
+        gen = self.generation
+        self.root.after(ms, lambda: fn() if gen == self.generation else None)
+
+    def start_ai_turn(self, ai, mark: int, on_result):
+        """ai.choose をワーカーで実行し、終わったら on_result(result, dt) をメインスレッドで呼ぶ。"""
+        self.busy = True
+        board = [row[:] for row in self.board]
+        self._pending = (run_in_thread(ai.choose, board, mark), self.generation, time.time(), mark, on_result, False)
+        self.update_advice(f"AI({MARKS[mark]})思考中…")
+        self.root.after(POLL_MS, self._poll_ai)
+
+    def start_fallback(self, mark: int, t0: float, on_result, note: str):
+        """AIが失敗・時間切れのとき、オフラインAIの手もワーカーで考える（3×3 以外は 1 手 OFFLINE_TIME 秒かかる）。"""
+        board, k = [row[:] for row in self.board], self.k
+        def offline():
+            return {"move": best_legal_move(board, mark, k), "reason": note, "offline": True}
+        self._pending = (run_in_thread(offline), self.generation, t0, mark, on_result, True)
+        self.root.after(POLL_MS, self._poll_ai)
+
+    def _poll_ai(self):
+        if self._pending is None:
+            return
+        future, gen, t0, mark, on_result, fallback = self._pending
+        if gen != self.generation:
+            self._pending = None  # リセットされた対局
+            return
+        dt = time.time() - t0
+        if future.done():
+            self._pending = None
+            try:
+                result = future.result()
+            except Exception as e:
+                if not fallback:
+                    self.start_fallback(mark, t0, on_result, f"(AI例外→オフラインAI) {e}")
+                    return
+                result = {"move": None, "reason": f"(オフラインAI例外) {e}"}
+            on_result(result, dt)
+            return
+        if dt > AI_TIMEOUT and not fallback:  # 代打ちのオフラインAIは OFFLINE_TIME で終わるので待つ
+            future.cancel()  # 実行中の問い合わせは止められないので、結果が来ても捨てる
+            self.start_fallback(mark, t0, on_result, f"(時間切れ {AI_TIMEOUT:g}s→オフラインAI)")
+            return
+        self.info.config(text=f"{self.status_text()}  {SPINNER[int(dt * 8) % len(SPINNER)]} AI({MARKS[mark]})思考中… {dt:.1f}s")
+        self.root.after(POLL_MS, self._poll_ai)
+
+    def cancel_ai(self):
+        """考え中のAIの結果を捨て、予約済みの処理も無効にする。"""
+        self.generation += 1
+        if self._pending is not None:
+            self._pending[0].cancel()
+            self._pending = None
+        self.busy = False
+
+    def new_game(self):
+        self.cancel_ai()
+        self.ask_game_mode()
+
+    def valid_move(self, result: Dict[str, Any], mark: int) -> Optional[Tuple[int, int]]:
+        """AIの応答の手が盤上の空きマスなら (x, y)。"""
+        mv = result.get("move")
+        if isinstance(mv, (list, tuple)) and len(mv) == 2 and self.on_board(*mv) and self.board[mv[1]][mv[0]] == EMPTY:
+            return (mv[0], mv[1])
+        return None
 
     def ask_game_mode(self):
         dialog = tk.Toplevel(self.root)
         dialog.title("対戦モードを選択")
 
-        # --- Player X Selection ---
-        from player_human import PlayerHuman
-        from player_local_random import PlayerLocalRandom
-        from player_local_minimax import PlayerLocalMinimax
-        from player_openai import PlayerOpenAI
-        from player_gemini import PlayerGemini
-        player_types = [
-            ("human", PlayerHuman.CLASS_LABEL),
-            ("openai", PlayerOpenAI.CLASS_LABEL),
-            ("gemini", PlayerGemini.CLASS_LABEL),
-            ("local_random", PlayerLocalRandom.CLASS_LABEL),
-            ("local_minimax", PlayerLocalMinimax.CLASS_LABEL),
-            ("offline", "オフライン(従来)AI")
-        ]
+        # --- Player X Selection ---（一覧は player_registry から。モジュールは選ばれるまで import しない）
+        player_types = player_registry.player_types()
+        tk.Label(dialog, text="盤の大きさ:", font=("Arial", 12, "bold")).pack(anchor='w', padx=10, pady=5)
+        size_var = tk.IntVar(value=next(i for i, (n, k, _) in enumerate(BOARD_CHOICES) if (n, k) == (self.n, self.k)))
+        size_frame = tk.Frame(dialog)
+        for i, (_, _, label) in enumerate(BOARD_CHOICES):
+            tk.Radiobutton(size_frame, text=label, variable=size_var, value=i).pack(side='left')
+        size_frame.pack(padx=20, anchor='w')
+
         tk.Label(dialog, text="先手 (X):", font=("Arial", 12, "bold")).pack(anchor='w', padx=10, pady=5)
         x_player_var = tk.StringVar(value=self.last_x_player)
         x_frame = tk.Frame(dialog)
@@ -296,19 +444,20 @@ class TicTacToeGUI:
             o_player = o_player_var.get()
             self.last_x_player = x_player
             self.last_o_player = o_player
+            self.n, self.k, _ = BOARD_CHOICES[size_var.get()]
             dialog.destroy()
 
             def make_ai(ai_type):
-                if ai_type == 'local_random':
-                    from player_local_random import PlayerLocalRandom
-                    return PlayerLocalRandom()
-                elif ai_type == 'local_minimax':
-                    from player_local_minimax import PlayerLocalMinimax
-                    return PlayerLocalMinimax()
-                elif ai_type in ['openai', 'gemini', 'offline']:
-                    return AIPlayer(ai_type)
-                else:
+                if ai_type == 'local_minimax' and (self.n, self.k) != (SIZE, SIZE):
+                    ai_type = 'local_alphabeta'  # 3×3 より大きい盤では全探索の minimax は終わらないので alpha-beta で代用
+                spec = player_registry.get(ai_type)
+                if spec.target is None:
+                    return AIPlayer(ai_type, self.k)
+                if ai_type == 'local_alphabeta':
+                    return PlayerAdapter(ai_type, spec.load()(self.k, OFFLINE_TIME))
+                if ai_type == 'human':
                     return None
+                return PlayerAdapter(ai_type, spec.load()())
 
             if x_player == 'human' and o_player == 'human':
                 self.game_mode = 'hvh'
@@ -347,62 +496,60 @@ class TicTacToeGUI:
     def start_ai_vs_ai(self):
         self.game_mode = 'ava'
         self.reset_game()
-        self.root.after(100, self.ai_vs_ai_move)
+        self.after_in_game(100, self.ai_vs_ai_move)
 
     def ai_vs_ai_move(self):
         if self.busy:
             return
-
         ai = self.ai_x if self.turn == X else self.ai_o
+        self.start_ai_turn(ai, self.turn, self.on_ai_vs_ai_result)
 
-        t0 = time.time()
-        result = ai.choose(self.board, self.turn)
-        dt = time.time() - t0
-        mv = result.get("move")
+    def on_ai_vs_ai_result(self, result: Dict[str, Any], dt: float):
+        self.busy = False
         reason = result.get("reason", "")
-
-        if mv and isinstance(mv, list):
-            mv = tuple(mv)
-
-        if mv and isinstance(mv, tuple) and len(mv) == 2 and mv[0] is not None and mv[1] is not None:
-            res = apply_move(self.board, mv[0], mv[1], self.turn)
-            if res:
-                self.board = res.board
-                self.draw()
-                self.update_advice(f"AI({MARKS[self.turn]})手: {mv} (応答 {dt:.1f}s)\
-{reason}")
-                if res.win:
-                    self.finish_game(f"AI({MARKS[res.win]})の勝ち！")
-                    return
-                if res.draw:
-                    self.finish_game("引き分け！")
-                    return
+        mv = self.valid_move(result, self.turn)
+        if mv is None:
+            if result.get("move"):
+                self.update_advice(f"AI({MARKS[self.turn]})が無効な手を指しました: {result.get('move')}。")
             else:
-                self.update_advice(f"AI({MARKS[self.turn]})が無効な手を指しました: {mv}。")
-                self.finish_game(f"AI({MARKS[self.turn]})の反則負け！")
-                return
-        else:
-             self.update_advice(f"AI({MARKS[self.turn]})が手を返せませんでした: {result}。")
-             self.finish_game(f"AI({MARKS[self.turn]})の反則負け！")
-             return
+                self.update_advice(f"AI({MARKS[self.turn]})が手を返せませんでした: {result}。")
+            self.finish_game(f"AI({MARKS[self.turn]})の反則負け！")
+            return
+        res = apply_move(self.board, mv[0], mv[1], self.turn, self.k)
+        self.board = res.board
+        self.draw()
+        self.update_advice(f"AI({MARKS[self.turn]})手: {mv} (応答 {dt:.1f}s)\n{reason}")
+        if res.win:
+            self.finish_game(f"AI({MARKS[res.win]})の勝ち！")
+            return
+        if res.draw:
+            self.finish_game("引き分け！")
+            return
 
         self.turn = O if self.turn == X else X
         self.info.config(text=self.status_text())
-        self.root.after(1000, self.ai_vs_ai_move) # 1秒待って次の手
-
-
-
-
+        self.after_in_game(1000, self.ai_vs_ai_move) # 1秒待って次の手
 
     def set_human_player(self, player):
         self.human_player = player
         self.reset_game()
         if self.human_player == O:
-            self.root.after(200, self.ai_move)
+            self.after_in_game(200, self.ai_move)
+
+    def on_board(self, x, y) -> bool:
+        return isinstance(x, int) and isinstance(y, int) and 0 <= x < self.n and 0 <= y < self.n
 
     def reset_game(self):
-        self.board = initial_board()
+        self.cancel_ai()
+        self.board = initial_board(self.n)
         self.turn = X
+        self.cell = max(MIN_CELL, CELL * SIZE // self.n)
+        size = self.n * self.cell + PAD * 2
+        self.canvas.config(width=size, height=size)
+        if (self.n, self.k) == (SIZE, SIZE):
+            self.root.title("Tic-Tac-Toe (あなた=X / AI=O)")
+        else:
+            self.root.title(f"{self.n}×{self.n} {self.k}目並べ")
         self.draw()
         self.info.config(text=self.status_text())
         self.advice.delete("1.0", tk.END)
@@ -413,6 +560,9 @@ class TicTacToeGUI:
                 msg += " (Gemini APIキー未設定等のためオフラインAIで動作)"
             elif self.ai.ai_type == 'openai' and not self.ai.openai_available:
                 msg += " (OpenAI APIキー未設定等のためオフラインAIで動作)"
+            elif self.ai.ai_type == 'ensemble':
+                providers = ", ".join(self.ai.providers) or "なし、オフラインAIで動作"
+                msg += f" (プロバイダ: {providers})"
             self.update_advice(msg)
         self.busy = False
 
@@ -432,17 +582,19 @@ class TicTacToeGUI:
 
     def draw(self):
         self.canvas.delete("all")
-        for i in range(1, SIZE):
-            self.canvas.create_line(PAD, PAD + i*CELL, PAD + BOARD_SIZE, PAD + i*CELL, width=2)
-            self.canvas.create_line(PAD + i*CELL, PAD, PAD + i*CELL, PAD + BOARD_SIZE, width=2)
-        for y in range(SIZE):
-            for x in range(SIZE):
+        n, cell = self.n, self.cell
+        board_size = n * cell
+        for i in range(1, n):
+            self.canvas.create_line(PAD, PAD + i*cell, PAD + board_size, PAD + i*cell, width=2)
+            self.canvas.create_line(PAD + i*cell, PAD, PAD + i*cell, PAD + board_size, width=2)
+        for y in range(n):
+            for x in range(n):
                 v = self.board[y][x]
-                cx = PAD + x*CELL + CELL/2
-                cy = PAD + y*CELL + CELL/2
+                cx = PAD + x*cell + cell/2
+                cy = PAD + y*cell + cell/2
                 if v != EMPTY:
-                    self.canvas.create_text(cx, cy, text=MARKS[v], font=("Helvetica", 48, "bold"), fill="#333")
-                else:
+                    self.canvas.create_text(cx, cy, text=MARKS[v], font=("Helvetica", cell * 48 // CELL, "bold"), fill="#333")
+                elif n == SIZE:
                     idx = y * 3 + x + 1
                     self.canvas.create_text(cx, cy, text=str(idx), font=("Helvetica", 20), fill="#bbb")
 
@@ -451,9 +603,9 @@ class TicTacToeGUI:
             return
 
         if self.game_mode == 'hvh' or self.turn == self.human_player:
-            x = int((event.x - PAD) // CELL)
-            y = int((event.y - PAD) // CELL)
-            if not (0 <= x < SIZE and 0 <= y < SIZE):
+            x = int((event.x - PAD) // self.cell)
+            y = int((event.y - PAD) // self.cell)
+            if not (0 <= x < self.n and 0 <= y < self.n):
                 return
             self.handle_move(x, y)
 
@@ -461,47 +613,43 @@ class TicTacToeGUI:
         if not self.ai or self.turn == self.human_player:
             return
         ai_mark = O if self.human_player == X else X
-        t0 = time.time()
-        result = self.ai.choose(self.board, ai_mark)
-        dt = time.time() - t0
-        mv = result.get("move")
-        reason = result.get("reason", "")
+        self.start_ai_turn(self.ai, ai_mark, self.on_ai_result)
 
-        if mv and isinstance(mv, list):
-            mv = tuple(mv)
-
-        if mv and isinstance(mv, tuple) and len(mv) == 2 and mv[0] is not None and mv[1] is not None:
-            res = apply_move(self.board, mv[0], mv[1], ai_mark)
-            if res:
-                self.board = res.board
-                self.draw()
-                self.update_advice(f"AI手: {mv} (応答 {dt:.1f}s)\n{reason}")
-                if res.win == ai_mark:
-                    self.finish_game(f"AI({MARKS[ai_mark]})の勝ち！")
-                    return
-                if res.draw:
-                    self.finish_game("引き分け！")
-                    return
+    def on_ai_result(self, result: Dict[str, Any], dt: float):
+        ai_mark = O if self.human_player == X else X
+        reason = result.get("reason", "")
+        mv = self.valid_move(result, ai_mark)
+        if mv is None and not result.get("offline"):
+            if result.get("move"):
+                self.update_advice(f"AIが無効な手を指しました: {result.get('move')}。オフラインAIで打ちます。")
             else:
-                self.update_advice(f"AIが無効な手を指しました: {mv}。オフラインAIで再試行します。")
-                result = AIPlayer('offline').choose(self.board, ai_mark)
-                # ... (再試行のロジックをここに追加可能)
-
-        else:
-             self.update_advice(f"AIが手を返せませんでした: {result}。オフラインAIで試します。")
-             # ... (オフラインAIでの再試行ロジック)
+                self.update_advice(f"AIが手を返せませんでした: {result}。オフラインAIで打ちます。")
+            self.start_fallback(ai_mark, time.time() - dt, self.on_ai_result, "オフラインAI")
+            return
+        if mv is not None:
+            res = apply_move(self.board, mv[0], mv[1], ai_mark, self.k)
+            self.board = res.board
+            self.draw()
+            self.update_advice(f"AI手: {mv} (応答 {dt:.1f}s)\n{reason}")
+            if res.win == ai_mark:
+                self.finish_game(f"AI({MARKS[ai_mark]})の勝ち！")
+                return
+            if res.draw:
+                self.finish_game("引き分け！")
+                return
 
         self.turn = self.human_player
         self.busy = False
         self.info.config(text=self.status_text())
 
     def finish_game(self, msg: str):
+        self.busy = True  # 次の対局が始まるまで着手を受け付けない
         self.draw()
         self.update_advice(msg)
         def close_and_reask():
             self.ask_game_mode()
 
-        self.root.after(100, lambda: (messagebox.showinfo("結果", msg), close_and_reask()))
+        self.after_in_game(100, lambda: (messagebox.showinfo("結果", msg), close_and_reask()))
 
 # --- main ---
 def main():
@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+N×N の盤で k 個並べたら勝ち（三目並べ 3×3/3、五目並べ風 15×15/5 など）の盤面と探索。
+
+- 盤面は手番ごとのビットボード（Python の int、マス sq = y*n + x）。
+- 勝ち判定は「直前に置いたマスを通る長さ k の窓」のマスクだけを見る（盤全体は走査しない）。
+- 評価は各窓の石数から差分更新する（相手の石が無い窓ほど、石が多いほど高い）。
+- 探索は negamax / alpha-beta の反復深化で、時間制限つき。候補は既存の石から 2 マス以内に限り、
+  「自分の窓を伸ばす／相手の窓を止める」脅威の大きい順に並べ、上位 width 手だけ読む。
+
+  python3 tictactoe_nk.py -n 15 -k 5 -t 1.0   # AI 同士で 1 局打って盤面と探索の統計を表示
+"""
+from __future__ import annotations
+import argparse
+import time
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+EMPTY, X, O = 0, 1, -1
+WIN_SCORE = 1_000_000  # 勝ちの値（手数が短いほど大きくする）
+TIME_CHECK_MASK = 255  # 何ノードごとに時計を見るか
+
+def _windows(n: int, k: int) -> List[int]:
+    """長さ k の縦・横・斜めの窓（マスのビットマスク）をすべて列挙する。"""
+    out = []
+    for y in range(n):
+        for x in range(n):
+            for dx, dy in ((1, 0), (0, 1), (1, 1), (1, -1)):
+                ex, ey = x + dx * (k - 1), y + dy * (k - 1)
+                if 0 <= ex < n and 0 <= ey < n:
+                    m = 0
+                    for i in range(k):
+                        m |= 1 << ((y + dy * i) * n + x + dx * i)
+                    out.append(m)
+    return out
+
+class NKBoard:
+    """N×N・k 目並べの盤面。stones[0] が X、stones[1] が O のビットボード。"""
+    def __init__(self, n: int = 3, k: int = 3):
+        if not (1 <= k <= n):
+            raise ValueError(f"k は 1..n の範囲で指定してください: n={n} k={k}")
+        self.n, self.k = n, k
+        self.full = (1 << (n * n)) - 1
+        self.windows = _windows(n, k)
+        self.windows_at: List[List[int]] = [[w for w, m in enumerate(self.windows) if (m >> sq) & 1]
+                                            for sq in range(n * n)]
+        self.win_masks_at: List[List[int]] = [[self.windows[w] for w in ws] for ws in self.windows_at]
+        self.not_left = sum(1 << (y * n) for y in range(n)) ^ self.full            # x=0 を除く
+        self.not_right = sum(1 << (y * n + n - 1) for y in range(n)) ^ self.full   # x=n-1 を除く
+        # 窓の石数 c（相手の石なし）の評価値。k 個目は勝ちなので別扱い
+        self.score_of = [0] + [10 ** (c - 1) for c in range(1, k)]
+        self.win_threat = WIN_SCORE * 8 * k  # 止める価値をすべて足しても届かない大きさ
+        self.reset()
+
+    def reset(self):
+        self.stones = [0, 0]
+        self.counts = [[0] * len(self.windows), [0] * len(self.windows)]
+        self.side = 0                  # 手番（0 = X, 1 = O）
+        self.score = 0                 # X から見た評価値
+        self.winner: Optional[int] = None
+        self.history: List[Tuple[int, int, Optional[int]]] = []
+
+    @classmethod
+    def from_board(cls, board: List[List[int]], k: int, to_move: int) -> "NKBoard":
+        """board[y][x]（X=1, O=-1, 空=0）から作る。to_move は次に打つ側の印。"""
+        b = cls(len(board), k)
+        for y, row in enumerate(board):
+            for x, v in enumerate(row):
+                if v != EMPTY:
+                    b.side = 0 if v == X else 1
+                    b.play(y * b.n + x)
+        b.side = 0 if to_move == X else 1
+        return b
+
+    @property
+    def mark(self) -> int:
+        return X if self.side == 0 else O
+
+    @property
+    def occupied(self) -> int:
+        return self.stones[0] | self.stones[1]
+
+    def is_full(self) -> bool:
+        return self.occupied == self.full
+
+    def wins_at(self, p: int, sq: int) -> bool:
+        """p の石で sq を通る窓が埋まっているか（sq に置いた直後の勝ち判定）。"""
+        s = self.stones[p]
+        return any(s & m == m for m in self.win_masks_at[sq])
+
+    def completes(self, sq: int) -> bool:
+        """手番側が sq に打てば勝ちか。"""
+        s = self.stones[self.side] | (1 << sq)
+        return any(s & m == m for m in self.win_masks_at[sq])
+
+    def play(self, sq: int):
+        p, q = self.side, 1 - self.side
+        self.history.append((sq, self.score, self.winner))
+        self.stones[p] |= 1 << sq
+        mine, theirs, score_of = self.counts[p], self.counts[q], self.score_of
+        k = self.k
+        delta = 0
+        for w in self.windows_at[sq]:
+            cm, co = mine[w], theirs[w]
+            mine[w] = cm + 1
+            if co == 0:
+                if cm + 1 < k:
+                    delta += score_of[cm + 1] - score_of[cm]
+            elif cm == 0:
+                delta += score_of[co]  # 相手の窓を止めた
+        self.score += delta if p == 0 else -delta
+        if self.winner is None and self.wins_at(p, sq):
+            self.winner = X if p == 0 else O
+        self.side = q
+
+    def undo(self):
+        sq, self.score, self.winner = self.history.pop()
+        self.side = p = 1 - self.side
+        self.stones[p] &= ~(1 << sq)
+        mine = self.counts[p]
+        for w in self.windows_at[sq]:
+            mine[w] -= 1
+
+    def dilate(self, b: int) -> int:
+        """b を 8 近傍に 1 マス広げる。"""
+        h = b | ((b >> 1) & self.not_right) | ((b << 1) & self.not_left)
+        return (h | (h << self.n) | (h >> self.n)) & self.full
+
+    def candidates(self) -> List[int]:
+        """既存の石から 2 マス以内の空きマス（石が無ければ中央）。"""
+        occ = self.occupied
+        if not occ:
+            return [(self.n // 2) * self.n + self.n // 2]
+        near = self.dilate(self.dilate(occ)) & ~occ
+        out = []
+        while near:
+            low = near & -near
+            out.append(low.bit_length() - 1)
+            near ^= low
+        return out
+
+    def threat(self, sq: int) -> int:
+        """手番側が sq に打つ価値（自分の窓を伸ばす＋相手の窓を止める）。即勝ち・即負け防ぎを最優先。"""
+        p, q = self.side, 1 - self.side
+        mine, theirs, score_of, k = self.counts[p], self.counts[q], self.score_of, self.k
+        v = 0
+        for w in self.windows_at[sq]:
+            cm, co = mine[w], theirs[w]
+            if co == 0:
+                v += self.win_threat if cm == k - 1 else score_of[cm + 1] if cm + 1 < k else 0
+            elif cm == 0:
+                v += WIN_SCORE if co == k - 1 else score_of[co]
+        return v
+
+    def to_board(self) -> List[List[int]]:
+        n = self.n
+        return [[X if (self.stones[0] >> (y * n + x)) & 1 else O if (self.stones[1] >> (y * n + x)) & 1 else EMPTY
+                 for x in range(n)] for y in range(n)]
+
+    def __str__(self) -> str:
+        return "\n".join(" ".join({X: "X", O: "O", EMPTY: "."}[v] for v in row) for row in self.to_board())
+
+# ------------------------------- Search ------------------------------------
+
+@dataclass
+class SearchResult:
+    move: Optional[Tuple[int, int]]  # (x, y)。打てるマスが無ければ None
+    score: int
+    depth: int      # 完了した探索深さ
+    nodes: int
+    elapsed: float  # 秒
+
+class SearchTimeout(Exception):
+    pass
+
+class NKSearcher:
+    def __init__(self, width: int = 12):
+        self.width = width  # 各ノードで読む候補手の数（脅威の大きい順）
+        self.nodes = 0
+        self.deadline: Optional[float] = None
+
+    def ordered(self, b: NKBoard) -> List[int]:
+        moves = b.candidates()
+        moves.sort(key=b.threat, reverse=True)
+        return moves[:self.width]
+
+    def search(self, b: NKBoard, time_limit: float = 1.0, max_depth: Optional[int] = None) -> SearchResult:
+        """b の手番側の最善手を time_limit 秒まで反復深化で探す（b は探索後に元へ戻る）。"""
+        t0 = time.perf_counter()
+        self.nodes = 0
+        n = b.n
+        moves = self.ordered(b)
+        if not moves or b.winner is not None:
+            return SearchResult(move=None, score=0, depth=0, nodes=0, elapsed=0.0)
+        empties = n * n - bin(b.occupied).count("1")
+        max_depth = min(max_depth or empties, empties)
+        best_sq, best_val, done = moves[0], -WIN_SCORE, 0
+        for depth in range(1, max_depth + 1):
+            self.deadline = t0 + time_limit if depth > 1 else None  # 深さ 1 は必ず完了させる
+            try:
+                val, sq, scores = self._root(b, moves, depth)
+            except SearchTimeout:
+                break
+            moves.sort(key=lambda m: scores[m], reverse=True)
+            best_sq, best_val, done = sq, val, depth
+            if abs(val) >= WIN_SCORE - n * n or time.perf_counter() - t0 >= time_limit:
+                break  # 勝敗が読み切れた / 時間切れ
+        self.deadline = None
+        return SearchResult(move=(best_sq % n, best_sq // n), score=best_val, depth=done,
+                            nodes=self.nodes, elapsed=time.perf_counter() - t0)
+
+    def _root(self, b: NKBoard, moves: List[int], depth: int):
+        alpha, beta = -WIN_SCORE - 1, WIN_SCORE + 1
+        best_sq = moves[0]
+        scores = {m: -WIN_SCORE - 1 for m in moves}
+        for sq in moves:
+            b.play(sq)
+            try:
+                v = -self._negamax(b, depth - 1, -beta, -alpha, 1)
+            finally:
+                b.undo()
+            scores[sq] = v
+            if v > alpha:
+                alpha, best_sq = v, sq
+        return alpha, best_sq, scores
+
+    def _negamax(self, b: NKBoard, depth: int, alpha: int, beta: int, ply: int) -> int:
+        self.nodes += 1
+        if (self.nodes & TIME_CHECK_MASK) == 0 and self.deadline is not None and time.perf_counter() > self.deadline:
+            raise SearchTimeout
+        if b.winner is not None:
+            return -(WIN_SCORE - ply)  # 直前の手で相手が勝った
+        if b.is_full():
+            return 0
+        if depth == 0:
+            return b.score if b.side == 0 else -b.score
+        moves = self.ordered(b)
+        if b.completes(moves[0]):
+            return WIN_SCORE - ply - 1  # 次の 1 手で勝てる
+        best = -WIN_SCORE - 1
+        for sq in moves:
+            b.play(sq)
+            try:
+                v = -self._negamax(b, depth - 1, -beta, -alpha, ply + 1)
+            finally:
+                b.undo()
+            if v > best:
+                best = v
+                if v > alpha:
+                    alpha = v
+                    if alpha >= beta:
+                        break
+        return best
+
+def best_move(board: List[List[int]], mark: int, k: int, time_limit: float = 1.0) -> Optional[Tuple[int, int]]:
+    """board[y][x] で mark の手番の最善手 (x, y)。"""
+    b = NKBoard.from_board(board, k, mark)
+    return NKSearcher().search(b, time_limit).move
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("-n", type=int, default=15, help="盤の大きさ")
+    ap.add_argument("-k", type=int, default=5, help="並べる数")
+    ap.add_argument("-t", "--time", type=float, default=1.0, help="1 手の時間（秒）")
+    ap.add_argument("--width", type=int, default=12)
+    args = ap.parse_args()
+
+    b = NKBoard(args.n, args.k)
+    searcher = NKSearcher(args.width)
+    total_nodes = total_time = 0.0
+    plies = 0
+    while b.winner is None and not b.is_full():
+        res = searcher.search(b, args.time)
+        x, y = res.move
+        print(f"{plies + 1:3d} {'XO'[b.side]} ({x},{y})  depth {res.depth:2d}  score {res.score:8d}  "
+              f"{res.nodes:7d} nodes  {res.elapsed * 1000:7.1f} ms")
+        b.play(y * b.n + x)
+        total_nodes += res.nodes
+        total_time += res.elapsed
+        plies += 1
+    print(b)
+    print(f"result: {'draw' if b.winner is None else ('X' if b.winner == X else 'O') + ' wins'} in {plies} plies, "
+          f"{total_nodes / total_time if total_time else 0:.0f} nodes/s")
+
+if __name__ == "__main__":
+    main()
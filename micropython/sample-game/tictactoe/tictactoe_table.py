@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+3×3 三目並べの完全読みの表。
+
+到達可能な全局面（5478 局面）を 1 度だけ読み切り、局面ごとに 1 バイトで最善手と値を持つ。
+添字は盤面の 3 進数（マス k = y*3 + x の桁が 空=0 / X=1 / O=2）なので、表は 3^9 = 19683 バイト。
+手番は石の数から決まる（X が先手）。
+
+  1 バイト = 値 << 4 | 最善手
+    最善手: 0..8（マス k）、勝負が付いた局面は NO_MOVE
+    値    : 手番側から見て LOSS / DRAW / WIN
+  到達しない局面は UNREACHABLE。
+
+最善手は「勝ちなら最短、負けなら最長、同じなら中央→角→辺」で選ぶ。
+
+  python3 tictactoe_table.py build   # tictactoe_table.bin を作る（無ければ初回に表を作って使う）
+  python3 tictactoe_table.py info
+"""
+from __future__ import annotations
+import argparse
+import os
+from typing import Dict, List, Optional, Tuple
+
+EMPTY, X, O = 0, 1, -1
+N = 3
+CELLS = N * N
+TABLE_SIZE = 3 ** CELLS
+POW3 = [3 ** k for k in range(CELLS)]
+DIGIT = {EMPTY: 0, X: 1, O: 2}
+LOSS, DRAW, WIN = 0, 1, 2
+NO_MOVE = 0x0F
+UNREACHABLE = 0xFF
+VALUE_OF = {LOSS: -1, DRAW: 0, WIN: 1}
+DEFAULT_TABLE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tictactoe_table.bin")
+
+LINES = [(0, 1, 2), (3, 4, 5), (6, 7, 8), (0, 3, 6), (1, 4, 7), (2, 5, 8), (0, 4, 8), (2, 4, 6)]
+PREFERENCE = [4, 0, 2, 6, 8, 1, 3, 5, 7]  # 同じ値の手の優先順（中央→角→辺）
+
+def _winner(cells: List[int]) -> int:
+    for a, b, c in LINES:
+        if cells[a] != EMPTY and cells[a] == cells[b] == cells[c]:
+            return cells[a]
+    return EMPTY
+
+def build() -> bytearray:
+    """到達可能な全局面を読み切って表を作る。"""
+    table = bytearray([UNREACHABLE]) * TABLE_SIZE
+    plies: Dict[int, int] = {}  # 添字 → 終局までの手数（最善応手で）
+    cells = [EMPTY] * CELLS
+
+    def solve(index: int, mark: int) -> Tuple[int, int]:
+        """手番 mark の局面の (値, 終局までの手数)。"""
+        if table[index] != UNREACHABLE:
+            return table[index] >> 4, plies[index]
+        if _winner(cells) != EMPTY:
+            result = (LOSS, 0)  # 直前の手で相手が勝った
+            move = NO_MOVE
+        elif EMPTY not in cells:
+            result = (DRAW, 0)
+            move = NO_MOVE
+        else:
+            best_key, result, move = None, None, NO_MOVE
+            for rank, k in enumerate(PREFERENCE):
+                if cells[k] != EMPTY:
+                    continue
+                cells[k] = mark
+                v, n = solve(index + DIGIT[mark] * POW3[k], -mark)
+                cells[k] = EMPTY
+                value = 2 - v  # 相手から見た値を反転
+                # 値が高い順、勝ちは短く・負けは長く、最後に PREFERENCE の順
+                key = (value, -n if value == WIN else n, -rank)
+                if best_key is None or key > best_key:
+                    best_key, result, move = key, (value, n + 1), k
+        table[index] = result[0] << 4 | move
+        plies[index] = result[1]
+        return result
+
+    solve(0, X)
+    return table
+
+def index_of(board: List[List[int]]) -> int:
+    """board[y][x]（X=1, O=-1, 空=0）の添字。"""
+    return sum(DIGIT[board[y][x]] * POW3[y * N + x] for y in range(N) for x in range(N))
+
+class PerfectTable:
+    def __init__(self, path: Optional[str] = DEFAULT_TABLE):
+        self.table: Optional[bytes] = None
+        if path and os.path.exists(path):
+            with open(path, "rb") as f:
+                data = f.read()
+            if len(data) == TABLE_SIZE:
+                self.table = data
+        if self.table is None:
+            self.table = bytes(build())  # 表ファイルが無ければその場で作る（数十ms）
+
+    def lookup(self, board: List[List[int]], mark: int) -> Optional[Tuple[Optional[Tuple[int, int]], int]]:
+        """mark の手番の局面の (最善手 (x, y) または None, 値 -1/0/1)。表に無い局面なら None。"""
+        if len(board) != N or any(len(row) != N for row in board):
+            return None
+        flat = [v for row in board for v in row]
+        nx, no = flat.count(X), flat.count(O)
+        if (mark == X and nx != no) or (mark == O and nx != no + 1):
+            return None  # 手番が石の数と合わない
+        entry = self.table[index_of(board)]
+        if entry == UNREACHABLE:
+            return None
+        move = entry & 0x0F
+        return (None if move == NO_MOVE else (move % N, move // N)), VALUE_OF[entry >> 4]
+
+    def best_move(self, board: List[List[int]], mark: int) -> Optional[Tuple[int, int]]:
+        hit = self.lookup(board, mark)
+        return hit[0] if hit else None
+
+_TABLE: Optional[PerfectTable] = None
+
+def get_table() -> PerfectTable:
+    """プロセスで共有する表（初回だけ読み込み／作成）。"""
+    global _TABLE
+    if _TABLE is None:
+        _TABLE = PerfectTable()
+    return _TABLE
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("cmd", choices=["build", "info"])
+    ap.add_argument("-o", "--output", default=DEFAULT_TABLE)
+    args = ap.parse_args()
+    if args.cmd == "build":
+        table = build()
+        with open(args.output, "wb") as f:
+            f.write(table)
+        print(f"wrote {args.output}: {TABLE_SIZE} bytes, {sum(b != UNREACHABLE for b in table)} reachable positions")
+        return
+    t = PerfectTable(args.output)
+    reachable = [b for b in t.table if b != UNREACHABLE]
+    counts = {name: sum(1 for b in reachable if b >> 4 == v) for name, v in (("win", WIN), ("draw", DRAW), ("loss", LOSS))}
+    print(f"{len(reachable)} reachable positions (side to move): {counts}")
+    move, value = t.lookup([[EMPTY] * N for _ in range(N)], X)
+    print(f"empty board: best move {move}, value {value}")
+
+if __name__ == "__main__":
+    main()